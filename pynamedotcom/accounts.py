@@ -0,0 +1,189 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""pynamedotcom multi-account client module."""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+import json
+import logging
+import threading
+
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+from pynamedotcom import bulk, deadline
+from pynamedotcom.api import API
+from pynamedotcom.export import domains as fetch_domains
+
+AccountResult = collections.namedtuple("AccountResult",
+                                       ["account", "result", "error"])
+
+_DONE = object()
+
+
+def load(path):
+    """
+    Read a credentials file.
+
+    The file holds a JSON object mapping each account name to an object
+    with ``user`` and ``token`` members, and optionally ``host`` and
+    ``rate`` (requests per second) members.
+    """
+    with open(path) as f:
+        credentials = json.load(f)
+    if not isinstance(credentials, dict):
+        raise ValueError("{}: expected an object of accounts".format(path))
+    for account, auth in credentials.items():
+        if not isinstance(auth, dict) or "user" not in auth \
+                or "token" not in auth:
+            raise ValueError("{}: account {} needs user and token"
+                             .format(path, account))
+    return credentials
+
+
+class _SharedIterator(object):
+    """Iterator that may be consumed from several threads."""
+
+    def __init__(self, items):
+        self._items = iter(items)
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self._lock:
+            return next(self._items)
+
+    next = __next__
+
+
+class Accounts(object):
+    """
+    Client for many name.com accounts at once.
+
+    Each account gets its own API instance, and so its own connection
+    pool, with at most rate requests per second if set. Operations run
+    for all accounts concurrently and their results are merged as they
+    arrive, as AccountResult tuples tagged with the account name. An
+    error in one account is yielded as an AccountResult with the error
+    set, and ends only that account's results.
+    """
+
+    def __init__(self, credentials, rate=None, workers=bulk.DEFAULT_WORKERS,
+                 buffer=1000, **kwargs):
+        """Construct Accounts object instance."""
+        self.workers = workers
+        self.buffer = buffer
+        self.apis = collections.OrderedDict()
+        for account in sorted(credentials):
+            options = dict(kwargs, **credentials[account])
+            account_rate = options.pop("rate", rate)
+            if account_rate:
+                options["rate_limit"] = bulk.RateLimit(account_rate)
+            self.apis[account] = API(**options)
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, len(self.apis))
+
+    def __enter__(self):
+        """Enter context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Exit context manager."""
+        self.close()
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """Construct an Accounts instance from a credentials file."""
+        return cls(load(path), **kwargs)
+
+    def close(self):
+        """Close the connection pools of all accounts."""
+        for api in self.apis.values():
+            api.close()
+
+    def domains(self):
+        """Get the domain names in all accounts."""
+        return self._fan_out(lambda api: api.domains)
+
+    def iter_domains(self, per_page=None):
+        """Get Domain objects from the listings of all accounts."""
+        return self._fan_out(lambda api: api.iter_domains(per_page=per_page))
+
+    def fetch_domains(self, contacts=True, per_page=None):
+        """Get fully fetched Domain objects from all accounts."""
+        return self._fan_out(lambda api: fetch_domains(
+            api, contacts=contacts, workers=self.workers, per_page=per_page))
+
+    def check_availability_bulk(self, names, batch_size=50):
+        """
+        Check availability of many names, spread over all accounts.
+
+        Each account takes batches of names from a shared iterator, so
+        faster or less limited accounts check more of them. If an account
+        fails, the names in its failed batch are not checked.
+        """
+        names = _SharedIterator(names)
+        return self._fan_out(lambda api: api.check_availability_bulk(
+            names, batch_size=batch_size, workers=self.workers))
+
+    def _fan_out(self, func):
+        """Run func for each account API and merge the results."""
+        results = queue.Queue(maxsize=self.buffer)
+        stop = threading.Event()
+        for account, api in self.apis.items():
+            thread = threading.Thread(target=deadline.bind(self._run),
+                                      args=(func, account, api, results,
+                                            stop))
+            thread.daemon = True
+            thread.start()
+        remaining = len(self.apis)
+        try:
+            while remaining:
+                item = results.get()
+                if item is _DONE:
+                    remaining -= 1
+                    continue
+                yield item
+        finally:
+            stop.set()
+
+    @staticmethod
+    def _put(results, stop, item):
+        """Queue an item unless the consumer has stopped."""
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self, func, account, api, results, stop):
+        """Queue the results of func for one account."""
+        try:
+            for result in func(api):
+                if not self._put(results, stop,
+                                 AccountResult(account, result, None)):
+                    return
+        except Exception as e:
+            logging.getLogger(__name__).warning(
+                "account {} failed: {}".format(account, e))
+            self._put(results, stop, AccountResult(account, None, e))
+        finally:
+            self._put(results, stop, _DONE)
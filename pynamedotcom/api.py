@@ -14,75 +14,409 @@
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import fnmatch
+import itertools
 import logging
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 
+from pynamedotcom import bulk, deadline, priority, profiling
+from pynamedotcom.coalesce import SingleFlight
+from pynamedotcom.codec import JSONArrayStream, Serialised, get_codec
 from pynamedotcom.domain import Domain
+from pynamedotcom.exceptions import DeadlineExceeded
 from pynamedotcom.search import SearchResult
 
 
 class API(object):
-    """API client library class."""
+    """
+    API client library class.
+
+    An API instance may be shared between threads: requests are made
+    through a single connection pool holding up to pool_size idle
+    connections per host. If limiter is a bulk.AdaptiveLimiter, every
+    request is reported to it and bulk operations keep no more requests
+    in flight than its current limit, with workers as the ceiling. If
+    hedge is a hedge.HedgePolicy, slow GET requests are hedged according
+    to it.
+
+    Each request is limited by connect_timeout and read_timeout, and by
+    the deadline.Deadline active in the calling thread, if any.
+
+    If dispatcher is a priority.Dispatcher, each request waits for a slot
+    at the priority.Priority active in the calling thread, and holds it
+    until the response headers arrive.
+
+    If breaker is a breaker.CircuitBreaker, requests fail immediately with
+    CircuitOpenError while it is open. If rate_limit is a bulk.RateLimit,
+    requests wait for it before being sent.
+
+    If transport is a requests transport adapter, such as
+    replay.Recorder or replay.Replayer, it is used in place of the
+    default connection pool.
+    """
 
     def __init__(self, user=None, token=None,
-                 host="api.name.com", version=4):
+                 host="api.name.com", version=4, codec=None,
+                 chunk_size=16384, cache=None, coalesce=True,
+                 coalesce_exclude=(), pool_size=10, scheme="https",
+                 limiter=None, hedge=None, connect_timeout=10,
+                 read_timeout=60, dispatcher=None, breaker=None,
+                 rate_limit=None, transport=None):
         """Construct API instance."""
-        self.base_url = "https://{}/v{}".format(host, version)
+        self.base_url = "{}://{}/v{}".format(scheme, host, version)
         self.auth = HTTPBasicAuth(user, token)
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.limiter = limiter
+        self.hedge = hedge
+        self.dispatcher = dispatcher
+        self.breaker = breaker
+        self.rate_limit = rate_limit
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._session = requests.Session()
+        if transport is None:
+            transport = HTTPAdapter(pool_connections=pool_size,
+                                    pool_maxsize=pool_size)
+        self.transport = transport
+        self._session.mount("{}://".format(scheme), transport)
+        self.codec = get_codec(codec)
+        self.chunk_size = chunk_size
+        self.cache = cache
+        self.coalesce = coalesce
+        self.coalesce_exclude = list(coalesce_exclude)
+        self._singleflight = SingleFlight()
+        self._profiler = None
 
     def __enter__(self):
         """Enter context manager."""
+        self._profiler = profiling.from_env()
+        if self._profiler:
+            self._profiler.start()
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
         """Exit context manager."""
-        pass
+        if self._profiler:
+            self._profiler.stop()
+            self._profiler = None
+        self.close()
+
+    def close(self):
+        """Close pooled connections."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+        self._session.close()
 
-    def _get(self, endpoint=None, params=None):
-        """Make a HTTP GET request."""
+    def _request(self, method, endpoint=None, params=None, data=None,
+                 stream=False):
+        """Make a HTTP request."""
         url = "{}/{}".format(self.base_url, endpoint)
-        resp = requests.get(url, params=params, auth=self.auth)
-        logging.getLogger(__name__).debug(resp.json())
-        resp.raise_for_status()
+        headers = None
+        if data is not None:
+            if not isinstance(data, Serialised):
+                data = self.codec.dumps(data)
+            headers = {"Content-Type": "application/json"}
+        deadline.check()
+        token = None
+        if self.breaker is not None:
+            token = self.breaker.before()
+        if self.rate_limit is not None:
+            self.rate_limit.acquire()
+        with profiling.section("http"):
+            try:
+                if self.dispatcher is not None:
+                    with self.dispatcher.slot():
+                        resp = self._send(method, url, params, data,
+                                          headers, stream, token)
+                else:
+                    resp = self._send(method, url, params, data, headers,
+                                      stream, token)
+            except requests.Timeout:
+                deadline.check()
+                raise
+            finally:
+                if method != "GET":
+                    # reads started before a write may not see it
+                    self._singleflight.fence()
+        if not stream:
+            self._log(resp)
+        return self._check(resp, stream)
+
+    @staticmethod
+    def _check(resp, stream):
+        """Raise HTTPError for an error response, closing it if streamed."""
+        try:
+            resp.raise_for_status()
+        except requests.HTTPError:
+            if stream:
+                # read the error body, then return the connection to the
+                # pool
+                resp.content
+                resp.close()
+            raise
         return resp
 
-    def _post(self, endpoint=None, data=None):
-        """Make a HTTP POST request."""
-        url = "{}/{}".format(self.base_url, endpoint)
-        resp = requests.post(url, json=data, auth=self.auth)
-        logging.getLogger(__name__).debug(resp.json())
-        resp.raise_for_status()
+    def _send(self, method, url, params, data, headers, stream,
+              token=None):
+        """
+        Send a HTTP request through the connection pool.
+
+        token is the breaker's token for the request, if any.
+        """
+        timeout = (deadline.timeout(self.connect_timeout),
+                   deadline.timeout(self.read_timeout))
+        start = time.time()
+        try:
+            resp = self._session.request(method, url, params=params,
+                                         data=data, headers=headers,
+                                         auth=self.auth, stream=stream,
+                                         timeout=timeout)
+        except requests.RequestException:
+            if self.limiter is not None:
+                self.limiter.observe(time.time() - start, error=True)
+            if self.breaker is not None:
+                self.breaker.record(False, token)
+            raise
+        if self.limiter is not None:
+            self.limiter.observe(time.time() - start,
+                                 status=resp.status_code)
+        if self.breaker is not None:
+            self.breaker.record(resp.status_code < 500, token)
         return resp
 
+    def _get(self, endpoint=None, params=None, stream=False):
+        """Make a HTTP GET request, hedged if a policy is set."""
+        if self.hedge is None or stream:
+            return self._request("GET", endpoint=endpoint, params=params,
+                                 stream=stream)
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=2 * self.pool_size)
+            executor = self._executor
+        func = priority.bind(deadline.bind(lambda: self._request(
+            "GET", endpoint=endpoint, params=params)), default=priority.NORMAL)
+        return self.hedge.run(executor, func)
+
+    def _get_json(self, endpoint=None, params=None):
+        """
+        Make a HTTP GET request and decode the response.
+
+        Concurrent identical requests share a single request and decoded
+        result, unless coalescing is disabled or the endpoint matches one
+        of the coalesce_exclude patterns. Requests made after a write are
+        not joined to requests started before it.
+        """
+        def fetch():
+            return self._json(self._get(endpoint=endpoint, params=params))
+        if not self.coalesce or any(fnmatch.fnmatch(endpoint, pattern)
+                                    for pattern in self.coalesce_exclude):
+            return fetch()
+        key = (endpoint, tuple(sorted((params or {}).items())))
+        return self._singleflight.do(key, fetch, label=endpoint)
+
+    @property
+    def coalesced(self):
+        """Get counts of coalesced requests by endpoint."""
+        return dict(self._singleflight.coalesced)
+
+    def _post(self, endpoint=None, data=None, stream=False):
+        """Make a HTTP POST request."""
+        return self._request("POST", endpoint=endpoint, data=data,
+                             stream=stream)
+
+    def _put(self, endpoint=None, data=None):
+        """Make a HTTP PUT request."""
+        return self._request("PUT", endpoint=endpoint, data=data)
+
+    def _delete(self, endpoint=None):
+        """Make a HTTP DELETE request."""
+        return self._request("DELETE", endpoint=endpoint)
+
+    def _log(self, resp):
+        """Log a HTTP response body."""
+        logger = logging.getLogger(__name__)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(resp.text)
+
+    def _json(self, resp):
+        """Decode a HTTP response body."""
+        with profiling.section("decode"):
+            return self.codec.loads(resp.content)
+
+    def _listing(self, endpoint, key, per_page=None):
+        """Get objects from a paginated listing as a generator."""
+        page = 1
+        while page:
+            params = {"page": page}
+            if per_page:
+                params["perPage"] = per_page
+            resp = self._get(endpoint=endpoint, params=params, stream=True)
+            listing = JSONArrayStream(resp.iter_content(self.chunk_size), key,
+                                      codec=self.codec)
+            try:
+                for item in listing:
+                    yield item
+            except requests.RequestException:
+                deadline.check()
+                raise
+            finally:
+                resp.close()
+            page = listing.meta.get("nextPage")
+
+    def _partial(self, items, endpoint):
+        """Get items as a generator, stopping when the deadline expires."""
+        try:
+            for item in items:
+                yield item
+        except DeadlineExceeded:
+            logging.getLogger(__name__).warning(
+                "deadline exceeded listing {}".format(endpoint))
+
     def ping(self):
         """Check service reachability."""
-        resp = self._get(endpoint="hello")
-        return resp.json()
+        return self._get_json(endpoint="hello")
 
     def domain(self, name):
         """Get a domain."""
-        resp = self._get(endpoint="domains/{}".format(name))
-        return Domain(session=self, **resp.json())
+        data = self._get_json(endpoint="domains/{}".format(name))
+        return Domain(session=self, **data)
 
     @property
     def domains(self):
-        """Get list of domains as a generator."""
-        resp = self._get(endpoint="domains")
-        if "domains" in resp.json():
-            for domain in resp.json()["domains"]:
-                yield domain["domainName"]
-        else:
-            return
+        """
+        Get list of domains as a generator.
+
+        If the current deadline expires, the generator stops after the
+        domains received so far; deadline.expired() then tells callers
+        that the listing is incomplete.
+        """
+        listing = self._listing(endpoint="domains", key="domains")
+        for domain in self._partial(listing, "domains"):
+            yield domain["domainName"]
+
+    def iter_domains(self, per_page=None):
+        """
+        Get Domain objects for all domains as a generator.
+
+        If the current deadline expires, the generator stops after the
+        domains received so far; deadline.expired() then tells callers
+        that the listing is incomplete.
+        """
+        listing = self._listing(endpoint="domains", key="domains",
+                                per_page=per_page)
+        for domain in self._partial(listing, "domains"):
+            yield Domain(session=self, **domain)
+
+    def subscribe_notification(self, event_name, url):
+        """Subscribe a callback URL to event notifications."""
+        hook_data = {
+            'eventName': event_name,
+            'url': url,
+            'active': True
+        }
+        resp = self._post(endpoint="hooks", data=hook_data)
+        return self._json(resp)
+
+    def search(self, keyword, tlds=None, timeout=None, stop=None):
+        """
+        Search for domain names by keyword, as a generator.
+
+        Results are yielded as each registry responds. If stop is given, it
+        is called with each result and the search is abandoned once it
+        returns True.
+        """
+        search_data = {
+            'keyword': keyword
+        }
+        if tlds:
+            search_data['tldFilter'] = list(tlds)
+        if timeout:
+            search_data['timeout'] = int(timeout * 1000)
+        resp = self._post(endpoint="domains:searchStream",
+                          data=search_data, stream=True)
+        try:
+            for line in resp.iter_lines(chunk_size=None):
+                if not line.strip():
+                    continue
+                with profiling.section("decode"):
+                    result = SearchResult(session=self,
+                                          **self.codec.loads(line))
+                yield result
+                if stop is not None and stop(result):
+                    break
+        finally:
+            resp.close()
 
     def check_availability(self, name):
         """Check domain name availablility."""
+        if self.cache is not None:
+            result = self.cache.get(name, session=self)
+            if result is not None:
+                return result
         search_data = {
             'domainNames': [name]
         }
         resp = self._post(endpoint="domains:checkAvailability",
                           data=search_data)
-        for result in resp.json()['results']:
+        for result in self._json(resp)['results']:
             if result['domainName'] == name:
-                return SearchResult(session=self, **result)
+                result = SearchResult(session=self, **result)
+                if self.cache is not None:
+                    self.cache.put(result)
+                return result
         return False
+
+    def check_availability_bulk(self, names, batch_size=50,
+                                workers=bulk.DEFAULT_WORKERS):
+        """
+        Check availability of many domain names, as a generator.
+
+        Names are consumed lazily and checked in concurrent batches of up to
+        batch_size names per request, skipping any with results in the
+        cache. Results are yielded in completion order. If the current
+        deadline expires, the generator stops after the results received so
+        far.
+        """
+        names = iter(names)
+        batches = iter(lambda: list(itertools.islice(names, batch_size)), [])
+
+        def check(batch):
+            results = []
+            if self.cache is not None:
+                cached = [(name, self.cache.get(name, session=self))
+                          for name in batch]
+                results = [result for _, result in cached
+                           if result is not None]
+                batch = [name for name, result in cached if result is None]
+            if batch:
+                resp = self._post(endpoint="domains:checkAvailability",
+                                  data={'domainNames': batch})
+                for result in self._json(resp).get('results', []):
+                    result = SearchResult(session=self, **result)
+                    if self.cache is not None:
+                        self.cache.put(result)
+                    results.append(result)
+            return results
+
+        for batch, results, error in bulk.execute(check, batches,
+                                                  workers=workers,
+                                                  limiter=self.limiter):
+            if isinstance(error, DeadlineExceeded):
+                logging.getLogger(__name__).warning(
+                    "deadline exceeded checking {}".format(", ".join(batch)))
+                continue
+            if error is not None:
+                raise error
+            for result in results:
+                yield result
@@ -0,0 +1,177 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""pynamedotcom circuit breaker module."""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+import logging
+import threading
+import time
+
+from pynamedotcom.exceptions import CircuitOpenError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker(object):
+    """
+    Circuit breaker around the API endpoint.
+
+    While closed, the outcomes of the last window requests are kept, and
+    once at least min_calls of them include a failure_rate share of
+    failures (connection errors, timeouts or 5xx responses) the circuit
+    opens. While open, requests fail immediately with CircuitOpenError.
+    After reset_timeout seconds the circuit is half-open and lets up to
+    half_open_calls trial requests through: a failed trial opens it again,
+    and once all of them succeed it closes. Only the outcomes of trials
+    count while half-open; requests admitted before are ignored. State
+    changes are kept in history as ``(time, state)`` tuples and passed to
+    subscribed callbacks, outside of the breaker's lock.
+    """
+
+    def __init__(self, failure_rate=0.5, window=20, min_calls=10,
+                 reset_timeout=30, half_open_calls=1, history=100,
+                 clock=time.time):
+        """Construct CircuitBreaker object instance."""
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.rejected = 0
+        self.history = collections.deque(maxlen=history)
+        self.callbacks = []
+        self._clock = clock
+        self._outcomes = collections.deque(maxlen=window)
+        self._state = CLOSED
+        self._opened = None
+        self._trials = 0
+        self._successes = 0
+        self._generation = 0
+        self._changes = []
+        self._lock = threading.RLock()
+        self.history.append((clock(), CLOSED))
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, self.state)
+
+    @property
+    def state(self):
+        """Get the current state."""
+        with self._lock:
+            self._expire()
+            state = self._state
+        self._notify()
+        return state
+
+    @property
+    def failures(self):
+        """Get the share of failures among the recorded requests."""
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return self._outcomes.count(False) / float(len(self._outcomes))
+
+    def subscribe(self, callback):
+        """Register a callback to be called with each new state."""
+        self.callbacks.append(callback)
+        return callback
+
+    def before(self):
+        """
+        Admit a request, or raise CircuitOpenError.
+
+        Returns a token to pass to record with the request's outcome.
+        """
+        try:
+            with self._lock:
+                self._expire()
+                token = (self._state, self._generation)
+                if self._state == CLOSED:
+                    return token
+                if self._state == HALF_OPEN \
+                        and self._trials < self.half_open_calls:
+                    self._trials += 1
+                    return token
+                self.rejected += 1
+                retry = self._opened + self.reset_timeout - self._clock()
+        finally:
+            self._notify()
+        raise CircuitOpenError("circuit open, retry in {:.1f}s"
+                               .format(max(retry, 0)))
+
+    def record(self, success, token=None):
+        """
+        Record the outcome of an admitted request.
+
+        Outcomes reported with the token of an earlier state are ignored;
+        without a token, the outcome applies to the current state.
+        """
+        with self._lock:
+            if token is None:
+                token = (self._state, self._generation)
+            state, generation = token
+            if generation == self._generation and state == HALF_OPEN:
+                self._trial(success)
+            elif generation == self._generation and state == CLOSED:
+                self._outcome(success)
+        self._notify()
+
+    def _trial(self, success):
+        if not success:
+            self._transition(OPEN)
+            return
+        self._successes += 1
+        if self._successes >= self.half_open_calls:
+            self._transition(CLOSED)
+
+    def _outcome(self, success):
+        self._outcomes.append(success)
+        if len(self._outcomes) >= self.min_calls \
+                and self._outcomes.count(False) >= \
+                self.failure_rate * len(self._outcomes):
+            self._transition(OPEN)
+
+    def _expire(self):
+        # trial requests that never report back are given up on after
+        # another reset_timeout
+        if self._state == OPEN or (self._state == HALF_OPEN and
+                                   self._trials >= self.half_open_calls):
+            if self._clock() - self._opened >= self.reset_timeout:
+                self._transition(HALF_OPEN)
+
+    def _transition(self, state):
+        self._state = state
+        self._generation += 1
+        now = self._clock()
+        if state == OPEN:
+            self._opened = now
+        elif state == HALF_OPEN:
+            self._opened = now
+            self._trials = 0
+            self._successes = 0
+        else:
+            self._outcomes.clear()
+        self.history.append((now, state))
+        self._changes.append(state)
+        logging.getLogger(__name__).warning("circuit {}".format(state))
+
+    def _notify(self):
+        # callbacks run outside the lock, so they may use the breaker
+        with self._lock:
+            changes, self._changes = self._changes, []
+        for state in changes:
+            for callback in self.callbacks:
+                callback(state)
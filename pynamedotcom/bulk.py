@@ -0,0 +1,215 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""pynamedotcom bulk operations module."""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+import itertools
+import threading
+import time
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from pynamedotcom import deadline, priority
+from pynamedotcom.exceptions import DeadlineExceeded, OutcomeUnknown
+
+
+DEFAULT_WORKERS = 8
+
+
+class AdaptiveLimiter(object):
+    """
+    Additive-increase/multiplicative-decrease concurrency limit.
+
+    Each observed request that succeeds within latency_factor times the
+    baseline latency grows the limit by increase per limit requests, i.e.
+    by roughly increase per round of concurrent requests. A throttled
+    (429) or failed (5xx or connection error) request, or a latency spike,
+    multiplies the limit by decrease, at most once per cooldown seconds.
+    The baseline follows healthy latencies closely and spikes slowly, by
+    drift of each one, so that it settles at a lasting rise in latency
+    and the limit can recover. Changes to the limit are kept in history
+    as ``(time, limit, reason)`` tuples.
+    """
+
+    def __init__(self, initial=DEFAULT_WORKERS, minimum=1, maximum=64,
+                 increase=1.0, decrease=0.5, latency_factor=3.0,
+                 cooldown=1.0, drift=0.02, history=1000, clock=time.time):
+        """Construct AdaptiveLimiter object instance."""
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.cooldown = cooldown
+        self.drift = drift
+        self.baseline = None
+        self.history = collections.deque(maxlen=history)
+        self._clock = clock
+        self._limit = float(initial)
+        self._last_decrease = None
+        self._lock = threading.Lock()
+        self.history.append((clock(), self.limit, "initial"))
+
+    def __repr__(self):
+        return "{}(limit={})".format(self.__class__.__name__, self.limit)
+
+    @property
+    def limit(self):
+        """Get the current number of requests allowed in flight."""
+        return int(self._limit)
+
+    def observe(self, latency, status=None, error=False):
+        """Adjust the limit for a completed request."""
+        with self._lock:
+            now = self._clock()
+            if error or status == 429 or (status or 0) >= 500:
+                reason = "error {}".format(status or "connection")
+            elif self.baseline is not None \
+                    and latency > self.baseline * self.latency_factor:
+                reason = "latency {:.3f}s".format(latency)
+                self.baseline += (latency - self.baseline) * self.drift
+            else:
+                if self.baseline is None:
+                    self.baseline = latency
+                else:
+                    self.baseline += (latency - self.baseline) * 0.1
+                self._set(min(self.maximum,
+                              self._limit + self.increase / self._limit),
+                          now, "increase")
+                return
+            if self._last_decrease is not None \
+                    and now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self._set(max(self.minimum, self._limit * self.decrease),
+                      now, reason)
+
+    def _set(self, limit, now, reason):
+        previous = self.limit
+        self._limit = float(limit)
+        if self.limit != previous:
+            self.history.append((now, self.limit, reason))
+
+
+class RateLimit(object):
+    """
+    Token bucket limiting the rate at which requests start.
+
+    Up to burst requests may start at once, refilled at rate per second.
+    Waiting for a token respects the deadline active in the calling
+    thread, if any.
+    """
+
+    def __init__(self, rate, burst=None, clock=time.time, sleep=time.sleep):
+        """Construct RateLimit object instance."""
+        self.rate = float(rate)
+        self.burst = burst or max(1, int(rate))
+        self.waited = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "{}({}/s)".format(self.__class__.__name__, self.rate)
+
+    def acquire(self):
+        """Wait until a request may start."""
+        limit = deadline.current()
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens +
+                               (now - self._updated) * self.rate)
+            self._updated = now
+            wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0
+            # no token is taken for a request the deadline cuts short
+            expires = limit is not None and limit.remaining() < wait
+            if not expires:
+                self._tokens -= 1
+                self.waited += wait
+        if expires:
+            self._sleep(limit.remaining())
+            raise DeadlineExceeded("deadline exceeded")
+        if wait:
+            self._sleep(wait)
+
+
+def _window(workers, limiter):
+    """Get the number of calls allowed in flight."""
+    if limiter is None:
+        return workers
+    return min(workers, limiter.limit)
+
+
+def _expire(pending):
+    """Cancel calls pending at the deadline, as a generator."""
+    for future, item in pending.items():
+        if future.cancel():
+            yield item, None, DeadlineExceeded("deadline exceeded")
+        else:
+            yield item, None, OutcomeUnknown("deadline exceeded in flight")
+
+
+def execute(func, items, workers=DEFAULT_WORKERS, limiter=None):
+    """
+    Apply func to items concurrently, as a generator.
+
+    At most ``workers`` calls are in flight at once, or the current limit
+    of limiter if that is lower, and items are consumed lazily. Yields
+    ``(item, result, error)`` tuples in completion order; an exception
+    raised by one call is reported as its error without affecting the
+    others.
+
+    Calls run at the priority active in the calling thread, or BULK if
+    none is, and under the deadline active in the calling thread, if any.
+    Once it expires no further items are consumed, calls that had not
+    started are yielded with a DeadlineExceeded error, calls still running
+    with an OutcomeUnknown error, and the generator returns.
+    """
+    items = iter(items)
+    pending = {}
+    limit = deadline.current()
+    func = priority.bind(deadline.bind(func))
+
+    def window():
+        if limit is not None and limit.expired:
+            return 0
+        return _window(workers, limiter)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    expired = False
+    try:
+        def submit(count):
+            for item in itertools.islice(items, max(count, 0)):
+                pending[executor.submit(func, item)] = item
+        submit(window())
+        while pending:
+            timeout = limit.remaining() if limit is not None else None
+            done, _ = wait(pending, timeout=timeout,
+                           return_when=FIRST_COMPLETED)
+            if not done:
+                expired = True
+                for expiry in _expire(pending):
+                    yield expiry
+                return
+            for future in done:
+                item = pending.pop(future)
+                error = future.exception()
+                result = None if error is not None else future.result()
+                yield item, result, error
+            submit(window() - len(pending))
+    finally:
+        executor.shutdown(wait=not expired)
@@ -0,0 +1,164 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""pynamedotcom availability cache module."""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+import json
+import sqlite3
+import threading
+import time
+
+from pynamedotcom.candidates import normalise
+from pynamedotcom.search import SearchResult
+
+
+class AvailabilityCache(object):
+    """
+    Cache of SearchResult objects keyed by normalised name.
+
+    Available and unavailable results expire after separate TTLs. Cached
+    purchasable or premium results older than price_max_age, which should
+    be shorter than available_ttl, are returned with ``stale`` set, since
+    their prices may have changed. At most max_entries results are held
+    in memory, evicting the least recently stored. If path is given,
+    entries are also stored in a SQLite database there so that they can
+    be shared between processes.
+    """
+
+    def __init__(self, available_ttl=300, unavailable_ttl=86400,
+                 price_max_age=60, max_entries=100000, path=None,
+                 clock=time.time):
+        """Construct AvailabilityCache object instance."""
+        self.available_ttl = available_ttl
+        self.unavailable_ttl = unavailable_ttl
+        self.price_max_age = price_max_age
+        self.max_entries = max_entries
+        self.path = path
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if path:
+            with self._db as db:
+                db.execute("CREATE TABLE IF NOT EXISTS results "
+                           "(name TEXT PRIMARY KEY, stored REAL, "
+                           "available INTEGER, data TEXT)")
+
+    def __repr__(self):
+        return "{}({} entries)".format(self.__class__.__name__,
+                                       len(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def _db(self):
+        """Get the SQLite connection for the current thread."""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=30)
+        return db
+
+    @staticmethod
+    def _key(name):
+        """Get the cache key for a name, as normalised as possible."""
+        try:
+            return normalise(name)
+        except ValueError:
+            return name.strip().rstrip(".").lower()
+
+    def _store(self, key, entry):
+        """Hold an entry in memory, evicting the oldest beyond the limit."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _expired(self, entry, now):
+        """Check whether an entry is missing or has expired."""
+        if entry is None:
+            return True
+        stored, data = entry
+        if data.get("purchasable"):
+            return now - stored > self.available_ttl
+        return now - stored > self.unavailable_ttl
+
+    def get(self, name, session=None):
+        """Get a cached result, or None if absent or expired."""
+        key = self._key(name)
+        now = self.clock()
+        entry = self._entries.get(key)
+        if self.path and self._expired(entry, now):
+            row = self._db.execute("SELECT stored, data FROM results "
+                                   "WHERE name = ?", (key,)).fetchone()
+            if row is not None:
+                entry = (row[0], json.loads(row[1]))
+                self._store(key, entry)
+        expired = self._expired(entry, now)
+        with self._lock:
+            if expired:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if expired:
+            return None
+        stored, data = entry
+        result = SearchResult(session=session, **data)
+        if data.get("purchasable") or data.get("premium"):
+            result._stale = now - stored > self.price_max_age
+        return result
+
+    def put(self, result):
+        """Store a result."""
+        key = self._key(result.name)
+        entry = (self.clock(), result.data)
+        self._store(key, entry)
+        if self.path:
+            with self._db as db:
+                db.execute("INSERT OR REPLACE INTO results "
+                           "VALUES (?, ?, ?, ?)",
+                           (key, entry[0], bool(result.purchasable),
+                            json.dumps(entry[1])))
+        return result
+
+    def invalidate(self, name):
+        """Remove a cached result."""
+        key = self._key(name)
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.path:
+            with self._db as db:
+                db.execute("DELETE FROM results WHERE name = ?", (key,))
+
+    def apply_notification(self, notification):
+        """Forget the cached availability of a domain after an event."""
+        self.invalidate(notification.domain_name)
+
+    def purge(self):
+        """Remove expired entries."""
+        now = self.clock()
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if self._expired(entry, now):
+                    del self._entries[key]
+        if self.path:
+            with self._db as db:
+                db.execute("DELETE FROM results WHERE stored < CASE "
+                           "WHEN available THEN ? ELSE ? END",
+                           (now - self.available_ttl,
+                            now - self.unavailable_ttl))
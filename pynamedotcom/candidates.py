@@ -0,0 +1,121 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""pynamedotcom candidate name generation module."""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import hashlib
+import itertools
+import math
+import struct
+
+
+def normalise(name):
+    """Normalise a domain name to lower-case IDNA form."""
+    name = name.strip().rstrip(".").lower()
+    labels = name.split(".")
+    if len(labels) < 2 or not all(labels):
+        raise ValueError("invalid domain name '{}'".format(name))
+    try:
+        return name.encode("idna").decode("ascii")
+    except UnicodeError as e:
+        raise ValueError("invalid domain name '{}': {}".format(name, e))
+
+
+def generate(keywords, tlds, prefixes=None, suffixes=None):
+    """
+    Generate normalised candidate names, as a generator.
+
+    Every combination of optional prefix, keyword, optional suffix and TLD
+    is produced lazily. Duplicates and names that are not valid under IDNA
+    are skipped.
+    """
+    prefixes = [""] + list(prefixes or [])
+    suffixes = [""] + list(suffixes or [])
+    seen = set()
+    for keyword, prefix, suffix, tld in itertools.product(
+            keywords, prefixes, suffixes, tlds):
+        try:
+            name = normalise("{}{}{}.{}".format(prefix, keyword, suffix,
+                                                tld.lstrip(".")))
+        except ValueError:
+            continue
+        if name not in seen:
+            seen.add(name)
+            yield name
+
+
+class BloomFilter(object):
+    """Bloom filter set of names."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        """Construct BloomFilter object instance."""
+        self.size = int(math.ceil(-capacity * math.log(error_rate) /
+                                  math.log(2) ** 2))
+        hashes = self.size / float(capacity) * math.log(2)
+        self.hashes = max(1, int(round(hashes)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def __repr__(self):
+        return "{}(size={}, hashes={})".format(self.__class__.__name__,
+                                               self.size, self.hashes)
+
+    def _positions(self, name):
+        """Get the bit positions for a name by double hashing."""
+        digest = hashlib.sha1(name.encode("utf-8")).digest()
+        h1, h2 = struct.unpack("<QQ", digest[:16])
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, name):
+        """Add a name."""
+        for position in self._positions(name):
+            self.bits[position // 8] |= 1 << (position % 8)
+
+    def update(self, names):
+        """Add several names."""
+        for name in names:
+            self.add(name)
+
+    def __contains__(self, name):
+        """Check whether a name has (probably) been added."""
+        return all(self.bits[position // 8] & (1 << (position % 8))
+                   for position in self._positions(name))
+
+
+def known_names(owned=(), results=(), capacity=None, error_rate=0.001):
+    """
+    Build an index of names known not to be available.
+
+    owned is an iterable of names in our own account, such as API.domains,
+    and results an iterable of past SearchResult objects. If capacity is
+    given, a BloomFilter sized for that many names is used instead of a
+    set, trading a small false positive rate for a compact index.
+    """
+    if capacity:
+        index = BloomFilter(capacity=capacity, error_rate=error_rate)
+    else:
+        index = set()
+    for name in owned:
+        index.add(normalise(name))
+    for result in results:
+        if not result.purchasable:
+            index.add(normalise(result.name))
+    return index
+
+
+def survivors(names, index):
+    """Filter out names present in index, as a generator."""
+    for name in names:
+        if name not in index:
+            yield name
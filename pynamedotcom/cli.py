@@ -17,14 +17,42 @@ import click
 import json
 import logging
 import os
+import subprocess
+import sys
 
 from argparse import Namespace
 
-from pynamedotcom import API
+from pynamedotcom import API, zonefile
+from pynamedotcom.accounts import Accounts
+from pynamedotcom.bulk import DEFAULT_WORKERS
+from pynamedotcom.contact import update_contacts
+from pynamedotcom.deadline import Deadline
+from pynamedotcom.domain import format_time
+from pynamedotcom.expiry import ExpiryIndex, parse_duration
+from pynamedotcom.export import FORMATS, as_dict, export as export_domains
+from pynamedotcom.nameindex import NameIndex, default_path as index_path
+from pynamedotcom.notifications import Receiver
+from pynamedotcom.priority import NORMAL, Priority
+from pynamedotcom.profiling import ENV_VAR as PROFILE_ENV_VAR, Profiler
+from pynamedotcom.replay import Recorder, Replayer, bench as run_bench, load
+from pynamedotcom.search import top_by_price
+from pynamedotcom.watch import Watcher
 
 
 logger = logging.getLogger(__name__)
 
+# Environment variables that may hold the -u/-t credentials
+USER_ENV_VAR = "PYNAMEDOTCOM_USERNAME"
+TOKEN_ENV_VAR = "PYNAMEDOTCOM_TOKEN"
+
+# Name of the completion callback argument: shell_complete in click 8,
+# autocompletion in click 7
+try:
+    import click.shell_completion  # noqa
+    COMPLETION = "shell_complete"
+except ImportError:  # pragma: no cover
+    COMPLETION = "autocompletion"
+
 
 def _default_auth_path():  # pragma: no cover
     """Try and find the default auth-file, if it exists."""
@@ -40,6 +68,47 @@ def _default_auth_path():  # pragma: no cover
     return None
 
 
+def _refresh_index(params):
+    """Refresh the domain name index in a detached process."""
+    args = [sys.executable, "-c", "from pynamedotcom.cli import main; main()",
+            "--host", params.get("host") or "api.name.com"]
+    if params.get("auth_file"):
+        args += ["--auth-file", params["auth_file"]]
+    args.append("index")
+    env = dict((key, value) for key, value in os.environ.items()
+               if not key.endswith("_COMPLETE"))
+    # Pass credentials in the environment, where ps does not show them
+    for option, name in (("username", USER_ENV_VAR),
+                         ("token", TOKEN_ENV_VAR)):
+        if params.get(option):
+            env[name] = params[option]
+    with open(os.devnull, "r+") as devnull:
+        subprocess.Popen(args, stdin=devnull, stdout=devnull,
+                         stderr=devnull, env=env, close_fds=True)
+
+
+def _complete_domains(ctx, param, incomplete):
+    """Complete domain names from the local index, without the network."""
+    params = ctx.find_root().params
+    index = NameIndex(index_path(params.get("host") or "api.name.com"))
+    if index.stale:
+        # mark the index fresh so that only one refresh is started
+        index.touch()
+        _refresh_index(params)
+    return index.complete(incomplete)
+
+
+def _complete_domains_click7(ctx, args, incomplete):
+    """Complete domain names, with the click 7 callback signature."""
+    return _complete_domains(ctx, None, incomplete)
+
+
+if COMPLETION == "shell_complete":
+    DOMAIN_COMPLETION = {COMPLETION: _complete_domains}
+else:  # pragma: no cover
+    DOMAIN_COMPLETION = {COMPLETION: _complete_domains_click7}
+
+
 def _set_log_level(ctx, param, value):
     """Set logging level according to the --debug flag."""
     if value:
@@ -57,16 +126,36 @@ def _set_log_level(ctx, param, value):
               help="Enable debug logging.")
 @click.option("-h", "--host", default="api.name.com",
               help="Server hostname.", show_default=True)
-@click.option("-u", "--username",
+@click.option("-u", "--username", envvar=USER_ENV_VAR,
               help="name.com username. Overides --auth-file.")
-@click.option('-t', "--token",
+@click.option('-t', "--token", envvar=TOKEN_ENV_VAR,
               help="name.com API token. Overides --auth-file")
 @click.option("-f", "--auth-file", type=click.Path(exists=True),
               default=_default_auth_path(), show_default=True,
               help="Read credentials from file.")
+@click.option("-p", "--profile", type=click.Path(dir_okay=False),
+              envvar=PROFILE_ENV_VAR,
+              help="Write cProfile stats to file and print a summary.")
+@click.option("--profile-top", type=int, default=20, show_default=True,
+              help="Number of functions to include in profile summary.")
+@click.option("--timeout", type=float,
+              help="Connect and read timeout per request, in seconds.")
+@click.option("--deadline", type=float,
+              help="Time limit for the whole command, in seconds.")
+@click.option("--record", type=click.Path(dir_okay=False),
+              help="Append requests and responses to file for replay.")
 @click.version_option()
-def main(ctx, host, auth_file, username, token):
+def main(ctx, host, auth_file, username, token, profile, profile_top,
+         timeout, deadline, record):
     """CLI tool for interacting with the name.com API."""
+    # Start profiling if requested, and stop when the command completes
+    if profile:
+        profiler = Profiler(path=profile, top=profile_top).start()
+        ctx.call_on_close(profiler.stop)
+    # Apply the deadline to all requests until the command completes
+    if deadline is not None:
+        limit = Deadline(deadline).__enter__()
+        ctx.call_on_close(lambda: limit.__exit__(None, None, None))
     # Get credentials from file or CLI options
     auth = {"user": None, "token": None}
     # Try reading from file
@@ -81,14 +170,24 @@ def main(ctx, host, auth_file, username, token):
         auth["token"] = token
     logger.debug("connecting to {} as {}".format(host, auth["user"]))
 
+    # Set per-request timeouts if requested
+    timeouts = {}
+    if timeout is not None:
+        timeouts = {"connect_timeout": timeout, "read_timeout": timeout}
+
     # Declare helper function
     def api():
         """Helper function to return configured pynamedotcom.API instance."""
-        return API(host=host, **auth)
+        if record:
+            return API(host=host, transport=Recorder(record),
+                       **dict(auth, **timeouts))
+        return API(host=host, **dict(auth, **timeouts))
 
     ctx.obj = Namespace()
     # Add helper to click Context.obj to pass to command functions
     ctx.obj.api = api
+    # Keep connection options for clients of other accounts
+    ctx.obj.options = dict(timeouts, host=host)
 
 
 @main.command()
@@ -121,9 +220,299 @@ def domains(ctx):
             ctx.fail(message="{}".format(e))
 
 
+@main.command()
+@click.pass_context
+@click.argument("output", type=click.Path(dir_okay=False, allow_dash=True),
+                default="-")
+@click.option("--format", "fmt", type=click.Choice(FORMATS), default="jsonl",
+              show_default=True, help="Output format.")
+@click.option("--contacts/--no-contacts", default=True, show_default=True,
+              help="Fetch and include domain contacts.")
+@click.option("-w", "--workers", type=int, default=DEFAULT_WORKERS,
+              show_default=True, help="Maximum concurrent domain fetches.")
+def export(ctx, output, fmt, contacts, workers):
+    """Export all domains to OUTPUT (default stdout)."""
+    mode = "wb" if fmt == "parquet" else "w"
+    # Use provided helper to instantiate pynamedotcom.API object
+    with ctx.obj.api() as api:
+        try:
+            # Stream domains to the output file as they arrive
+            with click.open_file(output, mode) as f:
+                export_domains(api, f, format=fmt, contacts=contacts,
+                               workers=workers)
+        except Exception as e:  # pragma: no cover
+            # fail cleanly
+            ctx.fail(message="{}".format(e))
+
+
+@main.command()
+@click.pass_context
+@click.option("-w", "--within", default="30d", show_default=True,
+              help="Time window, e.g. 12h, 30d or 2w.")
+@click.option("--max-age", type=float, default=3600, show_default=True,
+              help="Rebuild the local expiry index if older, in seconds.")
+def expiring(ctx, within, max_age):
+    """Get domains expiring within a time window."""
+    try:
+        window = parse_duration(within)
+    except ValueError as e:
+        ctx.fail(message="{}".format(e))
+    path = index_path(ctx.obj.options["host"], suffix="expiry")
+    # Use provided helper to instantiate pynamedotcom.API object
+    with ctx.obj.api() as api:
+        try:
+            # Query the saved index, rebuilding it from the listing if old
+            index = ExpiryIndex().cached(api, path, max_age=max_age)
+            for name, expiry in index.within(window):
+                click.echo("{} {}".format(format_time(expiry), name))
+        except Exception as e:  # pragma: no cover
+            # fail cleanly
+            ctx.fail(message="{}".format(e))
+
+
+@main.command(name="set-contacts")
+@click.pass_context
+@click.argument("contacts_file", type=click.File("r"))
+@click.argument("names", nargs=-1, **DOMAIN_COMPLETION)
+@click.option("-w", "--workers", type=int, default=DEFAULT_WORKERS,
+              show_default=True, help="Maximum concurrent domain updates.")
+def set_contacts(ctx, contacts_file, names, workers):
+    """
+    Set contacts from CONTACTS_FILE on NAMES (default all domains).
+
+    CONTACTS_FILE is a JSON object mapping roles to contact fields;
+    fields left out keep their current values.
+    """
+    try:
+        contacts = json.load(contacts_file)
+    except ValueError as e:
+        ctx.fail(message="invalid contacts file: {}".format(e))
+    failed = 0
+    # Use provided helper to instantiate pynamedotcom.API object
+    with ctx.obj.api() as api:
+        try:
+            # Report each domain as its update completes
+            for report in update_contacts(api, contacts, names=names or None,
+                                          workers=workers):
+                if report.ok:
+                    click.echo("{} {} {}".format(report.name, report.status,
+                                                 " ".join(report.roles)))
+                else:
+                    failed += 1
+                    click.echo("{} {} {}".format(report.name, report.status,
+                                                 report.error), err=True)
+        except Exception as e:  # pragma: no cover
+            # fail cleanly
+            ctx.fail(message="{}".format(e))
+    if failed:
+        ctx.exit(1)
+
+
+@main.command()
+@click.pass_context
+@click.option("-i", "--interval", type=float, default=60, show_default=True,
+              help="Minimum seconds between polls.")
+@click.option("-m", "--max-interval", type=float, default=3600,
+              show_default=True, help="Maximum seconds between polls.")
+@click.option("-n", "--polls", type=int,
+              help="Stop after N polls. Runs forever by default.")
+def watch(ctx, interval, max_interval, polls):
+    """Watch domains for changes, printing events as JSON lines."""
+    # Use provided helper to instantiate pynamedotcom.API object
+    with ctx.obj.api() as api:
+        try:
+            # Print each event as it is emitted
+            watcher = Watcher(api, interval=interval,
+                              max_interval=max_interval)
+            watcher.subscribe(lambda event: click.echo(
+                json.dumps(event.as_dict(), sort_keys=True)))
+            watcher.run(polls=polls)
+        except KeyboardInterrupt:  # pragma: no cover
+            pass
+        except Exception as e:  # pragma: no cover
+            # fail cleanly
+            ctx.fail(message="{}".format(e))
+
+
+@main.command()
+@click.pass_context
+@click.option("-l", "--listen", "address", default="127.0.0.1",
+              show_default=True, help="Address to listen on.")
+@click.option("-p", "--port", type=int, default=8080, show_default=True,
+              help="Port to listen on.")
+@click.option("--path", default="/", show_default=True,
+              help="Callback URL path.")
+@click.option("--token", help="Require ?token=TOKEN on callbacks.")
+@click.option("-s", "--subscribe", "events", multiple=True,
+              help="Subscribe --callback-url to EVENT. May be repeated.")
+@click.option("--callback-url",
+              help="Public URL of this receiver, used with --subscribe.")
+def listen(ctx, address, port, path, token, events, callback_url):
+    """
+    Receive event notifications, printing them as JSON lines.
+
+    The local expiry index used by 'expiring' is kept up to date.
+    """
+    if events and not callback_url:
+        ctx.fail(message="--subscribe requires --callback-url")
+    index_file = index_path(ctx.obj.options["host"], suffix="expiry")
+    # Use provided helper to instantiate pynamedotcom.API object
+    with ctx.obj.api() as api:
+        try:
+            for event in events:
+                api.subscribe_notification(event_name=event, url=callback_url)
+            expiry_index = ExpiryIndex().cached(api, index_file)
+            with Receiver(host=address, port=port, path=path, token=token,
+                          stores=[expiry_index]) as receiver:
+                logger.info("listening on {}".format(receiver.url))
+                for notification in receiver.events():
+                    if notification.expiry is not None:
+                        expiry_index.save(index_file)
+                    click.echo(json.dumps(notification.as_dict(),
+                                          sort_keys=True))
+        except KeyboardInterrupt:  # pragma: no cover
+            pass
+        except Exception as e:  # pragma: no cover
+            # fail cleanly
+            ctx.fail(message="{}".format(e))
+
+
+@main.group()
+@click.pass_context
+@click.option("-a", "--accounts-file", required=True,
+              type=click.Path(exists=True, dir_okay=False),
+              help="Read credentials of many accounts from file.")
+@click.option("-r", "--rate", type=float,
+              help="Maximum requests per second per account.")
+@click.option("-w", "--workers", type=int, default=DEFAULT_WORKERS,
+              show_default=True,
+              help="Maximum concurrent requests per account.")
+def accounts(ctx, accounts_file, rate, workers):
+    """Run commands across many accounts."""
+    # Declare helper function
+    def client():
+        """Helper function to return configured Accounts instance."""
+        return Accounts.from_file(accounts_file, rate=rate, workers=workers,
+                                  **ctx.obj.options)
+
+    # Add helper to click Context.obj to pass to command functions
+    ctx.obj.accounts = client
+
+
+def _echo_account_results(ctx, results, fmt):
+    """Print tagged results, reporting failed accounts at the end."""
+    failed = []
+    for result in results:
+        if result.error is not None:
+            failed.append(result.account)
+            click.echo(click.style("{}: {}".format(result.account,
+                                                   result.error), fg="red"),
+                       err=True)
+        else:
+            click.echo(fmt(result))
+    if failed:
+        ctx.fail(message="failed accounts: {}".format(", ".join(failed)))
+
+
+@accounts.command(name="domains")
+@click.pass_context
+def accounts_domains(ctx):
+    """Get domain names in all accounts."""
+    # Use provided helper to instantiate pynamedotcom.accounts.Accounts
+    with ctx.obj.accounts() as client:
+        _echo_account_results(ctx, client.domains(), lambda result: "{} {}"
+                              .format(result.account, result.result))
+
+
+@accounts.command(name="export")
+@click.pass_context
+@click.option("--contacts/--no-contacts", default=True, show_default=True,
+              help="Fetch and include domain contacts.")
+def accounts_export(ctx, contacts):
+    """Export domains in all accounts as JSON lines."""
+    # Use provided helper to instantiate pynamedotcom.accounts.Accounts
+    with ctx.obj.accounts() as client:
+        _echo_account_results(
+            ctx, client.fetch_domains(contacts=contacts),
+            lambda result: json.dumps(dict(as_dict(result.result),
+                                           account=result.account),
+                                      sort_keys=True))
+
+
+@accounts.command(name="check")
+@click.pass_context
+@click.argument("names", nargs=-1, required=True)
+def accounts_check(ctx, names):
+    """Check availability of NAMES, spread over all accounts."""
+    def fmt(result):
+        if result.result.purchasable:
+            return "{} {} available ${}".format(result.account,
+                                                result.result.name,
+                                                result.result.purchase_price)
+        return "{} {} unavailable".format(result.account, result.result.name)
+
+    # Use provided helper to instantiate pynamedotcom.accounts.Accounts
+    with ctx.obj.accounts() as client:
+        _echo_account_results(ctx, client.check_availability_bulk(names), fmt)
+
+
+@main.command()
+@click.pass_context
+def index(ctx):
+    """Refresh the local domain name index used for completion."""
+    # Use provided helper to instantiate pynamedotcom.API object
+    with ctx.obj.api() as api:
+        try:
+            # Rebuild the index from the domains listing
+            count = NameIndex(index_path(ctx.obj.options["host"])) \
+                .refresh(api)
+            logger.info("indexed {} domains".format(count))
+        except Exception as e:  # pragma: no cover
+            # fail cleanly
+            ctx.fail(message="{}".format(e))
+
+
+@main.command()
+@click.pass_context
+@click.argument("recording", type=click.Path(exists=True, dir_okay=False))
+@click.option("-n", "--requests", "total", type=int,
+              help="Number of requests.  [default: one pass]")
+@click.option("-c", "--concurrency", type=int, default=DEFAULT_WORKERS,
+              show_default=True, help="Number of concurrent workers.")
+@click.option("-s", "--speed", type=float, default=1.0, show_default=True,
+              help="Replay speed multiple, or 0 for no delay.")
+def bench(ctx, recording, total, concurrency, speed):
+    """Replay RECORDING locally and report throughput and latency."""
+    try:
+        entries = load(recording)
+    except (IOError, ValueError) as e:
+        ctx.fail(message="invalid recording: {}".format(e))
+    if not entries:
+        ctx.fail(message="no requests in {}".format(recording))
+    # Serve the recording instead of connecting to the host
+    transport = Replayer(entries, speed=speed)
+    with API(transport=transport, pool_size=concurrency,
+             **ctx.obj.options) as api:
+        try:
+            result = run_bench(api, entries, total=total,
+                               workers=concurrency)
+        except Exception as e:  # pragma: no cover
+            # fail cleanly
+            ctx.fail(message="{}".format(e))
+    click.echo("requests {} errors {} elapsed {:.3f}s throughput {:.1f}/s"
+               .format(result.count, sum(result.errors.values()),
+                       result.elapsed, result.throughput))
+    if result.count:
+        click.echo(" ".join("p{} {:.1f}ms".format(p, result.percentile(p)
+                                                  * 1000)
+                            for p in (50, 90, 99, 100)))
+    for name, count in sorted(result.errors.items()):
+        click.echo("{} {}".format(name, count), err=True)
+
+
 @main.group(invoke_without_command=True)
 @click.pass_context
-@click.argument("name")
+@click.argument("name", **DOMAIN_COMPLETION)
 def domain(ctx, name):
     """Get domain details."""
     # Record args in Context
@@ -145,8 +534,8 @@ def domain(ctx, name):
                 click.echo("  privacy: {}".format(domain.privacy))
                 click.echo("  locked: {}".format(domain.locked))
                 click.echo("  autorenew: {}".format(domain.autorenew))
-                click.echo("  expiry: {}".format(domain.expiry))
-                click.echo("  created: {}".format(domain.created))
+                click.echo("  expiry: {}".format(format_time(domain.expiry)))
+                click.echo("  created: {}".format(format_time(domain.created)))
                 click.echo("  renewal price: ${}".format(domain.renewal_price))
             except Exception as e:  # pragma: no cover
                 # fail cleanly
@@ -271,7 +660,7 @@ def expiry(ctx):
         try:
             # Execute method and print the domain details
             domain = api.domain(name=ctx.obj.name)
-            click.echo("{}".format(domain.expiry))
+            click.echo("{}".format(format_time(domain.expiry)))
         except Exception as e:  # pragma: no cover
             # fail cleanly
             ctx.fail(message="{}".format(e))
@@ -286,7 +675,7 @@ def created(ctx):
         try:
             # Execute method and print the domain details
             domain = api.domain(name=ctx.obj.name)
-            click.echo("{}".format(domain.created))
+            click.echo("{}".format(format_time(domain.created)))
         except Exception as e:  # pragma: no cover
             # fail cleanly
             ctx.fail(message="{}".format(e))
@@ -310,8 +699,21 @@ def renewal_price(ctx):
 @main.command()
 @click.pass_context
 @click.argument("name")
-def search(ctx, name):
+@click.option("-s", "--stream", is_flag=True,
+              help="Treat NAME as a keyword and stream matching results.")
+@click.option("--tld", "tlds", multiple=True,
+              help="Restrict a streamed search to TLD. May be repeated.")
+@click.option("--top", type=int,
+              help="Only show the cheapest N available results.")
+@click.option("--max-results", type=int,
+              help="Stop a streamed search after N available results.")
+def search(ctx, name, stream, tlds, top, max_results):
     """Search for domain availablility."""
+    if not stream and (tlds or top is not None or max_results is not None):
+        ctx.fail(message="--tld, --top and --max-results require --stream")
+    if stream:
+        return _search_stream(ctx, keyword=name, tlds=tlds, top=top,
+                              max_results=max_results)
     # Use provided helper to instantiate pynamedotcom.API object
     with ctx.obj.api() as api:
         try:
@@ -331,3 +733,94 @@ def search(ctx, name):
         except Exception as e:  # pragma: no cover
             # fail cleanly
             ctx.fail(message="{}".format(e))
+
+
+def _echo_result(result):
+    """Print a single search result line."""
+    if result.purchasable:
+        click.echo(click.style("{}: ${}".format(result.name,
+                                                result.purchase_price),
+                               fg="green"))
+    else:
+        click.echo(click.style("{}: not available".format(result.name),
+                               fg="red"))
+
+
+def _search_stream(ctx, keyword, tlds, top, max_results):
+    """Stream keyword search results."""
+    state = {"available": 0}
+
+    def stop(result):
+        if result.purchasable:
+            state["available"] += 1
+        return max_results is not None and state["available"] >= max_results
+
+    # Use provided helper to instantiate pynamedotcom.API object
+    with ctx.obj.api() as api:
+        try:
+            # Execute method and print results as they arrive
+            results = api.search(keyword=keyword, tlds=tlds, stop=stop)
+            if top:
+                results = top_by_price(results, top)
+            for result in results:
+                _echo_result(result)
+        except Exception as e:  # pragma: no cover
+            # fail cleanly
+            ctx.fail(message="{}".format(e))
+
+
+@main.group()
+@click.pass_context
+def records(ctx):
+    """Import or export domain DNS records."""
+    pass
+
+
+@records.command(name="export")
+@click.pass_context
+@click.argument("name", **DOMAIN_COMPLETION)
+@click.argument("file", type=click.File("w"), default="-")
+def export_records(ctx, name, file):
+    """Export domain records to a BIND zone file."""
+    # Use provided helper to instantiate pynamedotcom.API object
+    with ctx.obj.api() as api:
+        try:
+            # Stream records to the zone file as pages arrive
+            domain = api.domain(name=name)
+            zonefile.write(domain.records, file, domain=domain.name)
+        except Exception as e:  # pragma: no cover
+            # fail cleanly
+            ctx.fail(message="{}".format(e))
+
+
+@records.command(name="import")
+@click.pass_context
+@click.argument("name", **DOMAIN_COMPLETION)
+@click.argument("file", type=click.File("r"))
+@click.option("-w", "--workers", type=int, default=DEFAULT_WORKERS,
+              show_default=True, help="Maximum concurrent changes.")
+def import_records(ctx, name, file, workers):
+    """Replace domain records from a BIND zone file."""
+    # Use provided helper to instantiate pynamedotcom.API object
+    with ctx.obj.api() as api:
+        try:
+            # Parse the zone file and apply the differences
+            domain = api.domain(name=name)
+            desired = zonefile.parse(file, domain=domain.name)
+            # An import is interactive work, not background bulk work
+            with Priority(NORMAL):
+                changes = domain.records.sync(desired, workers=workers)
+        except Exception as e:  # pragma: no cover
+            # fail cleanly
+            ctx.fail(message="{}".format(e))
+        # Report the outcome of each change
+        for change in changes:
+            if change.ok:
+                status = click.style("OK", fg="green")
+            elif change.unknown:
+                status = click.style("unknown", fg="yellow")
+            else:
+                status = click.style("{}".format(change.error), fg="red")
+            click.echo("{}: {}".format(change, status))
+        if not all(change.ok for change in changes):
+            ctx.exit(code=1)
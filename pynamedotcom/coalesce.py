@@ -0,0 +1,76 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""pynamedotcom request coalescing module."""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+import copy
+import threading
+
+
+class _Call(object):
+    """In-flight call shared between callers."""
+
+    def __init__(self):
+        """Construct _Call object instance."""
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Coalesce concurrent calls with the same key.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait for it and receive a copy of its result, or the same
+    exception. Calls in flight when fence is called are not joined.
+    """
+
+    def __init__(self):
+        """Construct SingleFlight object instance."""
+        self.coalesced = collections.Counter()
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, label=None):
+        """Call func, or wait for an in-flight call with the same key."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced[label or key] += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+
+    def fence(self):
+        """Stop later callers joining calls now in flight."""
+        with self._lock:
+            self._calls.clear()
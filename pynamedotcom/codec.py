@@ -0,0 +1,237 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""pynamedotcom JSON codec module."""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+from pynamedotcom import profiling
+
+
+class JSONCodec(object):
+    """JSON codec class using the standard library json module."""
+
+    name = "json"
+
+    def loads(self, data):
+        """Decode a JSON document from bytes or text."""
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        return json.loads(data)
+
+    def dumps(self, obj):
+        """Encode an object as a JSON document in bytes."""
+        return json.dumps(obj).encode("utf-8")
+
+
+class OrjsonCodec(JSONCodec):
+    """JSON codec class using orjson."""
+
+    name = "orjson"
+
+    def loads(self, data):
+        """Decode a JSON document from bytes or text."""
+        return orjson.loads(data)
+
+    def dumps(self, obj):
+        """Encode an object as a JSON document in bytes."""
+        return orjson.dumps(obj)
+
+
+class Serialised(bytes):
+    """Request body that has already been encoded, to be sent as is."""
+
+    pass
+
+
+CODECS = {JSONCodec.name: JSONCodec}
+if orjson is not None:
+    CODECS[OrjsonCodec.name] = OrjsonCodec
+
+
+def get_codec(codec=None):
+    """Get a codec instance by name, preferring orjson if installed."""
+    if isinstance(codec, JSONCodec):
+        return codec
+    if codec is None:
+        codec = OrjsonCodec.name if OrjsonCodec.name in CODECS \
+            else JSONCodec.name
+    try:
+        return CODECS[codec]()
+    except KeyError:
+        raise ValueError("unknown JSON codec {}, choose from {}"
+                         .format(codec, sorted(CODECS)))
+
+
+class _ArrayScanner(object):
+    """
+    Find the boundaries of JSON array members in a byte stream.
+
+    Only strings and brackets are examined, and each byte is scanned once
+    however many chunks a member is split over.
+    """
+
+    _separator = re.compile(br"[\s,]*")
+    _scalar_end = re.compile(br"[\s,\]]")
+    _string = re.compile(br'[^"\\]*(?:\\.[^"\\]*)*(")?')
+    _token = re.compile(br'(?:[^"{}\[\]]+|"[^"\\]*(?:\\.[^"\\]*)*")*'
+                        br'([{}\[\]"])?')
+
+    def __init__(self):
+        """Construct _ArrayScanner object instance."""
+        self.buf = bytearray()
+        self.start = 0
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.done = False
+        self.rest = b""
+
+    def feed(self, data):
+        """Add data and return the members completed by it, as bytes."""
+        del self.buf[:self.start]
+        self.pos -= self.start
+        self.start = 0
+        self.buf += data
+        members = []
+        while not self.done:
+            if self.in_string:
+                progressed = self._skip_string(members)
+            elif self.depth:
+                progressed = self._skip_structure(members)
+            else:
+                progressed = self._begin(members)
+            if not progressed:
+                break
+        return members
+
+    def _emit(self, members):
+        members.append(bytes(self.buf[self.start:self.pos]))
+        self.start = self.pos
+
+    def _begin(self, members):
+        """Skip separators and start the next member."""
+        self.start = self.pos = self._separator.match(self.buf,
+                                                      self.start).end()
+        first = self.buf[self.start:self.start + 1]
+        if not first:
+            return False
+        if first == b"]":
+            self.done = True
+            self.rest = bytes(self.buf[self.start + 1:])
+            return False
+        if first in (b"{", b"[", b'"'):
+            self.in_string = first == b'"'
+            self.depth = 0 if self.in_string else 1
+            self.pos += 1
+            return True
+        match = self._scalar_end.search(self.buf, self.start)
+        if match is None:
+            return False
+        self.pos = match.start()
+        self._emit(members)
+        return True
+
+    def _skip_string(self, members):
+        """Advance past the end of the current string, if received."""
+        match = self._string.match(self.buf, self.pos)
+        self.pos = match.end()
+        if match.group(1) is None:
+            return False
+        self.in_string = False
+        if not self.depth:
+            self._emit(members)
+        return True
+
+    def _skip_structure(self, members):
+        """Advance past complete strings to the next bracket."""
+        match = self._token.match(self.buf, self.pos)
+        self.pos = match.end()
+        token = match.group(1)
+        if token is None:
+            return False
+        if token == b'"':
+            self.in_string = True
+        elif token in (b"{", b"["):
+            self.depth += 1
+        else:
+            self.depth -= 1
+            if not self.depth:
+                self._emit(members)
+        return True
+
+
+class JSONArrayStream(object):
+    """
+    Incrementally decode the objects in an array member of a JSON object.
+
+    Objects are decoded with codec as soon as they have been fully
+    received, and consumed input is discarded. The remaining members of
+    the enclosing object are available as ``meta`` once iteration has
+    completed.
+    """
+
+    def __init__(self, chunks, key, codec=None):
+        """Construct JSONArrayStream object instance."""
+        self.chunks = chunks
+        self.key = key
+        self.codec = get_codec(codec)
+        self.meta = None
+        self._start = re.compile('"{}"\\s*:\\s*\\['.format(re.escape(key))
+                                 .encode("utf-8"))
+
+    def __iter__(self):
+        """Yield decoded array members."""
+        chunks = iter(self.chunks)
+        buf = b""
+        match = self._start.search(buf)
+        while match is None:
+            chunk = next(chunks, None)
+            if chunk is None:
+                self.meta = self.codec.loads(buf) if buf.strip() else {}
+                return
+            buf += chunk
+            match = self._start.search(buf)
+        preamble, data = buf[:match.start()], buf[match.end():]
+        scanner = _ArrayScanner()
+        while True:
+            for member in scanner.feed(data):
+                with profiling.section("decode"):
+                    obj = self.codec.loads(member)
+                yield obj
+            if scanner.done:
+                break
+            data = next(chunks, None)
+            if data is None:
+                raise ValueError("truncated JSON array '{}'".format(self.key))
+        self.meta = self._merge(preamble, scanner.rest + b"".join(chunks))
+
+    def _merge(self, preamble, tail):
+        """Decode the object members either side of the array."""
+        head = preamble.decode("utf-8").strip()
+        if head.startswith("{"):
+            head = head[1:]
+        head = head.strip().rstrip(",")
+        tail = tail.decode("utf-8").strip()
+        if tail.endswith("}"):
+            tail = tail[:-1]
+        tail = tail.strip().lstrip(",")
+        members = [m for m in (head, tail) if m.strip()]
+        return self.codec.loads("{{{}}}".format(",".join(members)))
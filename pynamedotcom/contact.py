@@ -14,8 +14,15 @@
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import threading
+
+from pynamedotcom import bulk
+from pynamedotcom.codec import Serialised
+
 
 ROLES = ["admin", "tech", "registrant", "billing"]
+FIELDS = ["firstName", "lastName", "companyName", "address1", "address2",
+          "city", "state", "zip", "country", "phone", "fax", "email"]
 
 
 class Contact(object):
@@ -56,3 +63,129 @@ class Contact(object):
         except AttributeError:
             raise AttributeError("{} object has no attribute {}"
                                  .format(self.__class__, name))
+
+    def __eq__(self, other):
+        if not isinstance(other, Contact):
+            return NotImplemented
+        return self.data == other.data
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __hash__(self):
+        return hash(tuple(sorted(self.data.items())))
+
+    @property
+    def data(self):
+        """Get the contact as a request body."""
+        values = [self.first_name, self.last_name, self.company_name,
+                  self.address["street"][0], self.address["street"][1],
+                  self.address["city"], self.address["state"],
+                  self.address["zip"], self.address["country"],
+                  self.phone, self.fax, self.email]
+        return dict(zip(FIELDS, values))
+
+
+def request_body(contacts):
+    """Get the setContacts request body for a dict of roles to contacts."""
+    body = {}
+    for role, contact in contacts.items():
+        if role not in ROLES:
+            raise ValueError("unknown contact role {}, choose from {}"
+                             .format(role, ROLES))
+        body[role] = contact.data if isinstance(contact, Contact) \
+            else contact
+    return {"contacts": body}
+
+
+class ContactUpdate(object):
+    """Outcome of a bulk contact update for one domain."""
+
+    UPDATED = "updated"
+    UNCHANGED = "unchanged"
+    FAILED = "failed"
+
+    def __init__(self, name, status, roles=(), error=None):
+        """Construct ContactUpdate object instance."""
+        self.name = name
+        self.status = status
+        self.roles = list(roles)
+        self.error = error
+
+    def __repr__(self):
+        return "{}({} {})".format(self.__class__.__name__, self.name,
+                                  self.status)
+
+    @property
+    def ok(self):
+        """Check whether the domain has the desired contacts."""
+        return self.error is None
+
+
+def _fields(contact):
+    """Get the fields set by a Contact, or by a dict of some FIELDS."""
+    if isinstance(contact, Contact):
+        return contact.data
+    unknown = sorted(set(contact) - set(FIELDS))
+    if unknown:
+        raise ValueError("unknown contact fields {}, choose from {}"
+                         .format(unknown, FIELDS))
+    return dict(contact)
+
+
+def update_contacts(api, contacts, names=None, workers=bulk.DEFAULT_WORKERS):
+    """
+    Set contacts on many domains, as a generator of ContactUpdate reports.
+
+    contacts maps roles to Contact objects, which set every field, or to
+    dicts of some of FIELDS, which set only those; roles and fields not
+    included are left alone. Each of names, by default every domain in
+    the account, is fetched and compared role by role on the fields set,
+    and skipped if all match. The others are sent their current contacts
+    with the fields set merged in, with at most workers requests in
+    flight; identical request bodies are serialised once. Reports are
+    yielded in completion order.
+    """
+    desired = dict((role, _fields(contact))
+                   for role, contact in contacts.items())
+    request_body(desired)
+    payloads = {}
+    lock = threading.Lock()
+    if names is None:
+        names = api.domains
+
+    def payload(body):
+        key = tuple(sorted((role, tuple(sorted(data.items())))
+                           for role, data in body.items()))
+        with lock:
+            if key not in payloads:
+                payloads[key] = Serialised(
+                    api.codec.dumps(request_body(body)))
+            return payloads[key]
+
+    def update(name):
+        domain = api.domain(name)
+        current = domain.contacts
+        body = {}
+        roles = []
+        for role, fields in sorted(desired.items()):
+            data = current[role].data if role in current \
+                else dict.fromkeys(FIELDS)
+            if any(data.get(field) != value
+                   for field, value in fields.items()):
+                roles.append(role)
+            body[role] = dict(data)
+            body[role].update(fields)
+        if not roles:
+            return ContactUpdate(name, ContactUpdate.UNCHANGED)
+        domain._set_contacts(payload(body))
+        return ContactUpdate(name, ContactUpdate.UPDATED, roles=roles)
+
+    for name, report, error in bulk.execute(update, names, workers=workers,
+                                            limiter=api.limiter):
+        if error is not None:
+            report = ContactUpdate(name, ContactUpdate.FAILED, error=error)
+        yield report
@@ -0,0 +1,108 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""pynamedotcom operation deadline module."""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import threading
+import time
+
+from pynamedotcom.exceptions import DeadlineExceeded
+
+_local = threading.local()
+
+
+class Deadline(object):
+    """
+    Time limit for all requests made while it is active.
+
+    Used as a context manager, a Deadline applies to the current thread;
+    nested deadlines can only shorten the time allowed. Work handed to
+    other threads should be wrapped with bind() to carry it along.
+    """
+
+    def __init__(self, seconds, clock=time.time):
+        """Construct Deadline object instance."""
+        self.clock = clock
+        self.at = clock() + seconds
+
+    def __repr__(self):
+        return "{}({:.3f}s)".format(self.__class__.__name__,
+                                    self.remaining())
+
+    def __enter__(self):
+        """Enter context manager."""
+        stack = _stack()
+        if stack and stack[-1].at < self.at:
+            stack.append(stack[-1])
+        else:
+            stack.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Exit context manager."""
+        _stack().pop()
+
+    def remaining(self):
+        """Get the number of seconds left."""
+        return max(0.0, self.at - self.clock())
+
+    @property
+    def expired(self):
+        return self.clock() >= self.at
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def current():
+    """Get the deadline active in the current thread, if any."""
+    stack = _stack()
+    return stack[-1] if stack else None
+
+
+def check():
+    """Raise DeadlineExceeded if the current deadline has expired."""
+    deadline = current()
+    if deadline is not None and deadline.expired:
+        raise DeadlineExceeded("deadline exceeded")
+
+
+def expired():
+    """Check whether the current deadline, if any, has expired."""
+    deadline = current()
+    return deadline is not None and deadline.expired
+
+
+def timeout(value):
+    """Cap a timeout in seconds by the time left before the deadline."""
+    deadline = current()
+    if deadline is None:
+        return value
+    remaining = max(deadline.remaining(), 0.001)
+    return remaining if value is None else min(value, remaining)
+
+
+def bind(func):
+    """Wrap func to run under the current deadline in any thread."""
+    deadline = current()
+    if deadline is None:
+        return func
+
+    def wrapper(*args, **kwargs):
+        with deadline:
+            return func(*args, **kwargs)
+    return wrapper
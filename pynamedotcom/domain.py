@@ -14,18 +14,51 @@
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import collections
+import datetime
 import logging
 
 from requests.exceptions import HTTPError
 
-from pynamedotcom.contact import Contact
+from pynamedotcom import profiling
+from pynamedotcom.contact import Contact, request_body
 from pynamedotcom.decorators import readonly, require_type
 from pynamedotcom.exceptions import (DomainUnlockTimeError,
                                      NameserverUpdateError)
+from pynamedotcom.record import Records
+
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+_State = collections.namedtuple("_State", [
+    "name", "nameservers", "contacts", "privacy", "locked", "autorenew",
+    "expiry", "created", "renewal_price"
+])
+
+
+def parse_time(value):
+    """Parse an API timestamp into a naive UTC datetime."""
+    if value is None or isinstance(value, datetime.datetime):
+        return value
+    value = value.rstrip("Z").split(".")[0]
+    return datetime.datetime.strptime(value, TIME_FORMAT.rstrip("Z"))
+
+
+def format_time(value):
+    """Format a datetime in the API timestamp format."""
+    if value is None:
+        return value
+    return value.strftime(TIME_FORMAT)
 
 
 class Domain(object):
-    """Domain class."""
+    """
+    Domain class.
+
+    Properties are held in an immutable snapshot that is replaced in a
+    single assignment on refresh or mutation, so a Domain may be shared
+    between threads. Use snapshot to read several properties from the same
+    response.
+    """
 
     def __init__(self, session, **kwargs):
         """Construct Domain object instance."""
@@ -35,31 +68,45 @@ class Domain(object):
     def __repr__(self):
         return "{}({})".format(self.__class__.__name__, self.name)
 
+    @profiling.timed("build")
     def _set(self, domainName, nameservers=None, contacts=None,
              privacyEnabled=False, locked=False, autorenewEnabled=False,
              expireDate=None, createDate=None, renewalPrice=0):
         """Set local properties."""
-        self._name = domainName
-        self._nameservers = nameservers
-        self._privacy = privacyEnabled
-        self._locked = locked
-        self._autorenew = autorenewEnabled
-        self._expiry = expireDate
-        self._created = createDate
-        self._renewal_price = renewalPrice
-        self._contacts = {}
-        for role, contact in contacts.items():
-            self._contacts[role] = Contact(session=self.session, **contact)
+        if nameservers is not None:
+            nameservers = tuple(nameservers)
+        self._state = _State(
+            name=domainName,
+            nameservers=nameservers,
+            contacts=dict((role, Contact(session=self.session, **contact))
+                          for role, contact in (contacts or {}).items()),
+            privacy=privacyEnabled,
+            locked=locked,
+            autorenew=autorenewEnabled,
+            expiry=parse_time(expireDate),
+            created=parse_time(createDate),
+            renewal_price=renewalPrice
+        )
 
     def refresh(self):
         """Retrieve domain properties."""
-        resp = self.session._get(endpoint="domains/{}".format(self.name))
-        self._set(**resp.json())
+        data = self.session._get_json(endpoint="domains/{}".format(self.name))
+        self._set(**data)
         return self
 
+    @property
+    def snapshot(self):
+        """Get a consistent view of all properties."""
+        return self._state
+
+    @snapshot.setter
+    @readonly
+    def snapshot(self, value):
+        pass  # pragma: no cover
+
     @property
     def name(self):
-        return self._name
+        return self._state.name
 
     @name.setter
     @readonly
@@ -68,7 +115,8 @@ class Domain(object):
 
     @property
     def nameservers(self):
-        return self._nameservers
+        nameservers = self._state.nameservers
+        return list(nameservers) if nameservers is not None else None
 
     @nameservers.setter
     @require_type(list)
@@ -81,10 +129,10 @@ class Domain(object):
         }
         try:
             resp = self.session._post(endpoint=endpoint, data=data)
-            self._set(**resp.json())
+            self._set(**self.session._json(resp))
         except HTTPError as e:
             resp = e.response
-            data = resp.json()
+            data = self.session._json(resp)
             if resp.status_code == 500 \
                     and "Data Management Policy Violation" in data["details"]:
                 raise NameserverUpdateError(data["details"])
@@ -93,15 +141,33 @@ class Domain(object):
 
     @property
     def contacts(self):
-        return self._contacts
+        return dict(self._state.contacts)
 
     @contacts.setter
+    @require_type(dict)
     def contacts(self, value):
-        raise NotImplementedError
+        logging.getLogger(__name__).debug("setting {}.contacts = {}"
+                                          .format(self, value))
+        self._set_contacts(request_body(value))
+
+    def _set_contacts(self, data):
+        """Send a setContacts request body, encoded or not."""
+        endpoint = "domains/{}:setContacts".format(self.name)
+        resp = self.session._post(endpoint=endpoint, data=data)
+        self._set(**self.session._json(resp))
+
+    @property
+    def records(self):
+        return Records(domain=self)
+
+    @records.setter
+    @readonly
+    def records(self, value):
+        pass  # pragma: no cover
 
     @property
     def privacy(self):
-        return self._privacy
+        return self._state.privacy
 
     @privacy.setter
     def privacy(self, value):
@@ -109,7 +175,7 @@ class Domain(object):
 
     @property
     def locked(self):
-        return self._locked
+        return self._state.locked
 
     @locked.setter
     @require_type(bool)
@@ -122,10 +188,10 @@ class Domain(object):
             endpoint = "domains/{}:unlock".format(self.name)
         try:
             resp = self.session._post(endpoint=endpoint)
-            self._set(**resp.json())
+            self._set(**self.session._json(resp))
         except HTTPError as e:
             resp = e.response
-            data = resp.json()
+            data = self.session._json(resp)
             if resp.status_code == 400 \
                     and "Domain can not be unlocked until" in data["details"]:
                 raise DomainUnlockTimeError(data["details"])
@@ -134,7 +200,7 @@ class Domain(object):
 
     @property
     def autorenew(self):
-        return self._autorenew
+        return self._state.autorenew
 
     @autorenew.setter
     @require_type(bool)
@@ -146,11 +212,11 @@ class Domain(object):
         else:
             endpoint = "domains/{}:disableAutorenew".format(self.name)
         resp = self.session._post(endpoint=endpoint)
-        self._set(**resp.json())
+        self._set(**self.session._json(resp))
 
     @property
     def expiry(self):
-        return self._expiry
+        return self._state.expiry
 
     @expiry.setter
     @readonly
@@ -159,7 +225,7 @@ class Domain(object):
 
     @property
     def created(self):
-        return self._created
+        return self._state.created
 
     @created.setter
     @readonly
@@ -168,7 +234,7 @@ class Domain(object):
 
     @property
     def renewal_price(self):
-        return self._renewal_price
+        return self._state.renewal_price
 
     @renewal_price.setter
     @readonly
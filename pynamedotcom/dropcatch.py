@@ -0,0 +1,201 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""pynamedotcom timed registration module."""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import calendar
+import datetime
+import logging
+import socket
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from requests.compat import urlparse
+
+SPIN = 0.002
+
+
+def wait_until(target, clock=time.time, sleep=time.sleep):
+    """Sleep until shortly before target, then spin until it is reached."""
+    while True:
+        remaining = target - clock()
+        if remaining <= 0:
+            return
+        if remaining > SPIN:
+            sleep(remaining - SPIN)
+
+
+class Attempt(object):
+    """Attempt to register a name at a scheduled time."""
+
+    def __init__(self, name, scheduled):
+        """Construct Attempt object instance."""
+        self.name = name
+        self.scheduled = scheduled
+        self.sent = None
+        self.latency = None
+        self.status = None
+        self.result = None
+        self.error = None
+        self.skipped = False
+
+    def __repr__(self):
+        return "{}({} {:+.1f}ms {})".format(
+            self.__class__.__name__, self.name, (self.offset or 0) * 1000,
+            self.status or self.error or "skipped")
+
+    @property
+    def offset(self):
+        """Get the actual send time relative to the scheduled time."""
+        if self.sent is None:
+            return None
+        return self.sent - self.scheduled
+
+    @property
+    def ok(self):
+        """Check whether the attempt registered the name."""
+        return self.status is not None and self.status < 300
+
+
+class DropCatcher(object):
+    """
+    Register names the moment they become available.
+
+    warmup seconds before at, which may be a UTC datetime or seconds since
+    the epoch, the API host is resolved, connections are opened to fill
+    the pool, and a create-domain payload is serialised for each name.
+    Then for each name, attempts requests are sent at ``at``, ``at +
+    spacing``, ``at + 2 * spacing`` and so on, each from a thread already
+    waiting for its time; attempts due after a name has been registered
+    are skipped.
+
+    Warmup and attempt requests go straight to the API's connection pool
+    through API._send, deliberately bypassing its rate limit, dispatcher
+    and circuit breaker admission, which could delay or refuse a request
+    at the moment it is due. Their outcomes are still reported to the
+    API's limiter and breaker.
+    """
+
+    def __init__(self, api, names, at, attempts=3, spacing=0.05, years=1,
+                 prices=None, warmup=2.0, connections=None,
+                 clock=time.time, sleep=time.sleep):
+        """Construct DropCatcher object instance."""
+        if isinstance(at, datetime.datetime):
+            at = calendar.timegm(at.utctimetuple()) + \
+                at.microsecond / 1000000.0
+        self.api = api
+        self.names = list(names)
+        self.at = at
+        self.attempts = attempts
+        self.spacing = spacing
+        self.years = years
+        self.prices = prices or {}
+        self.warmup = warmup
+        self.connections = connections or min(api.pool_size,
+                                              len(self.names) * attempts)
+        self.payloads = {}
+        self._clock = clock
+        self._sleep = sleep
+        self._won = set()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__,
+                               ", ".join(self.names))
+
+    def prepare(self):
+        """
+        Resolve the host, open connections and serialise payloads.
+
+        Warming up is best effort: connections that fail are logged and
+        skipped, and waiting for the others ends at the drop time.
+        """
+        url = urlparse(self.api.base_url)
+        port = url.port or (443 if url.scheme == "https" else 80)
+        socket.getaddrinfo(url.hostname, port, 0, socket.SOCK_STREAM)
+        for name in self.names:
+            data = {"domain": {"domainName": name}, "years": self.years}
+            if name in self.prices:
+                data["purchasePrice"] = self.prices[name]
+            self.payloads[name] = self.api.codec.dumps(data)
+        opened = threading.Condition()
+        state = {"done": 0}
+        limit = min(self._clock() + self.warmup, self.at)
+
+        def connect(_):
+            # hold each connection until all are open, so that each
+            # request opens a new one, then return them all to the pool
+            try:
+                resp = self.api._send("GET", "{}/hello".format(
+                    self.api.base_url), None, None, None, True)
+            except Exception as e:
+                logging.getLogger(__name__).warning(
+                    "warmup connection failed: {}".format(e))
+                resp = None
+            with opened:
+                state["done"] += 1
+                opened.notify_all()
+                while state["done"] < self.connections \
+                        and self._clock() < limit:
+                    opened.wait(limit - self._clock())
+            if resp is not None:
+                resp.content  # read to the end so the connection is reused
+                resp.close()
+
+        with ThreadPoolExecutor(max_workers=self.connections) as executor:
+            list(executor.map(connect, range(self.connections)))
+
+    def run(self):
+        """Wait for the drop and fire all attempts, returning them."""
+        wait_until(self.at - self.warmup, clock=self._clock,
+                   sleep=self._sleep)
+        self.prepare()
+        attempts = [Attempt(name, self.at + i * self.spacing)
+                    for i in range(self.attempts) for name in self.names]
+        threads = [threading.Thread(target=self._fire, args=(attempt,))
+                   for attempt in attempts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return attempts
+
+    def _fire(self, attempt):
+        url = "{}/domains".format(self.api.base_url)
+        headers = {"Content-Type": "application/json"}
+        payload = self.payloads[attempt.name]
+        wait_until(attempt.scheduled, clock=self._clock, sleep=self._sleep)
+        with self._lock:
+            if attempt.name in self._won:
+                attempt.skipped = True
+                return
+        attempt.sent = self._clock()
+        try:
+            # bypass admission control, see the class docstring
+            resp = self.api._send("POST", url, None, payload, headers, False)
+        except Exception as e:
+            attempt.error = e
+            return
+        attempt.latency = self._clock() - attempt.sent
+        attempt.status = resp.status_code
+        try:
+            attempt.result = self.api._json(resp)
+        except ValueError:
+            attempt.result = None
+        if attempt.ok:
+            with self._lock:
+                self._won.add(attempt.name)
+            logging.getLogger(__name__).info("registered {}".format(
+                attempt.name))
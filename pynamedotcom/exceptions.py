@@ -34,3 +34,29 @@ class NameserverUpdateError(BaseException):
     domain. Usually because of missing "glue" records.
     """
     pass
+
+
+class ZoneFileError(BaseException):
+    """Error indicating a malformed entry in a BIND master file."""
+    pass
+
+
+class DeadlineExceeded(BaseException):
+    """Error indicating that an operation ran past its deadline."""
+    pass
+
+
+class OutcomeUnknown(DeadlineExceeded):
+    """
+    Error indicating that an operation was still in flight when its deadline
+    expired, so it may or may not have taken effect.
+    """
+    pass
+
+
+class CircuitOpenError(BaseException):
+    """
+    Error indicating that a request was refused without being sent, because
+    recent requests to the API have been failing.
+    """
+    pass
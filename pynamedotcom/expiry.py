@@ -0,0 +1,167 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""pynamedotcom expiry index module."""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import bisect
+import datetime
+import io
+import os
+import re
+import threading
+import time
+
+from pynamedotcom import deadline
+from pynamedotcom.domain import format_time, parse_time
+
+
+_duration = re.compile(r'^\s*(\d+)\s*([smhdw]?)\s*$', re.IGNORECASE)
+_duration_units = {"": "days", "s": "seconds", "m": "minutes", "h": "hours",
+                   "d": "days", "w": "weeks"}
+
+
+def parse_duration(value):
+    """Parse a duration such as '30d' or '12h' into a timedelta."""
+    match = _duration.match(value)
+    if not match:
+        raise ValueError("invalid duration '{}'".format(value))
+    number, unit = match.groups()
+    return datetime.timedelta(**{_duration_units[unit.lower()]: int(number)})
+
+
+class ExpiryIndex(object):
+    """
+    Index of domain names ordered by expiry date.
+
+    The index is refreshed from the bulk domains listing, and answers range
+    queries by binary search without further requests. It can be saved to
+    a file, so that later processes can query it without rebuilding it.
+    """
+
+    def __init__(self, domains=()):
+        """Construct ExpiryIndex object instance."""
+        self._lock = threading.Lock()
+        self._entries = []
+        self._expiry = {}
+        self.load(domains)
+
+    def __repr__(self):
+        return "{}({} domains)".format(self.__class__.__name__, len(self))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, name):
+        return name in self._expiry
+
+    def load(self, domains):
+        """Replace the contents of the index from Domain objects."""
+        return self._replace((domain.name, domain.expiry)
+                             for domain in domains)
+
+    def _replace(self, pairs):
+        """Replace the contents of the index from (name, expiry) pairs."""
+        expiry = dict((name, value) for name, value in pairs
+                      if value is not None)
+        entries = sorted((value, name) for name, value in expiry.items())
+        with self._lock:
+            self._entries, self._expiry = entries, expiry
+        return self
+
+    def refresh(self, api, per_page=None):
+        """Rebuild the index from the domains listing."""
+        return self.load(api.iter_domains(per_page=per_page))
+
+    def save(self, path):
+        """Write the index to path, one expiry and name per line."""
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        tmp = "{}.{}.tmp".format(path, os.getpid())
+        with self._lock:
+            entries = list(self._entries)
+        with io.open(tmp, "w", encoding="utf-8", newline="\n") as f:
+            for expiry, name in entries:
+                f.write("{} {}\n".format(format_time(expiry), name))
+        os.rename(tmp, path)
+        return self
+
+    def read(self, path):
+        """Replace the contents of the index from a file written by save()."""
+        with io.open(path, encoding="utf-8") as f:
+            pairs = (line.split() for line in f if line.strip())
+            return self._replace((name, parse_time(expiry))
+                                 for expiry, name in pairs)
+
+    def cached(self, api, path, max_age=3600, per_page=None,
+               clock=time.time):
+        """
+        Read the index from path, or rebuild and save it.
+
+        The index is rebuilt from the domains listing if the file is
+        missing or older than max_age seconds. A listing cut short by the
+        current deadline is not saved.
+        """
+        try:
+            fresh = clock() - os.path.getmtime(path) <= max_age
+        except OSError:
+            fresh = False
+        if fresh:
+            return self.read(path)
+        self.refresh(api, per_page=per_page)
+        if deadline.expired():
+            return self
+        return self.save(path)
+
+    def update(self, name, expiry):
+        """Add or move a single domain."""
+        with self._lock:
+            self._discard(name)
+            if expiry is not None:
+                bisect.insort(self._entries, (expiry, name))
+                self._expiry[name] = expiry
+
+    def remove(self, name):
+        """Remove a single domain."""
+        with self._lock:
+            self._discard(name)
+
+    def _discard(self, name):
+        """Remove a domain's entry, if present."""
+        expiry = self._expiry.pop(name, None)
+        if expiry is not None:
+            i = bisect.bisect_left(self._entries, (expiry, name))
+            del self._entries[i]
+
+    def apply_notification(self, notification):
+        """Update the index from an event notification."""
+        if notification.expiry is not None:
+            self.update(notification.domain_name, notification.expiry)
+
+    def expiry(self, name):
+        """Get the expiry date of a domain."""
+        return self._expiry[name]
+
+    def between(self, start, end):
+        """Get (name, expiry) pairs expiring in [start, end), in order."""
+        with self._lock:
+            lo = bisect.bisect_left(self._entries, (start, ""))
+            hi = bisect.bisect_left(self._entries, (end, ""))
+            return [(name, expiry) for expiry, name in self._entries[lo:hi]]
+
+    def within(self, window, now=None):
+        """Get (name, expiry) pairs expiring within window from now."""
+        if now is None:
+            now = datetime.datetime.utcnow()
+        return self.between(now, now + window)
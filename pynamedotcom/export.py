@@ -0,0 +1,170 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""pynamedotcom inventory export module."""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import csv
+import json
+import logging
+
+from pynamedotcom import bulk
+from pynamedotcom.contact import FIELDS as CONTACT_FIELDS, ROLES
+from pynamedotcom.domain import format_time
+from pynamedotcom.exceptions import DeadlineExceeded
+
+
+FORMATS = ["csv", "jsonl", "parquet"]
+FIELDS = ["name", "nameservers", "privacy", "locked", "autorenew", "expiry",
+          "created", "renewal_price"]
+CONTACT_COLUMNS = ["{}_{}".format(role, field)
+                   for role in ROLES for field in CONTACT_FIELDS]
+
+
+def domains(api, contacts=True, workers=bulk.DEFAULT_WORKERS, per_page=None):
+    """
+    Get all domains in the account, as a generator.
+
+    The domains listing does not include contacts, so if contacts is True
+    each domain is refreshed individually, with at most ``workers``
+    requests in flight. Domains are yielded in completion order. If the
+    current deadline expires, the generator stops after the domains
+    refreshed so far.
+    """
+    listing = api.iter_domains(per_page=per_page)
+    if not contacts:
+        for domain in listing:
+            yield domain
+        return
+    for domain, _, error in bulk.execute(lambda d: d.refresh(), listing,
+                                         workers=workers,
+                                         limiter=api.limiter):
+        if isinstance(error, DeadlineExceeded):
+            logging.getLogger(__name__).warning(
+                "deadline exceeded refreshing {}".format(domain))
+            continue
+        if error is not None:
+            raise error
+        yield domain
+
+
+def as_dict(domain):
+    """Convert a Domain to a nested dict."""
+    return {
+        "name": domain.name,
+        "nameservers": list(domain.nameservers or []),
+        "privacy": domain.privacy,
+        "locked": domain.locked,
+        "autorenew": domain.autorenew,
+        "expiry": format_time(domain.expiry),
+        "created": format_time(domain.created),
+        "renewal_price": domain.renewal_price,
+        "contacts": dict((role, contact.data)
+                         for role, contact in domain.contacts.items())
+    }
+
+
+def as_row(domain):
+    """Convert a Domain to a flat dict."""
+    data = as_dict(domain)
+    data["nameservers"] = " ".join(data["nameservers"])
+    for role, contact in data.pop("contacts").items():
+        for field, value in contact.items():
+            data["{}_{}".format(role, field)] = value
+    return data
+
+
+def write_jsonl(domains, fileobj):
+    """Write domains as JSON lines."""
+    count = 0
+    for domain in domains:
+        fileobj.write("{}\n".format(json.dumps(as_dict(domain))))
+        count += 1
+    return count
+
+
+def write_csv(domains, fileobj):
+    """Write domains as CSV with one column per contact field."""
+    writer = csv.DictWriter(fileobj, fieldnames=FIELDS + CONTACT_COLUMNS)
+    writer.writeheader()
+    count = 0
+    for domain in domains:
+        writer.writerow(as_row(domain))
+        count += 1
+    return count
+
+
+def write_parquet(domains, fileobj, batch_size=10000):
+    """
+    Write domains as Parquet, one row group per batch_size domains.
+
+    pyarrow is imported here rather than with the module, so that the CLI
+    does not pay for loading it unless Parquet is written.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:  # pragma: no cover
+        raise ValueError("parquet export requires pyarrow, install it with "
+                         "'pip install pyarrow'")
+    types = {
+        "privacy": pyarrow.bool_(),
+        "locked": pyarrow.bool_(),
+        "autorenew": pyarrow.bool_(),
+        "renewal_price": pyarrow.float64()
+    }
+    schema = pyarrow.schema([(name, types.get(name, pyarrow.string()))
+                             for name in FIELDS + CONTACT_COLUMNS])
+    writer = pyarrow.parquet.ParquetWriter(fileobj, schema)
+    count = 0
+
+    def flush(batch):
+        columns = [[r.get(name) for r in batch] for name in schema.names]
+        writer.write_table(pyarrow.Table.from_arrays(
+            [pyarrow.array(c, type=f.type) for c, f in zip(columns, schema)],
+            schema=schema))
+
+    try:
+        batch = []
+        for domain in domains:
+            batch.append(as_row(domain))
+            count += 1
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+    finally:
+        writer.close()
+    return count
+
+
+def export(api, fileobj, format="jsonl", contacts=True,
+           workers=bulk.DEFAULT_WORKERS, per_page=None):
+    """
+    Stream all domains in the account to fileobj.
+
+    fileobj must be opened in binary mode for parquet, and text mode
+    otherwise. Domains are written as they arrive, so memory use does not
+    grow with the size of the account. Returns the number of domains.
+    """
+    writers = {
+        "csv": write_csv,
+        "jsonl": write_jsonl,
+        "parquet": write_parquet
+    }
+    if format not in writers:
+        raise ValueError("unknown export format {}, choose from {}"
+                         .format(format, FORMATS))
+    return writers[format](domains(api, contacts=contacts, workers=workers,
+                                   per_page=per_page), fileobj)
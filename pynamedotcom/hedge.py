@@ -0,0 +1,130 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""pynamedotcom hedged request module."""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+import threading
+import time
+
+from concurrent.futures import FIRST_COMPLETED, wait
+
+
+def percentile(values, p):
+    """Get the p-th percentile of values by nearest rank."""
+    values = sorted(values)
+    if not values:
+        return None
+    return values[int(round(p / 100.0 * (len(values) - 1)))]
+
+
+class HedgePolicy(object):
+    """
+    Policy for hedging idempotent requests.
+
+    A request that has not completed within the given percentile of recent
+    latencies, but at least min_delay seconds, is sent a second time and
+    the first response to arrive is used. No hedging happens until
+    min_samples latencies have been seen, and hedges are limited to budget
+    times the number of requests.
+    """
+
+    def __init__(self, percentile=95, budget=0.05, min_delay=0.005,
+                 window=1000, min_samples=20):
+        """Construct HedgePolicy object instance."""
+        self.percentile = percentile
+        self.budget = budget
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.requests = 0
+        self.hedged = 0
+        self.wins = 0
+        self._latencies = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "{}(p{}, {}/{} hedged)".format(self.__class__.__name__,
+                                              self.percentile, self.hedged,
+                                              self.requests)
+
+    def record(self, latency):
+        """Record the latency of a completed request."""
+        with self._lock:
+            self._latencies.append(latency)
+
+    def delay(self):
+        """Get the current hedging delay, or None if not hedging yet."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            return max(self.min_delay,
+                       percentile(self._latencies, self.percentile))
+
+    def _spare(self):
+        """Check whether the budget has room for another hedge."""
+        return self.hedged + 1 <= self.budget * self.requests
+
+    def allow(self):
+        """Check the budget and count a hedge if allowed."""
+        with self._lock:
+            if not self._spare():
+                return False
+            self.hedged += 1
+            return True
+
+    def run(self, executor, func):
+        """
+        Call func, hedging it through executor if it is slow.
+
+        Calls that cannot be hedged, because the policy is not warmed up or
+        the budget is spent, run in the calling thread.
+        """
+        with self._lock:
+            self.requests += 1
+            spare = self._spare()
+
+        def attempt():
+            start = time.time()
+            result = func()
+            self.record(time.time() - start)
+            return result
+
+        delay = self.delay()
+        if delay is None or not spare:
+            return attempt()
+        primary = executor.submit(attempt)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self.allow():
+            return primary.result()
+        hedge = executor.submit(attempt)
+        pending = [primary, hedge]
+        while True:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            future = done.pop()
+            pending.remove(future)
+            if future.exception() is None or not pending:
+                break
+        for other in pending:
+            if not other.cancel():
+                other.add_done_callback(_discard)
+        if future is hedge and future.exception() is None:
+            with self._lock:
+                self.wins += 1
+        return future.result()
+
+
+def _discard(future):
+    """Release the connection held by an abandoned response."""
+    if future.exception() is None:
+        future.result().close()
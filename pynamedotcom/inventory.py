@@ -0,0 +1,258 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""pynamedotcom columnar inventory module."""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import array
+import calendar
+import datetime
+import itertools
+import operator
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+COLUMNS = ["name", "expiry", "renewal_price", "locked", "autorenew",
+           "privacy", "nameservers"]
+
+_typecodes = {
+    "expiry": "d",
+    "renewal_price": "d",
+    "locked": "b",
+    "autorenew": "b",
+    "privacy": "b",
+    "nameservers": "l"
+}
+
+
+def _timestamp(value):
+    """Convert a datetime to seconds since the epoch."""
+    if isinstance(value, datetime.datetime):
+        return calendar.timegm(value.utctimetuple())
+    return value
+
+
+class Mask(object):
+    """Row selection produced by comparing a Column."""
+
+    def __init__(self, values):
+        """Construct Mask object instance."""
+        self.values = values
+
+    def __repr__(self):
+        return "{}({}/{})".format(self.__class__.__name__, self.count(),
+                                  len(self))
+
+    def __len__(self):
+        return len(self.values)
+
+    def _combine(self, other, op):
+        if numpy is not None and isinstance(self.values, numpy.ndarray):
+            return Mask(op(self.values, other.values))
+        return Mask([op(a, b) for a, b in zip(self.values, other.values)])
+
+    def __and__(self, other):
+        return self._combine(other, operator.and_)
+
+    def __or__(self, other):
+        return self._combine(other, operator.or_)
+
+    def __invert__(self):
+        if numpy is not None and isinstance(self.values, numpy.ndarray):
+            return Mask(~self.values)
+        return Mask([not value for value in self.values])
+
+    def count(self):
+        """Get the number of selected rows."""
+        if numpy is not None and isinstance(self.values, numpy.ndarray):
+            return int(numpy.count_nonzero(self.values))
+        return sum(1 for value in self.values if value)
+
+
+class Column(object):
+    """Column of an Inventory, comparable to produce a Mask."""
+
+    def __init__(self, name, values):
+        """Construct Column object instance."""
+        self.name = name
+        self.values = values
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, self.name)
+
+    def __len__(self):
+        return len(self.values)
+
+    def _compare(self, other, op):
+        other = _timestamp(other)
+        if numpy is not None and isinstance(self.values, numpy.ndarray):
+            return Mask(op(self.values, other))
+        return Mask([bool(op(value, other)) for value in self.values])
+
+    def __eq__(self, other):
+        return self._compare(other, operator.eq)
+
+    def __ne__(self, other):
+        return self._compare(other, operator.ne)
+
+    def __lt__(self, other):
+        return self._compare(other, operator.lt)
+
+    def __le__(self, other):
+        return self._compare(other, operator.le)
+
+    def __gt__(self, other):
+        return self._compare(other, operator.gt)
+
+    def __ge__(self, other):
+        return self._compare(other, operator.ge)
+
+    __hash__ = None
+
+    def isin(self, values):
+        """Select rows whose value is one of values."""
+        values = set(_timestamp(value) for value in values)
+        if numpy is not None and isinstance(self.values, numpy.ndarray):
+            return Mask(numpy.isin(self.values, list(values)))
+        return Mask([value in values for value in self.values])
+
+
+class Inventory(object):
+    """
+    Columnar in-memory table of domains.
+
+    Each of COLUMNS is stored as a flat array: expiry as seconds since the
+    epoch (NaN if unknown) and nameservers as an id into nameserver_sets.
+    Comparing a column, e.g. ``inventory["locked"] == False``, produces a
+    Mask that can be combined with ``&``, ``|`` and ``~`` and passed to
+    where(), count(), sum() or names(). Columns are NumPy arrays if NumPy
+    is installed, unless use_numpy is False.
+    """
+
+    def __init__(self, columns, nameserver_sets, use_numpy=None):
+        """Construct Inventory object instance."""
+        if use_numpy is None:
+            use_numpy = numpy is not None
+        elif use_numpy and numpy is None:
+            raise ImportError("use_numpy requires numpy to be installed")
+        self.use_numpy = use_numpy
+        self.nameserver_sets = nameserver_sets
+        self._columns = {}
+        for name in COLUMNS:
+            values = columns[name]
+            if name == "name":
+                values = list(values)
+                if use_numpy:
+                    values = numpy.array(values, dtype=object)
+            elif use_numpy:
+                values = numpy.array(values, dtype=_typecodes[name])
+            else:
+                values = array.array(_typecodes[name], values)
+            self._columns[name] = values
+        self._rows = None
+
+    def __repr__(self):
+        return "{}({} domains)".format(self.__class__.__name__, len(self))
+
+    def __len__(self):
+        return len(self._columns["name"])
+
+    def __getitem__(self, name):
+        return Column(name, self._columns[name])
+
+    @classmethod
+    def from_domains(cls, domains, use_numpy=None):
+        """Build an Inventory from Domain objects."""
+        columns = dict((name, []) for name in COLUMNS)
+        sets = {}
+        for domain in domains:
+            nameservers = frozenset(ns.lower().rstrip(".")
+                                    for ns in domain.nameservers or [])
+            columns["name"].append(domain.name)
+            if domain.expiry is None:
+                columns["expiry"].append(float("nan"))
+            else:
+                columns["expiry"].append(_timestamp(domain.expiry))
+            columns["renewal_price"].append(domain.renewal_price or 0)
+            columns["locked"].append(bool(domain.locked))
+            columns["autorenew"].append(bool(domain.autorenew))
+            columns["privacy"].append(bool(domain.privacy))
+            columns["nameservers"].append(sets.setdefault(nameservers,
+                                                          len(sets)))
+        nameserver_sets = [None] * len(sets)
+        for nameservers, id in sets.items():
+            nameserver_sets[id] = nameservers
+        return cls(columns, nameserver_sets, use_numpy=use_numpy)
+
+    @classmethod
+    def from_api(cls, api, per_page=None, use_numpy=None):
+        """Build an Inventory from the domains listing."""
+        return cls.from_domains(api.iter_domains(per_page=per_page),
+                                use_numpy=use_numpy)
+
+    def apply_notification(self, notification):
+        """Update the expiry of a domain from an event notification."""
+        if notification.expiry is None:
+            return
+        if self._rows is None:
+            self._rows = dict((name, row) for row, name
+                              in enumerate(self._columns["name"]))
+        row = self._rows.get(notification.domain_name)
+        if row is not None:
+            self._columns["expiry"][row] = _timestamp(notification.expiry)
+
+    def uses_nameserver(self, nameserver):
+        """Select domains delegated to a nameserver."""
+        nameserver = nameserver.lower().rstrip(".")
+        ids = [id for id, nameservers in enumerate(self.nameserver_sets)
+               if nameserver in nameservers]
+        return self["nameservers"].isin(ids)
+
+    def where(self, mask):
+        """Get a new Inventory containing the selected rows."""
+        columns = {}
+        for name, values in self._columns.items():
+            if self.use_numpy:
+                columns[name] = values[mask.values]
+            else:
+                columns[name] = itertools.compress(values, mask.values)
+        return self.__class__(columns, self.nameserver_sets,
+                              use_numpy=self.use_numpy)
+
+    def count(self, mask=None):
+        """Count the selected rows."""
+        if mask is None:
+            return len(self)
+        return mask.count()
+
+    def sum(self, column, mask=None):
+        """Sum a numeric column over the selected rows."""
+        values = self._columns[column]
+        if self.use_numpy:
+            if mask is not None:
+                values = values[mask.values]
+            return float(values.sum())
+        if mask is not None:
+            values = itertools.compress(values, mask.values)
+        return float(sum(values))
+
+    def names(self, mask=None):
+        """Get the names of the selected rows."""
+        values = self._columns["name"]
+        if mask is None:
+            return list(values)
+        return list(itertools.compress(values, mask.values))
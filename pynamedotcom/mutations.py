@@ -0,0 +1,164 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""pynamedotcom write-behind mutation module."""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+import threading
+
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+from pynamedotcom import bulk, priority
+
+
+class MutationQueue(object):
+    """
+    Background queue applying Domain mutations.
+
+    Mutations of the same domain are applied one at a time in the order
+    they were submitted, while different domains are mutated in parallel
+    by up to workers threads. Each mutation returns a Future holding the
+    domain snapshot after the change, or the exception it raised.
+    """
+
+    def __init__(self, workers=bulk.DEFAULT_WORKERS):
+        """Construct MutationQueue object instance."""
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._queues = {}
+        self._pending = set()
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "{}({} pending)".format(self.__class__.__name__,
+                                       len(self._pending))
+
+    def __enter__(self):
+        """Enter context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Exit context manager."""
+        self.join()
+
+    def domain(self, domain):
+        """Wrap a Domain so that its mutations are queued."""
+        return QueuedDomain(domain, self)
+
+    def submit(self, key, func):
+        """Queue func after earlier mutations with the same key."""
+        future = Future()
+        func = priority.bind(func, default=priority.NORMAL)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("mutation queue has been joined")
+            self._pending.add(future)
+            queue = self._queues.get(key)
+            if queue is None:
+                queue = self._queues[key] = collections.deque()
+                self._executor.submit(self._drain, key)
+            queue.append((future, func))
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def _drain(self, key):
+        """Apply queued mutations for key until none are left."""
+        while True:
+            with self._lock:
+                queue = self._queues[key]
+                if not queue:
+                    del self._queues[key]
+                    return
+                future, func = queue.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = func()
+            except Exception as e:
+                future.set_exception(e)
+            except BaseException as e:
+                # hand the rest of the queue to a fresh worker, so that
+                # flush and join do not wait forever
+                future.set_exception(e)
+                self._executor.submit(self._drain, key)
+                raise
+            else:
+                future.set_result(result)
+
+    def flush(self, timeout=None):
+        """Wait for mutations queued so far, returning those not done."""
+        with self._lock:
+            pending = list(self._pending)
+        return wait(pending, timeout=timeout).not_done
+
+    def join(self):
+        """Wait for all mutations and stop accepting new ones."""
+        with self._lock:
+            self._closed = True
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+
+class QueuedDomain(object):
+    """
+    Domain whose mutations are applied by a MutationQueue.
+
+    Properties are read from the wrapped domain, which is updated as
+    queued mutations complete; the set_* methods queue a change and
+    return a Future. Assigning nameservers, locked or autorenew queues
+    the change in the same way, discarding the Future.
+    """
+
+    QUEUED = ["nameservers", "locked", "autorenew"]
+
+    def __init__(self, domain, queue):
+        """Construct QueuedDomain object instance."""
+        object.__setattr__(self, "domain", domain)
+        object.__setattr__(self, "queue", queue)
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, self.domain.name)
+
+    def __getattr__(self, name):
+        """Get properties of the wrapped domain."""
+        return getattr(self.domain, name)
+
+    def __setattr__(self, name, value):
+        """Queue setting a property of the wrapped domain."""
+        if name not in self.QUEUED:
+            raise AttributeError("cannot queue setting {}, use one of {}"
+                                 .format(name, self.QUEUED))
+        self._set(name, value)
+
+    def _set(self, name, value):
+        def func():
+            setattr(self.domain, name, value)
+            return self.domain.snapshot
+        return self.queue.submit(self.domain.name, func)
+
+    def set_nameservers(self, value):
+        """Queue setting the nameservers."""
+        return self._set("nameservers", value)
+
+    def set_locked(self, value):
+        """Queue locking or unlocking the domain."""
+        return self._set("locked", value)
+
+    def set_autorenew(self, value):
+        """Queue enabling or disabling autorenewal."""
+        return self._set("autorenew", value)
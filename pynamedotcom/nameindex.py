@@ -0,0 +1,138 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""pynamedotcom local domain name index module."""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import mmap
+import os
+import re
+import time
+
+from pynamedotcom import deadline
+
+
+def default_path(host, suffix="names"):
+    """Get the default location of an index file for an API host."""
+    if "XDG_CACHE_HOME" in os.environ:
+        base_path = os.environ.get("XDG_CACHE_HOME")
+    else:
+        base_path = os.path.join(os.path.expanduser("~"), ".cache")
+    name = re.sub(r"[^\w.-]", "_", host)
+    return os.path.join(base_path, "pynamedotcom",
+                        "{}.{}".format(name, suffix))
+
+
+class NameIndex(object):
+    """
+    Sorted file of domain names for fast prefix lookups.
+
+    The index is a file with one lower-case name per line, in sorted
+    order, so that complete() can binary search it through mmap without
+    reading the whole file. It is considered stale once it is older than
+    max_age seconds.
+    """
+
+    def __init__(self, path, max_age=3600, clock=time.time):
+        """Construct NameIndex object instance."""
+        self.path = path
+        self.max_age = max_age
+        self._clock = clock
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, self.path)
+
+    @property
+    def stale(self):
+        """Check whether the index is missing or too old."""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return True
+        return self._clock() - mtime > self.max_age
+
+    def touch(self):
+        """Mark the index as fresh, creating it if missing."""
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(self.path, "ab"):
+            os.utime(self.path, None)
+
+    def write(self, names):
+        """Replace the index with names, returning the number written."""
+        names = sorted(set(name.lower() for name in names))
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        tmp = "{}.{}.tmp".format(self.path, os.getpid())
+        with io.open(tmp, "w", encoding="utf-8", newline="\n") as f:
+            for name in names:
+                f.write("{}\n".format(name))
+        os.rename(tmp, self.path)
+        return len(names)
+
+    def refresh(self, api):
+        """
+        Rebuild the index from the domains listing.
+
+        The index is left alone, and 0 returned, if the listing is cut short
+        by the current deadline.
+        """
+        names = list(api.domains)
+        if deadline.expired():
+            return 0
+        return self.write(names)
+
+    def complete(self, prefix, limit=100):
+        """Get up to limit names starting with prefix."""
+        prefix = prefix.lower().encode("utf-8")
+        try:
+            with open(self.path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return []
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, OSError):
+            return []
+        try:
+            names = []
+            position = self._search(data, prefix)
+            while position < len(data) and len(names) < limit:
+                end = data.find(b"\n", position)
+                if end == -1:
+                    end = len(data)
+                name = data[position:end]
+                if not name.startswith(prefix):
+                    break
+                names.append(name.decode("utf-8"))
+                position = end + 1
+            return names
+        finally:
+            data.close()
+
+    @staticmethod
+    def _search(data, prefix):
+        """Get the offset of the first line not less than prefix."""
+        low, high = 0, len(data)
+        while low < high:
+            start = data.rfind(b"\n", 0, (low + high) // 2) + 1
+            start = max(start, low)
+            end = data.find(b"\n", start)
+            if end == -1:
+                end = len(data)
+            if data[start:end] < prefix:
+                low = end + 1
+            else:
+                high = start
+        return low
@@ -0,0 +1,223 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""pynamedotcom notification receiver module."""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import hmac
+import json
+import logging
+import threading
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qs, urlparse
+    import Queue as queue
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs, urlparse
+    import queue
+
+from pynamedotcom.domain import parse_time
+
+
+MAX_BODY = 65536
+MAX_QUEUE = 1000
+
+
+class Notification(object):
+    """Notification class."""
+
+    def __init__(self, eventName, domainName, **kwargs):
+        """Construct Notification object instance."""
+        self._event_name = eventName
+        self._domain_name = domainName
+        self._data = kwargs
+
+    def __repr__(self):
+        return "{}({} {})".format(self.__class__.__name__, self.event_name,
+                                  self.domain_name)
+
+    def __getattr__(self, name):
+        """Get private attributes."""
+        try:
+            return self.__getattribute__("_{}".format(name))
+        except AttributeError:
+            raise AttributeError("{} object has no attribute {}"
+                                 .format(self.__class__, name))
+
+    @property
+    def expiry(self):
+        """Get the new expiry date carried by the event, if any."""
+        return parse_time(self.data.get("expireDate"))
+
+    def as_dict(self):
+        """Convert the notification to a dict."""
+        return dict(self.data, eventName=self.event_name,
+                    domainName=self.domain_name)
+
+    @classmethod
+    def from_json(cls, body):
+        """Validate and decode a notification body."""
+        try:
+            data = json.loads(body.decode("utf-8"))
+        except ValueError as e:
+            raise ValueError("invalid JSON: {}".format(e))
+        if not isinstance(data, dict):
+            raise ValueError("notification must be a JSON object")
+        for field in ("eventName", "domainName"):
+            if not isinstance(data.get(field), type("")) or not data[field]:
+                raise ValueError("missing or invalid field {}".format(field))
+        return cls(**data)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler validating incoming notifications."""
+
+    def do_POST(self):
+        receiver = self.server.receiver
+        url = urlparse(self.path)
+        if url.path != receiver.path:
+            return self._reply(404, "not found")
+        if receiver.token is not None:
+            token = parse_qs(url.query).get("token", [""])[0]
+            if not hmac.compare_digest(token.encode("utf-8"),
+                                       receiver.token.encode("utf-8")):
+                return self._reply(403, "forbidden")
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            return self._reply(400, "invalid Content-Length")
+        if length < 0:
+            return self._reply(400, "invalid Content-Length")
+        if length > MAX_BODY:
+            return self._reply(413, "body too large")
+        try:
+            notification = Notification.from_json(self.rfile.read(length))
+        except ValueError as e:
+            return self._reply(400, "{}".format(e))
+        receiver.dispatch(notification)
+        self._reply(202, "accepted")
+
+    def _reply(self, code, message):
+        body = json.dumps({"message": message}).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.getLogger(__name__).debug(format, *args)
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    """Threaded HTTP server."""
+
+    daemon_threads = True
+
+
+class Receiver(object):
+    """
+    HTTP receiver for name.com event notifications.
+
+    Valid notifications POSTed to path are applied to each of stores, by
+    calling its apply_notification() method, and queued for consumption
+    through events(). At most max_queue notifications are kept for
+    events(); beyond that the oldest are dropped and counted in
+    ``dropped``. If token is set, requests must carry it as a ``token``
+    query parameter in the callback URL.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, path="/", token=None,
+                 stores=(), max_queue=MAX_QUEUE):
+        """Construct Receiver object instance."""
+        self.path = path
+        self.token = token
+        self.stores = list(stores)
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._server = _Server((host, port), _Handler)
+        self._server.receiver = self
+        self._thread = None
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, self.url)
+
+    def __enter__(self):
+        """Enter context manager."""
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Exit context manager."""
+        self.stop()
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return "http://{}:{}{}".format(host, port, self.path)
+
+    def start(self):
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve in the current thread."""
+        self._server.serve_forever()
+
+    def stop(self):
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+        self._enqueue(None)
+
+    def dispatch(self, notification):
+        """Apply a notification to the stores and queue it."""
+        for store in self.stores:
+            try:
+                store.apply_notification(notification)
+            except Exception as e:
+                logging.getLogger(__name__).warning(
+                    "failed to apply {} to {}: {}"
+                    .format(notification, store, e))
+        self._enqueue(notification)
+
+    def _enqueue(self, item):
+        """Queue an item, dropping the oldest if the queue is full."""
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                pass
+            try:
+                self._queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+
+    def events(self, timeout=None):
+        """Get received notifications as a generator, until stopped."""
+        while True:
+            try:
+                notification = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                return
+            if notification is None:
+                return
+            yield notification
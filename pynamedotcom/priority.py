@@ -0,0 +1,167 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""pynamedotcom request priority module."""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+import heapq
+import itertools
+import threading
+
+from pynamedotcom import deadline
+
+INTERACTIVE = "interactive"
+NORMAL = "normal"
+BULK = "bulk"
+PRIORITIES = [INTERACTIVE, NORMAL, BULK]
+
+_local = threading.local()
+
+
+class Priority(object):
+    """
+    Priority for all requests made while it is active.
+
+    Used as a context manager, a Priority applies to the current thread.
+    Requests made outside of any Priority are NORMAL, except those made by
+    bulk operations, which are BULK.
+    """
+
+    def __init__(self, name):
+        """Construct Priority object instance."""
+        if name not in PRIORITIES:
+            raise ValueError("unknown priority {}, choose from {}"
+                             .format(name, PRIORITIES))
+        self.name = name
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, self.name)
+
+    def __enter__(self):
+        """Enter context manager."""
+        _stack().append(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Exit context manager."""
+        _stack().pop()
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def current(default=NORMAL):
+    """Get the priority active in the current thread."""
+    stack = _stack()
+    return stack[-1] if stack else default
+
+
+def bind(func, default=BULK):
+    """Wrap func to run at the current priority, or default, in any thread."""
+    priority = Priority(current(default=default))
+
+    def wrapper(*args, **kwargs):
+        with priority:
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class Dispatcher(object):
+    """
+    Priority-aware admission of requests to the transport.
+
+    At most capacity requests are in flight at once. Of those, reserved
+    maps a priority to a number of slots that only requests of that
+    priority or higher may use, so that lower priorities cannot take the
+    whole capacity. Waiting requests are admitted highest priority first,
+    then in arrival order.
+    """
+
+    def __init__(self, capacity=10, reserved=None):
+        """Construct Dispatcher object instance."""
+        if reserved is None:
+            reserved = {INTERACTIVE: 2}
+        self.capacity = capacity
+        self.reserved = reserved
+        self.in_flight = collections.Counter()
+        self.waiting = collections.Counter()
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def __repr__(self):
+        return "{}({}/{})".format(self.__class__.__name__,
+                                  sum(self.in_flight.values()),
+                                  self.capacity)
+
+    def limit(self, priority):
+        """Get the number of slots a priority may use."""
+        rank = PRIORITIES.index(priority)
+        return self.capacity - sum(self.reserved.get(p, 0)
+                                   for p in PRIORITIES[:rank])
+
+    def acquire(self, priority):
+        """Wait for a slot, until the current deadline if any."""
+        entry = (PRIORITIES.index(priority), next(self._sequence))
+        limit = self.limit(priority)
+        with self._condition:
+            heapq.heappush(self._heap, entry)
+            self.waiting[priority] += 1
+            try:
+                while self._heap[0] != entry \
+                        or sum(self.in_flight.values()) >= limit:
+                    if deadline.current() is not None:
+                        deadline.check()
+                        self._condition.wait(deadline.timeout(None))
+                    else:
+                        self._condition.wait()
+            except BaseException:
+                # leave no dead entry blocking the requests behind it
+                self._heap.remove(entry)
+                heapq.heapify(self._heap)
+                self._condition.notify_all()
+                raise
+            finally:
+                self.waiting[priority] -= 1
+            heapq.heappop(self._heap)
+            self.in_flight[priority] += 1
+            self._condition.notify_all()
+
+    def release(self, priority):
+        """Release a slot."""
+        with self._condition:
+            self.in_flight[priority] -= 1
+            self._condition.notify_all()
+
+    def slot(self, priority=None):
+        """Hold a slot for the duration of a with block."""
+        return _Slot(self, priority or current())
+
+
+class _Slot(object):
+    """Context manager holding a Dispatcher slot."""
+
+    def __init__(self, dispatcher, priority):
+        self.dispatcher = dispatcher
+        self.priority = priority
+
+    def __enter__(self):
+        self.dispatcher.acquire(self.priority)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.dispatcher.release(self.priority)
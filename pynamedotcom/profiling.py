@@ -0,0 +1,134 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""pynamedotcom profiling module."""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import cProfile
+import contextlib
+import functools
+import os
+import pstats
+import sys
+import threading
+import time
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+
+ENV_VAR = "PYNAMEDOTCOM_PROFILE"
+
+_cpu_time = getattr(time, "thread_time", None) or \
+    getattr(time, "process_time", None) or time.clock
+
+_active = None
+
+
+class Profiler(object):
+    """Profiler class."""
+
+    def __init__(self, path, top=20, stream=None):
+        """Construct Profiler object instance."""
+        self.path = path
+        self.top = top
+        self.stream = stream
+        self.sections = {}
+        self.elapsed = None
+        self._lock = threading.Lock()
+        self._profile = cProfile.Profile()
+        self._started = None
+
+    def __enter__(self):
+        """Enter context manager."""
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Exit context manager."""
+        self.stop()
+
+    def start(self):
+        """Start collecting profile data."""
+        global _active
+        _active = self
+        self._started = time.time()
+        self._profile.enable()
+        return self
+
+    def stop(self):
+        """Stop collecting, write the stats dump and print a summary."""
+        global _active
+        self._profile.disable()
+        self.elapsed = time.time() - self._started
+        if _active is self:
+            _active = None
+        self._profile.dump_stats(self.path)
+        stream = self.stream or sys.stderr
+        stream.write(self.summary())
+        return self
+
+    def record(self, name, wall, cpu):
+        """Accumulate wall and CPU time spent in a named section."""
+        with self._lock:
+            calls, total_wall, total_cpu = self.sections.get(name, (0, 0, 0))
+            self.sections[name] = (calls + 1, total_wall + wall,
+                                   total_cpu + cpu)
+
+    def summary(self):
+        """Render the top-N functions and per-section timings as text."""
+        buf = StringIO()
+        stats = pstats.Stats(self._profile, stream=buf)
+        stats.sort_stats("cumulative").print_stats(self.top)
+        lines = ["profile written to {} ({:.3f}s elapsed)"
+                 .format(self.path, self.elapsed or 0),
+                 "{:<12} {:>8} {:>10} {:>10} {:>10}"
+                 .format("section", "calls", "wall", "cpu", "wait")]
+        for name, (calls, wall, cpu) in sorted(self.sections.items()):
+            lines.append("{:<12} {:>8} {:>10.4f} {:>10.4f} {:>10.4f}"
+                         .format(name, calls, wall, cpu, max(wall - cpu, 0)))
+        return "{}\n{}\n".format(buf.getvalue().strip(), "\n".join(lines))
+
+
+@contextlib.contextmanager
+def section(name):
+    """Attribute wall and CPU time of the enclosed block to a section."""
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+    wall, cpu = time.time(), _cpu_time()
+    try:
+        yield
+    finally:
+        profiler.record(name, time.time() - wall, _cpu_time() - cpu)
+
+
+def timed(name):
+    """Decorate func to attribute its wall and CPU time to a section."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with section(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def from_env(top=20):
+    """Return a Profiler if requested through the environment."""
+    path = os.environ.get(ENV_VAR)
+    if not path or _active is not None:
+        return None
+    return Profiler(path=path, top=top)
@@ -0,0 +1,277 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""pynamedotcom DNS record module."""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+
+from pynamedotcom import bulk
+from pynamedotcom.exceptions import DeadlineExceeded, OutcomeUnknown
+
+
+TYPES = ["A", "AAAA", "ANAME", "CNAME", "MX", "NS", "SRV", "TXT"]
+PRIORITY_TYPES = ["MX", "SRV"]
+NAME_TYPES = ["ANAME", "CNAME", "MX", "NS", "SRV"]
+
+
+class Record(object):
+    """Record class."""
+
+    def __init__(self, session=None, id=None, domainName=None, host="",
+                 fqdn=None, type=None, answer=None, ttl=300, priority=None):
+        """Construct Record object instance."""
+        self.session = session
+        self._id = id
+        self._domain_name = domainName
+        self._host = host or ""
+        self._fqdn = fqdn
+        self._type = type.upper() if type else type
+        self._answer = answer
+        self._ttl = int(ttl) if ttl is not None else ttl
+        if self._type in PRIORITY_TYPES:
+            self._priority = priority
+        else:
+            self._priority = None
+
+    def __repr__(self):
+        return "{}({} {} {})".format(self.__class__.__name__,
+                                     self.host or "@", self.type, self.answer)
+
+    def __getattr__(self, name):
+        """Get private attributes."""
+        try:
+            return self.__getattribute__("_{}".format(name))
+        except AttributeError:
+            raise AttributeError("{} object has no attribute {}"
+                                 .format(self.__class__, name))
+
+    def __eq__(self, other):
+        if not isinstance(other, Record):
+            return NotImplemented
+        return (self.key, self.ttl) == (other.key, other.ttl)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __hash__(self):
+        return hash((self.key, self.ttl))
+
+    @property
+    def key(self):
+        """Get the identity of the record, excluding its TTL."""
+        answer = self.answer or ""
+        if self.type in NAME_TYPES:
+            answer = answer.lower().rstrip(".")
+        return (self.host.lower().rstrip("."), self.type, answer,
+                self.priority)
+
+    @property
+    def data(self):
+        """Get the record as a request body."""
+        data = {
+            "host": self.host,
+            "type": self.type,
+            "answer": self.answer,
+            "ttl": self.ttl
+        }
+        if self.priority is not None:
+            data["priority"] = self.priority
+        return data
+
+
+class RecordChange(object):
+    """RecordChange class."""
+
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+    def __init__(self, action, desired=None, current=None):
+        """Construct RecordChange object instance."""
+        self.action = action
+        self.desired = desired
+        self.current = current
+        self.result = None
+        self.error = None
+
+    def __repr__(self):
+        return "{}({} {})".format(self.__class__.__name__, self.action,
+                                  self.desired or self.current)
+
+    @property
+    def ok(self):
+        """Check whether the change was applied successfully."""
+        return self.error is None
+
+    @property
+    def unknown(self):
+        """Check whether the change may or may not have been applied."""
+        return isinstance(self.error, OutcomeUnknown)
+
+
+class Records(object):
+    """Records collection class."""
+
+    def __init__(self, domain, per_page=None):
+        """Construct Records object instance."""
+        self.domain = domain
+        self.session = domain.session
+        self.per_page = per_page
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, self.domain.name)
+
+    def __iter__(self):
+        """Get records as a generator."""
+        for record in self.session._listing(endpoint=self.endpoint,
+                                            key="records",
+                                            per_page=self.per_page):
+            yield Record(session=self.session, **record)
+
+    @property
+    def endpoint(self):
+        return "domains/{}/records".format(self.domain.name)
+
+    def get(self, id):
+        """Get a record."""
+        data = self.session._get_json(endpoint="{}/{}".format(self.endpoint,
+                                                              id))
+        return Record(session=self.session, **data)
+
+    def create(self, record):
+        """Create a record."""
+        logging.getLogger(__name__).debug("creating {} in {}"
+                                          .format(record, self.domain))
+        resp = self.session._post(endpoint=self.endpoint, data=record.data)
+        return Record(session=self.session, **self.session._json(resp))
+
+    def update(self, record, id=None):
+        """Update a record in place, by default the one with record.id."""
+        id = id or record.id
+        logging.getLogger(__name__).debug("updating {} to {} in {}"
+                                          .format(id, record, self.domain))
+        resp = self.session._put(endpoint="{}/{}".format(self.endpoint, id),
+                                 data=record.data)
+        return Record(session=self.session, **self.session._json(resp))
+
+    def delete(self, record):
+        """Delete a record."""
+        logging.getLogger(__name__).debug("deleting {} from {}"
+                                          .format(record, self.domain))
+        self.session._delete(endpoint="{}/{}".format(self.endpoint,
+                                                     record.id))
+
+    def diff(self, desired, current=None):
+        """
+        Compute the minimal set of changes to reach the desired records.
+
+        Records that match exactly are left alone, records that differ only
+        in TTL or answer for the same host and type are updated in place,
+        and the remainder are created or deleted.
+        """
+        if current is None:
+            current = self
+        remaining = {}
+        for record in current:
+            remaining.setdefault(record.key, []).append(record)
+        desired = [record if isinstance(record, Record)
+                   else Record(session=self.session, **record)
+                   for record in desired]
+        changes, unmatched = self._match(desired, remaining)
+        leftovers = {}
+        for records in remaining.values():
+            for record in records:
+                leftovers.setdefault(record.key[:2], []).append(record)
+        changes.extend(self._pair(unmatched, leftovers))
+        for records in leftovers.values():
+            for record in records:
+                changes.append(RecordChange(RecordChange.DELETE,
+                                            current=record))
+        return changes
+
+    @staticmethod
+    def _match(desired, remaining):
+        """
+        Match desired records to current records with the same key.
+
+        Matched records are removed from remaining, and updated if their
+        TTL differs. Returns the updates and the unmatched records.
+        """
+        changes = []
+        unmatched = []
+        for record in desired:
+            matches = remaining.get(record.key)
+            if not matches:
+                unmatched.append(record)
+                continue
+            same_ttl = [m for m in matches if m.ttl == record.ttl]
+            existing = same_ttl[0] if same_ttl else matches[0]
+            matches.remove(existing)
+            if existing.ttl != record.ttl:
+                changes.append(RecordChange(RecordChange.UPDATE,
+                                            desired=record, current=existing))
+        return changes, unmatched
+
+    @staticmethod
+    def _pair(unmatched, leftovers):
+        """
+        Update leftover records with the same host and type in place.
+
+        Paired records are removed from leftovers, and the rest of
+        unmatched are created.
+        """
+        changes = []
+        for record in unmatched:
+            candidates = leftovers.get(record.key[:2])
+            if candidates:
+                changes.append(RecordChange(RecordChange.UPDATE,
+                                            desired=record,
+                                            current=candidates.pop(0)))
+            else:
+                changes.append(RecordChange(RecordChange.CREATE,
+                                            desired=record))
+        return changes
+
+    def sync(self, desired, workers=bulk.DEFAULT_WORKERS):
+        """
+        Apply the changes needed to reach the desired records.
+
+        Changes not attempted before the current deadline expired are
+        returned with a DeadlineExceeded error, and changes still in flight
+        when it expired with an OutcomeUnknown error.
+        """
+        changes = self.diff(desired)
+        attempted = set()
+        for change, result, error in bulk.execute(
+                self._apply, changes, workers=workers,
+                limiter=self.session.limiter):
+            attempted.add(id(change))
+            change.result = result
+            change.error = error
+        for change in changes:
+            if id(change) not in attempted:
+                change.error = DeadlineExceeded("deadline exceeded")
+        return changes
+
+    def _apply(self, change):
+        """Apply a single change."""
+        if change.action == RecordChange.CREATE:
+            return self.create(change.desired)
+        elif change.action == RecordChange.UPDATE:
+            return self.update(change.desired, id=change.current.id)
+        else:
+            return self.delete(change.current)
@@ -0,0 +1,287 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""pynamedotcom record and replay transport module."""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import collections
+import gzip
+import io
+import itertools
+import json
+import logging
+import threading
+import time
+
+try:
+    from httplib import responses as reasons
+    from urlparse import urlparse
+except ImportError:
+    from http.client import responses as reasons
+    from urllib.parse import urlparse
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from pynamedotcom import bulk
+from pynamedotcom.codec import Serialised
+from pynamedotcom.hedge import percentile
+
+
+HEADERS = ["Content-Type"]
+
+
+def _text(body):
+    """Get a request or response body as text."""
+    if body is None:
+        return None
+    if isinstance(body, bytes):
+        return body.decode("utf-8")
+    return body
+
+
+def _body(body):
+    """Get a request body as text, with any JSON in a canonical form."""
+    body = _text(body)
+    if not body:
+        return body
+    try:
+        return json.dumps(json.loads(body), sort_keys=True)
+    except ValueError:
+        return body
+
+
+def _key(method, path, query, body):
+    """Get the key matching a request to its recorded responses."""
+    return (method, path, query or "", _body(body) or "")
+
+
+def load(path):
+    """Get recorded exchanges from a file as a list of dicts."""
+    with gzip.open(path, "rb") as f:
+        return [json.loads(line.decode("utf-8")) for line in f
+                if line.strip()]
+
+
+class Recorder(HTTPAdapter):
+    """
+    Transport adapter recording exchanges to a file.
+
+    Each request is sent as usual and appended to path, with its response
+    and latency, as a line of gzipped JSON. Credentials and the host are
+    not recorded. Streamed responses are read in full before they are
+    returned.
+    """
+
+    def __init__(self, path, **kwargs):
+        """Construct Recorder object instance."""
+        super(Recorder, self).__init__(**kwargs)
+        self.path = path
+        self.recorded = 0
+        self._file = gzip.open(path, "ab")
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, self.path)
+
+    def send(self, request, **kwargs):
+        start = time.time()
+        resp = super(Recorder, self).send(request, **kwargs)
+        content = resp.content
+        url = urlparse(request.url)
+        entry = {
+            "method": request.method,
+            "path": url.path,
+            "query": url.query,
+            "body": _body(request.body),
+            "status": resp.status_code,
+            "headers": dict((name, resp.headers[name]) for name in HEADERS
+                            if name in resp.headers),
+            "content": _text(content),
+            "latency": round(time.time() - start, 6)
+        }
+        line = "{}\n".format(json.dumps(entry, sort_keys=True))
+        with self._lock:
+            self._file.write(line.encode("utf-8"))
+            self.recorded += 1
+        return resp
+
+    def close(self):
+        super(Recorder, self).close()
+        with self._lock:
+            self._file.close()
+
+
+class Replayer(BaseAdapter):
+    """
+    Transport adapter serving recorded exchanges.
+
+    Requests are matched to recordings by method, path, query and body,
+    with JSON bodies compared regardless of formatting and key order;
+    repeated requests get the recorded responses in turn, starting over
+    after the last. Each response is delayed by its recorded latency
+    divided by speed, or not at all if speed is 0. Unmatched requests get
+    a 404 response.
+    """
+
+    def __init__(self, entries, speed=1.0, sleep=time.sleep):
+        """Construct Replayer object instance."""
+        super(Replayer, self).__init__()
+        if not isinstance(entries, list):
+            entries = load(entries)
+        self.entries = entries
+        self.speed = speed
+        self.unmatched = 0
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        recordings = collections.OrderedDict()
+        for entry in entries:
+            key = _key(entry["method"], entry["path"], entry["query"],
+                       entry["body"])
+            recordings.setdefault(key, []).append(entry)
+        self._cycles = dict((key, itertools.cycle(recorded))
+                            for key, recorded in recordings.items())
+
+    def __repr__(self):
+        return "{}({} exchanges, x{})".format(self.__class__.__name__,
+                                              len(self.entries), self.speed)
+
+    def send(self, request, **kwargs):
+        url = urlparse(request.url)
+        key = _key(request.method, url.path, url.query, request.body)
+        with self._lock:
+            cycle = self._cycles.get(key)
+            entry = next(cycle) if cycle is not None else None
+            if entry is None:
+                self.unmatched += 1
+        if entry is None:
+            logging.getLogger(__name__).warning(
+                "no recording for {} {}".format(request.method, request.url))
+            entry = {"status": 404, "content": '{"message": "Not Found"}',
+                     "headers": {"Content-Type": "application/json"}}
+        elif self.speed:
+            self._sleep(entry["latency"] / float(self.speed))
+        content = (entry["content"] or "").encode("utf-8")
+        resp = requests.Response()
+        resp.status_code = entry["status"]
+        resp.reason = reasons.get(entry["status"])
+        resp.headers = CaseInsensitiveDict(entry["headers"])
+        resp.raw = io.BytesIO(content)
+        resp._content = content
+        resp._content_consumed = True
+        resp.encoding = "utf-8"
+        resp.url = request.url
+        resp.request = request
+        resp.connection = self
+        return resp
+
+    def close(self):
+        pass
+
+
+class BenchResult(object):
+    """Throughput and latency of a benchmark run."""
+
+    def __init__(self, latencies, errors, elapsed):
+        """Construct BenchResult object instance."""
+        self.latencies = latencies
+        self.errors = errors
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return "{}({} requests, {:.1f}/s)".format(self.__class__.__name__,
+                                                  self.count,
+                                                  self.throughput)
+
+    @property
+    def count(self):
+        """Get the number of requests made."""
+        return len(self.latencies)
+
+    @property
+    def throughput(self):
+        """Get requests per second."""
+        return self.count / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, p):
+        """Get the p-th percentile latency in seconds."""
+        return percentile(self.latencies, p)
+
+
+def _calls(api, entries):
+    """Get the API request arguments for recorded exchanges."""
+    prefix = urlparse(api.base_url).path
+    calls = []
+    for entry in entries:
+        endpoint = entry["path"]
+        if endpoint.startswith(prefix):
+            endpoint = endpoint[len(prefix):]
+        calls.append((entry["method"], endpoint.lstrip("/"),
+                      entry["query"] or None,
+                      Serialised(entry["body"].encode("utf-8"))
+                      if entry["body"] else None))
+    return calls
+
+
+class _Bench(object):
+    """Requests shared between benchmark worker threads."""
+
+    def __init__(self, api, calls, total):
+        self.api = api
+        self.calls = calls
+        self.total = total
+        self.latencies = []
+        self.errors = collections.Counter()
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def worker(self):
+        """Make requests until total have been made."""
+        while True:
+            with self._lock:
+                n = next(self._counter)
+            if n >= self.total:
+                return
+            method, endpoint, params, data = self.calls[n % len(self.calls)]
+            start = time.time()
+            try:
+                self.api._request(method, endpoint=endpoint, params=params,
+                                  data=data)
+            except Exception as e:
+                with self._lock:
+                    self.errors[e.__class__.__name__] += 1
+                continue
+            latency = time.time() - start
+            with self._lock:
+                self.latencies.append(latency)
+
+
+def bench(api, entries, total=None, workers=bulk.DEFAULT_WORKERS):
+    """
+    Replay recorded requests through api from concurrent workers.
+
+    The recorded requests are made in turn, starting over after the last,
+    until total have been made (by default one pass), with workers
+    threads each making one request at a time. Responses are not decoded.
+    """
+    calls = _calls(api, entries)
+    run = _Bench(api, calls, len(calls) if total is None else total)
+    threads = [threading.Thread(target=run.worker) for _ in range(workers)]
+    start = time.time()
+    if calls:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return BenchResult(run.latencies, run.errors, time.time() - start)
@@ -14,6 +14,8 @@
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import heapq
+
 
 class SearchResult(object):
     """SearchResult class."""
@@ -31,6 +33,7 @@ class SearchResult(object):
         self._purchase_price = purchasePrice
         self._purchase_type = purchaseType
         self._renewal_price = renewalPrice
+        self._stale = False
 
     def __repr__(self):
         return "{}({})".format(self.__class__.__name__, self.name)
@@ -42,3 +45,28 @@ class SearchResult(object):
         except AttributeError:
             raise AttributeError("{} object has no attribute {}"
                                  .format(self.__class__, name))
+
+    @property
+    def data(self):
+        """Get the result as returned by the API."""
+        return {
+            "domainName": self.name,
+            "sld": self.sld,
+            "tld": self.tld,
+            "purchasable": self.purchasable,
+            "premium": self.premium,
+            "purchasePrice": self.purchase_price,
+            "purchaseType": self.purchase_type,
+            "renewalPrice": self.renewal_price
+        }
+
+
+def top_by_price(results, count):
+    """
+    Get the cheapest purchasable results, in order of purchase price.
+
+    Results without a purchase price are ranked after all priced results.
+    """
+    return heapq.nsmallest(count, (r for r in results if r.purchasable),
+                           key=lambda r: (r.purchase_price is None,
+                                          r.purchase_price or 0))
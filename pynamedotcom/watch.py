@@ -0,0 +1,211 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""pynamedotcom change watcher module."""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import hashlib
+import json
+import logging
+import threading
+
+from pynamedotcom import bulk, deadline
+from pynamedotcom.export import as_dict
+
+
+class Event(object):
+    """Base change event class."""
+
+    kind = None
+
+    def __init__(self, name):
+        """Construct Event object instance."""
+        self.name = name
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, self.name)
+
+    def as_dict(self):
+        """Convert the event to a dict."""
+        return {"event": self.kind, "name": self.name}
+
+
+class DomainAdded(Event):
+    """Event indicating a domain has appeared in the account."""
+
+    kind = "added"
+
+    def __init__(self, name, data):
+        """Construct DomainAdded object instance."""
+        super(DomainAdded, self).__init__(name)
+        self.data = data
+
+    def as_dict(self):
+        """Convert the event to a dict."""
+        return dict(super(DomainAdded, self).as_dict(), data=self.data)
+
+
+class DomainRemoved(Event):
+    """Event indicating a domain has left the account."""
+
+    kind = "removed"
+
+
+class FieldChanged(Event):
+    """Event indicating a change to a single domain field."""
+
+    kind = "changed"
+
+    def __init__(self, name, field, old, new):
+        """Construct FieldChanged object instance."""
+        super(FieldChanged, self).__init__(name)
+        self.field = field
+        self.old = old
+        self.new = new
+
+    def __repr__(self):
+        return "{}({}.{}: {!r} -> {!r})".format(self.__class__.__name__,
+                                                self.name, self.field,
+                                                self.old, self.new)
+
+    def as_dict(self):
+        """Convert the event to a dict."""
+        return dict(super(FieldChanged, self).as_dict(), field=self.field,
+                    old=self.old, new=self.new)
+
+
+def _digest(data):
+    """Get a content hash of a domain dict."""
+    return hashlib.sha1(json.dumps(data, sort_keys=True)
+                        .encode("utf-8")).hexdigest()
+
+
+class Watcher(object):
+    """
+    Poll the domains listing and emit events for changes.
+
+    Each poll fetches only the paginated listing and compares a content
+    hash per domain with the previous snapshot; domains whose hash changed
+    are re-fetched in full and diffed field by field. The poll interval
+    starts at interval, is multiplied by backoff after every poll without
+    changes, up to max_interval, and is reset when a change is seen.
+    A listing cut short by the current deadline is discarded, and run
+    returns once the deadline has expired.
+    """
+
+    def __init__(self, api, interval=60, max_interval=3600, backoff=2.0,
+                 workers=bulk.DEFAULT_WORKERS, per_page=None,
+                 sleep=None):
+        """Construct Watcher object instance."""
+        self.api = api
+        self.min_interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.workers = workers
+        self.per_page = per_page
+        self.interval = interval
+        self.callbacks = []
+        self._stop = threading.Event()
+        self._sleep = sleep or self._stop.wait
+        self._hashes = None
+        self._snapshot = {}
+
+    def __repr__(self):
+        return "{}(interval={})".format(self.__class__.__name__,
+                                        self.interval)
+
+    def subscribe(self, callback):
+        """Register a callback to be called with each event."""
+        self.callbacks.append(callback)
+        return callback
+
+    def invalidate(self, name):
+        """Force a domain to be re-fetched on the next poll."""
+        if self._hashes is not None:
+            self._hashes[name] = None
+
+    def apply_notification(self, notification):
+        """Re-fetch a domain on the next poll after an event notification."""
+        self.invalidate(notification.domain_name)
+
+    def poll(self):
+        """Poll once, returning the list of events emitted."""
+        listing = {}
+        for domain in self.api.iter_domains(per_page=self.per_page):
+            data = as_dict(domain)
+            listing[domain.name] = (_digest(data), data)
+        if deadline.expired():
+            # a truncated listing would report the rest as removed
+            logging.getLogger(__name__).warning(
+                "deadline exceeded listing domains, poll discarded")
+            return []
+        events = []
+        if self._hashes is None:
+            self._snapshot = dict((name, data)
+                                  for name, (_, data) in listing.items())
+        else:
+            changed = [name for name, (digest, _) in listing.items()
+                       if self._hashes.get(name) != digest]
+            for name, domain, error in bulk.execute(
+                    self.api.domain, changed, workers=self.workers,
+                    limiter=self.api.limiter):
+                if error is not None:
+                    logging.getLogger(__name__).warning(
+                        "failed to fetch {}: {}".format(name, error))
+                    listing[name] = (None, self._snapshot.get(name))
+                    continue
+                events.extend(self._diff(name, as_dict(domain)))
+            for name in sorted(set(self._hashes) - set(listing)):
+                self._snapshot.pop(name, None)
+                events.append(DomainRemoved(name))
+        self._hashes = dict((name, digest)
+                            for name, (digest, _) in listing.items())
+        for event in events:
+            for callback in self.callbacks:
+                callback(event)
+        if events:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff,
+                                self.max_interval)
+        return events
+
+    def _diff(self, name, new):
+        """Compare a fresh domain dict with the snapshot."""
+        old = self._snapshot.get(name)
+        self._snapshot[name] = new
+        if old is None:
+            return [DomainAdded(name, new)]
+        events = []
+        for field in sorted(new):
+            if field == "contacts" and not old.get(field):
+                # listing snapshots do not include contacts
+                continue
+            if old.get(field) != new[field]:
+                events.append(FieldChanged(name, field, old.get(field),
+                                           new[field]))
+        return events
+
+    def run(self, polls=None):
+        """Poll repeatedly until stopped, sleeping between polls."""
+        count = 0
+        while not self._stop.is_set() and not deadline.expired():
+            self.poll()
+            count += 1
+            if polls is not None and count >= polls:
+                break
+            self._sleep(deadline.timeout(self.interval))
+
+    def stop(self):
+        """Stop a running watcher after the current poll."""
+        self._stop.set()
@@ -0,0 +1,263 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""pynamedotcom BIND zone file module."""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import logging
+import multiprocessing
+import re
+
+from pynamedotcom.exceptions import ZoneFileError
+from pynamedotcom.record import NAME_TYPES, PRIORITY_TYPES, Record, TYPES
+
+
+CLASSES = ["IN", "CH", "HS", "CS"]
+DEFAULT_TTL = 300
+
+_token = re.compile(r'"((?:[^"\\]|\\.)*)"|([()])|(;.*)|([^\s"();]+)')
+_escape = re.compile(r'\\(\d{3}|.)')
+_ttl = re.compile(r'^(\d+[smhdw]?)+$', re.IGNORECASE)
+_ttl_part = re.compile(r'(\d+)([smhdw]?)', re.IGNORECASE)
+_ttl_units = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def _error(message, lineno):
+    """Prefix an error message with the line number."""
+    return "line {}: {}".format(lineno, message)
+
+
+def _unescape(text):
+    """Remove master file escapes from a quoted string."""
+    def replace(match):
+        value = match.group(1)
+        if value.isdigit():
+            return chr(int(value))
+        return value
+    return _escape.sub(replace, text)
+
+
+def _tokens(line, tokens):
+    """Append the tokens on a line to tokens, returning the paren depth."""
+    depth = 0
+    for match in _token.finditer(line):
+        quoted, paren, comment, bare = match.groups()
+        if comment is not None:
+            break
+        elif paren is not None:
+            depth += 1 if paren == "(" else -1
+        elif quoted is not None:
+            tokens.append((_unescape(quoted), True))
+        else:
+            tokens.append((bare, False))
+    return depth
+
+
+def _entries(lines):
+    """Yield logical entries, joining parenthesised continuation lines."""
+    tokens, blank_owner, depth, start = [], False, 0, 0
+    for lineno, line in enumerate(lines, 1):
+        if depth == 0:
+            tokens, start = [], lineno
+            blank_owner = line[:1] in (" ", "\t")
+        depth += _tokens(line, tokens)
+        if depth < 0:
+            raise ZoneFileError(_error("unbalanced parentheses", start))
+        if depth == 0 and tokens:
+            yield start, blank_owner, tokens
+    if depth:
+        raise ZoneFileError(_error("unterminated parentheses", start))
+
+
+def _parse_ttl(value):
+    """Convert a TTL with optional unit suffixes to seconds."""
+    return sum(int(number) * _ttl_units[unit.lower()]
+               for number, unit in _ttl_part.findall(value))
+
+
+def _absolute(name, origin):
+    """Make a domain name absolute relative to origin."""
+    if name == "@":
+        return origin
+    if name.endswith("."):
+        return name.lower()
+    return "{}.{}".format(name, origin).lower()
+
+
+def _directive(tokens, origin, ttl, lineno):
+    """Apply a $ORIGIN or $TTL directive, returning the origin and TTL."""
+    name = tokens[0][0].upper()
+    if name == "$ORIGIN" and len(tokens) > 1:
+        return _absolute(tokens[1][0], origin), ttl
+    if name == "$TTL" and len(tokens) > 1:
+        return origin, _parse_ttl(tokens[1][0])
+    raise ZoneFileError(_error("unsupported directive {}"
+                               .format(tokens[0][0]), lineno))
+
+
+def _ttl_and_type(tokens, ttl, lineno):
+    """Consume the optional TTL and class, and the type, from tokens."""
+    while tokens and not tokens[0][1]:
+        value = tokens[0][0]
+        if _ttl.match(value):
+            ttl = _parse_ttl(value)
+        elif value.upper() not in CLASSES:
+            break
+        tokens.pop(0)
+    if not tokens:
+        raise ZoneFileError(_error("missing record type", lineno))
+    return ttl, tokens.pop(0)[0].upper()
+
+
+def _host(owner, zone):
+    """Get an owner name relative to zone, or None if outside it."""
+    if owner == zone:
+        return ""
+    if owner.endswith(".{}".format(zone)):
+        return owner[:-len(zone) - 1]
+    return None
+
+
+def _txt(tokens):
+    """
+    Join TXT character-strings into an answer.
+
+    Adjacent quoted strings, such as those written by format_record() for
+    long answers, are concatenated; unquoted words are kept apart by a
+    space.
+    """
+    answer, previous = "", None
+    for value, quoted in tokens:
+        if previous is not None and not (quoted and previous):
+            answer += " "
+        answer += value
+        previous = quoted
+    return answer
+
+
+def _rdata(rtype, tokens, origin, lineno):
+    """Convert record data tokens to a priority and answer."""
+    priority = None
+    if rtype in PRIORITY_TYPES:
+        if len(tokens) < 2:
+            raise ZoneFileError(_error("malformed {} record".format(rtype),
+                                       lineno))
+        priority = int(tokens.pop(0)[0])
+    if not tokens:
+        raise ZoneFileError(_error("missing {} record data".format(rtype),
+                                   lineno))
+    if rtype == "TXT":
+        return priority, _txt(tokens)
+    rdata = [value for value, _ in tokens]
+    if rtype in NAME_TYPES:
+        rdata[-1] = _absolute(rdata[-1], origin).rstrip(".")
+    return priority, " ".join(rdata)
+
+
+def parse(lines, domain, origin=None, default_ttl=DEFAULT_TTL):
+    """
+    Parse a BIND master file into Record objects, as a generator.
+
+    Lines are consumed lazily, so the zone text is never held in memory
+    as a whole. Records for the zone apex SOA and NS sets (managed by
+    name.com), types unsupported by the API, and owners outside the zone
+    are skipped. Only the $ORIGIN and $TTL directives are supported;
+    $INCLUDE, which would read arbitrary local files, raises
+    ZoneFileError like any other.
+    """
+    logger = logging.getLogger(__name__)
+    zone = "{}.".format(domain.rstrip(".").lower())
+    origin = _absolute(origin, zone) if origin else zone
+    ttl = None
+    owner = None
+    for lineno, blank_owner, tokens in _entries(lines):
+        first, quoted = tokens[0]
+        if not blank_owner and first.startswith("$") and not quoted:
+            origin, ttl = _directive(tokens, origin, ttl, lineno)
+            continue
+        if not blank_owner:
+            owner = _absolute(tokens.pop(0)[0], origin)
+        elif owner is None:
+            raise ZoneFileError(_error("no owner name", lineno))
+        record_ttl, rtype = _ttl_and_type(tokens, ttl, lineno)
+        host = _host(owner, zone)
+        if host == "" and rtype in ("SOA", "NS"):
+            continue
+        if rtype not in TYPES:
+            logger.debug("skipping unsupported {} record for {}"
+                         .format(rtype, owner))
+            continue
+        if host is None:
+            logger.warning("skipping {} record for {}, outside zone {}"
+                           .format(rtype, owner, zone))
+            continue
+        priority, answer = _rdata(rtype, tokens, origin, lineno)
+        yield Record(host=host, type=rtype, answer=answer,
+                     ttl=record_ttl if record_ttl is not None
+                     else default_ttl,
+                     priority=priority)
+
+
+def _parse_file(args):
+    """Parse a zone file into request bodies for a worker process."""
+    path, domain = args
+    with io.open(path, encoding="utf-8") as f:
+        return path, [record.data for record in parse(f, domain=domain)]
+
+
+def parse_files(zones, processes=None):
+    """
+    Parse several zone files in parallel worker processes.
+
+    zones is an iterable of ``(path, domain)`` pairs. Yields ``(path,
+    records)`` pairs as each file completes.
+    """
+    pool = multiprocessing.Pool(processes=processes)
+    try:
+        for path, records in pool.imap_unordered(_parse_file, zones):
+            yield path, [Record(**data) for data in records]
+    finally:
+        pool.terminate()
+
+
+def _quote(text, size=255):
+    """Quote a TXT answer, splitting it into character-strings."""
+    escaped = [text[i:i + size].replace("\\", "\\\\").replace('"', '\\"')
+               for i in range(0, len(text), size)] or [""]
+    return " ".join('"{}"'.format(chunk) for chunk in escaped)
+
+
+def format_record(record):
+    """Format a Record as a master file entry relative to its zone."""
+    if record.type == "TXT":
+        rdata = _quote(record.answer or "")
+    elif record.type in NAME_TYPES:
+        rdata = record.answer.rstrip(".")
+        rdata = "{}.".format(rdata) if rdata else "."
+    else:
+        rdata = record.answer
+    if record.priority is not None:
+        rdata = "{} {}".format(record.priority, rdata)
+    return "{}\t{}\tIN\t{}\t{}".format(record.host or "@", record.ttl,
+                                       record.type, rdata)
+
+
+def write(records, fileobj, domain):
+    """Write Record objects to a master file as they are produced."""
+    fileobj.write("$ORIGIN {}.\n".format(domain.rstrip(".")))
+    count = 0
+    for record in records:
+        fileobj.write("{}\n".format(format_record(record)))
+        count += 1
+    return count
@@ -15,10 +15,25 @@
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import collections
 import json
 import os
+import re
+import socket
+import sys
+import threading
+
 import pytest
 
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qs, urlparse
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs, urlparse
+
 from pynamedotcom import API
 
 
@@ -43,3 +58,109 @@ def domain(api):
     with api() as api:
         domain = api.domain(name=name)
     return domain
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Request handler dispatching to StandIn routes."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        with self.server.standin.lock:
+            self.server.standin.connections += 1
+
+    def _handle(self):
+        standin = self.server.standin
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        request = {
+            "method": self.command,
+            "path": url.path,
+            "query": parse_qs(url.query),
+            "headers": dict(self.headers.items()),
+            "body": json.loads(body.decode("utf-8")) if body else None,
+            "raw": body
+        }
+        with standin.lock:
+            standin.requests[(self.command, url.path)] += 1
+        status, data = 404, {"message": "Not Found"}
+        for method, pattern, func in standin.routes:
+            match = pattern.match(url.path)
+            if method == self.command and match:
+                request["match"] = match
+                result = func(request)
+                if isinstance(result, tuple):
+                    status, data = result
+                else:
+                    status, data = 200, result
+                break
+        payload = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _StandInServer(ThreadingMixIn, HTTPServer):
+    """Threaded HTTP server."""
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # clients closing pooled connections are expected
+        if not issubclass(sys.exc_info()[0], socket.error):
+            HTTPServer.handle_error(self, request, client_address)
+
+
+class StandIn(object):
+    """Local stand-in for the name.com API."""
+
+    def __init__(self):
+        """Construct StandIn object instance."""
+        self.routes = []
+        self.requests = collections.Counter()
+        self.connections = 0
+        self.lock = threading.Lock()
+        self._server = _StandInServer(("127.0.0.1", 0), _StandInHandler)
+        self._server.standin = self
+
+    @property
+    def host(self):
+        return "{}:{}".format(*self._server.server_address[:2])
+
+    def route(self, method, pattern, func):
+        """Answer requests matching method and path regex with func."""
+        self.routes.append((method, re.compile("/v4/{}$".format(pattern)),
+                            func))
+
+    def api(self, **kwargs):
+        """Create an API instance talking to the stand-in."""
+        return API(host=self.host, scheme="http", user="user", token="token",
+                   **kwargs)
+
+    def start(self):
+        thread = threading.Thread(target=self._server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def standin():
+    """Create a running local stand-in server."""
+    server = StandIn()
+    server.start()
+    yield server
+    server.stop()
@@ -0,0 +1,141 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom accounts module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import base64
+import json
+import threading
+
+import pytest
+import requests
+
+from pynamedotcom import accounts
+from pynamedotcom.accounts import Accounts
+from pynamedotcom.bulk import RateLimit
+from pynamedotcom.deadline import Deadline
+from pynamedotcom.exceptions import DeadlineExceeded
+
+
+def _user(request):
+    auth = request["headers"]["Authorization"].split()[1]
+    return base64.b64decode(auth).decode("utf-8").split(":")[0]
+
+
+def _serve(standin):
+    """Serve a listing of three domains per user, failing for 'broken'."""
+    def listing(request):
+        user = _user(request)
+        if user == "broken":
+            return 500, {"message": "Internal Server Error"}
+        return {"domains": [{"domainName": "{}{}.com".format(user, i)}
+                            for i in range(3)]}
+
+    standin.route("GET", "domains", listing)
+    standin.route("POST", "domains:checkAvailability", _check)
+
+
+def _check(request):
+    return {"results": [{"domainName": name, "sld": name.split(".")[0],
+                         "tld": "com", "purchasable": True}
+                        for name in request["body"]["domainNames"]]}
+
+
+def _credentials(*users):
+    return dict((user, {"user": user, "token": "secret"}) for user in users)
+
+
+class TestAccounts(object):
+    """Multi-account client test cases."""
+
+    def test_load(self, tmpdir):
+        """Test reading and validating a credentials file."""
+        path = tmpdir.join("accounts.json")
+        path.write(json.dumps(_credentials("one", "two")))
+        assert sorted(accounts.load(str(path))) == ["one", "two"]
+        path.write(json.dumps({"one": {"user": "one"}}))
+        with pytest.raises(ValueError):
+            accounts.load(str(path))
+
+    def test_domains(self, standin):
+        """Test merged listings, with one failing account."""
+        _serve(standin)
+        with Accounts(_credentials("alpha", "beta", "broken"),
+                      host=standin.host, scheme="http") as client:
+            results = list(client.domains())
+        names = sorted((r.account, r.result) for r in results
+                       if r.error is None)
+        assert names == [(user, "{}{}.com".format(user, i))
+                         for user in ("alpha", "beta") for i in range(3)]
+        errors = [r for r in results if r.error is not None]
+        assert [r.account for r in errors] == ["broken"]
+        assert isinstance(errors[0].error, requests.HTTPError)
+
+    def test_check_availability(self, standin):
+        """Test names are spread over accounts and checked once each."""
+        users = set()
+        both = threading.Event()
+
+        def check(request):
+            # hold each account's first batch until both have taken one
+            users.add(_user(request))
+            if len(users) == 2:
+                both.set()
+            both.wait(5)
+            return _check(request)
+
+        standin.route("POST", "domains:checkAvailability", check)
+        _serve(standin)
+        names = ["name{}.com".format(i) for i in range(40)]
+        with Accounts(_credentials("alpha", "beta"), host=standin.host,
+                      scheme="http", rate=100) as client:
+            results = list(client.check_availability_bulk(names,
+                                                          batch_size=2))
+        assert sorted(r.result.name for r in results) == sorted(names)
+        assert set(r.account for r in results) == set(["alpha", "beta"])
+        for api in client.apis.values():
+            assert isinstance(api.rate_limit, RateLimit)
+
+
+class TestRateLimit(object):
+    """Rate limit test cases."""
+
+    def test_acquire(self):
+        """Test requests beyond the burst wait for tokens."""
+        now = [0.0]
+        waits = []
+        limit = RateLimit(2, burst=2, clock=lambda: now[0],
+                          sleep=waits.append)
+        for _ in range(4):
+            limit.acquire()
+        assert waits == [0.5, 1.0]
+        now[0] = 10.0
+        limit.acquire()
+        assert len(waits) == 2
+
+    def test_deadline_refund(self):
+        """Test no token is taken when the deadline cuts a wait short."""
+        now = [0.0]
+        waits = []
+        limit = RateLimit(1, burst=1, clock=lambda: now[0],
+                          sleep=waits.append)
+        limit.acquire()
+        with pytest.raises(DeadlineExceeded):
+            with Deadline(0.5, clock=lambda: now[0]):
+                limit.acquire()
+        assert waits == [0.5]
+        now[0] = 1.0
+        limit.acquire()
+        assert waits == [0.5]
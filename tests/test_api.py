@@ -15,11 +15,14 @@
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import threading
+
 import pytest
+import requests
 
 from pynamedotcom.contact import Contact, ROLES
 from pynamedotcom.domain import Domain
-from pynamedotcom.search import SearchResult
+from pynamedotcom.search import SearchResult, top_by_price
 
 
 class TestAPI(object):
@@ -52,6 +55,15 @@ class TestAPI(object):
             name = "maddison.family"
             assert name in api.domains
 
+    def test_iter_domains(self, api):
+        """Test streamed Domain object retrieval."""
+        with api() as api:
+            name = "maddison.family"
+            domains = list(api.iter_domains(per_page=1))
+            for domain in domains:
+                assert isinstance(domain, Domain)
+            assert name in [domain.name for domain in domains]
+
     def test_search_available(self, api):
         """Test successful availablility search."""
         with api() as api:
@@ -73,3 +85,163 @@ class TestAPI(object):
             assert not result.purchasable
             with pytest.raises(AttributeError):
                 result.not_a_property
+
+    def test_check_availability_bulk(self, api):
+        """Test batched availability checks."""
+        with api() as api:
+            names = ["maddison.name", "maddison.family"]
+            results = {result.name: result for result
+                       in api.check_availability_bulk(names, batch_size=1)}
+            assert sorted(results) == sorted(names)
+            assert results["maddison.name"].purchasable
+            assert not results["maddison.family"].purchasable
+
+    def test_search_stream(self, api):
+        """Test streamed keyword search."""
+        with api() as api:
+            results = list(api.search(keyword="maddison", tlds=["name"]))
+            assert results
+            for result in results:
+                assert isinstance(result, SearchResult)
+                assert result.name.startswith("maddison")
+
+    def test_search_stream_stop(self, api):
+        """Test streamed keyword search with an early stop condition."""
+        with api() as api:
+            results = list(api.search(keyword="maddison",
+                                      stop=lambda result: True))
+            assert len(results) == 1
+
+    def test_top_by_price(self):
+        """Test selection of the cheapest available results."""
+        results = [SearchResult(session=None, domainName="{}.com".format(i),
+                                sld=str(i), tld="com", purchasable=i != 1,
+                                purchasePrice=float(10 - i))
+                   for i in range(5)]
+        assert [r.name for r in top_by_price(results, 2)] == \
+            ["4.com", "3.com"]
+        results[4]._purchase_price = None
+        assert [r.name for r in top_by_price(results, 4)] == \
+            ["3.com", "2.com", "0.com", "4.com"]
+
+
+class _Versioned(object):
+    """Stand-in domain whose fields change together with each write."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = 0
+
+    def data(self):
+        return {
+            "domainName": "example.com",
+            "nameservers": ["ns{}.example.net".format(self.version)],
+            "locked": self.version % 2 == 1,
+            "renewalPrice": float(self.version)
+        }
+
+    def get(self, request):
+        with self.lock:
+            return self.data()
+
+    def bump(self, locked):
+        def func(request):
+            with self.lock:
+                self.version += 1
+                if (self.version % 2 == 1) != locked:
+                    self.version += 1
+                return self.data()
+        return func
+
+
+def _share(api, domain, index, errors, iterations=20):
+    """Write, refresh or fetch a shared domain, checking its snapshots."""
+    try:
+        for i in range(iterations):
+            if index % 4 == 0:
+                domain.locked = bool(i % 2)
+            elif index % 4 == 1:
+                domain.refresh()
+            else:
+                api.domain("example.com")
+            snapshot = domain.snapshot
+            version = int(snapshot.renewal_price)
+            assert snapshot.locked == (version % 2 == 1)
+            assert snapshot.nameservers == \
+                ("ns{}.example.net".format(version),)
+    except Exception as e:
+        errors.append(e)
+
+
+class TestThreadSafety(object):
+    """Shared API client test cases against a local stand-in."""
+
+    def test_shared_client(self, standin):
+        """Test many threads sharing one API and Domain instance."""
+        versioned = _Versioned()
+        standin.route("GET", r"domains/example\.com", versioned.get)
+        standin.route("POST", r"domains/example\.com:lock",
+                      versioned.bump(True))
+        standin.route("POST", r"domains/example\.com:unlock",
+                      versioned.bump(False))
+        threads = 32
+        errors = []
+        with standin.api(pool_size=threads) as api:
+            domain = api.domain("example.com")
+            workers = [threading.Thread(target=_share,
+                                        args=(api, domain, index, errors))
+                       for index in range(threads)]
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+        assert not errors
+        assert sum(standin.requests.values()) > threads
+        assert standin.connections <= threads
+
+    def test_write_fences_reads(self, standin):
+        """Test reads after a write do not join reads started before it."""
+        entered = threading.Event()
+        release = threading.Event()
+        state = {"locked": False}
+
+        def get(request):
+            locked = state["locked"]
+            if not entered.is_set():
+                entered.set()
+                release.wait(5)
+            return {"domainName": "example.com", "locked": locked}
+
+        def lock(request):
+            state["locked"] = True
+            return {"domainName": "example.com", "locked": True}
+
+        standin.route("GET", r"domains/example\.com", get)
+        standin.route("POST", r"domains/example\.com:lock", lock)
+        results = []
+        with standin.api() as api:
+            domain = Domain(session=api, domainName="example.com")
+            reader = threading.Thread(
+                target=lambda: results.append(api.domain("example.com")))
+            reader.start()
+            assert entered.wait(5)
+            domain.locked = True
+            domain.refresh()
+            release.set()
+            reader.join(5)
+        assert domain.locked
+        assert not results[0].locked
+        assert standin.requests[("GET", "/v4/domains/example.com")] == 2
+
+    def test_stream_error(self, standin):
+        """Test failed streamed responses return their connections."""
+        standin.route("GET", "domains",
+                      lambda request: (500, {"message": "Internal Error"}))
+        errors = []
+        with standin.api() as api:
+            for _ in range(3):
+                with pytest.raises(requests.HTTPError) as e:
+                    list(api.iter_domains())
+                errors.append(e.value)
+        assert errors[0].response.json() == {"message": "Internal Error"}
+        assert standin.connections == 1
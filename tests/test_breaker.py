@@ -0,0 +1,117 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom breaker module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import threading
+
+import pytest
+import requests
+
+from pynamedotcom.breaker import CLOSED, CircuitBreaker, HALF_OPEN, OPEN
+from pynamedotcom.exceptions import CircuitOpenError
+
+
+class TestCircuitBreaker(object):
+    """Circuit breaker test cases."""
+
+    def test_states(self):
+        """Test opening, fast failure, half-open trial and closing."""
+        now = [0]
+        states = []
+        breaker = CircuitBreaker(failure_rate=0.5, window=4, min_calls=4,
+                                 reset_timeout=10, clock=lambda: now[0])
+        breaker.subscribe(states.append)
+        for success in (True, False, True):
+            breaker.record(success, breaker.before())
+        assert breaker.state == CLOSED
+        breaker.record(False, breaker.before())
+        assert breaker.state == OPEN
+        assert breaker.failures == 0.5
+        with pytest.raises(CircuitOpenError):
+            breaker.before()
+        assert breaker.rejected == 1
+        now[0] = 10
+        assert breaker.state == HALF_OPEN
+        trial = breaker.before()
+        with pytest.raises(CircuitOpenError):
+            breaker.before()
+        breaker.record(False, trial)
+        assert breaker.state == OPEN
+        now[0] = 20
+        breaker.record(True, breaker.before())
+        assert breaker.state == CLOSED
+        assert breaker.failures == 0.0
+        assert states == [OPEN, HALF_OPEN, OPEN, HALF_OPEN, CLOSED]
+        assert [state for _, state in breaker.history] == [CLOSED] + states
+
+    def test_lost_trial(self):
+        """Test a trial request that never reports back is given up on."""
+        now = [0]
+        breaker = CircuitBreaker(min_calls=1, reset_timeout=10,
+                                 clock=lambda: now[0])
+        breaker.record(False)
+        now[0] = 10
+        breaker.before()
+        now[0] = 20
+        breaker.before()
+        assert breaker.state == HALF_OPEN
+
+    def test_stale(self):
+        """Test requests admitted before half-open are not trials."""
+        now = [0]
+        breaker = CircuitBreaker(min_calls=1, reset_timeout=10,
+                                 half_open_calls=2, clock=lambda: now[0])
+        stale = breaker.before()
+        breaker.record(False, breaker.before())
+        assert breaker.state == OPEN
+        now[0] = 10
+        trials = [breaker.before(), breaker.before()]
+        breaker.record(False, stale)
+        assert breaker.state == HALF_OPEN
+        breaker.record(True, trials[0])
+        assert breaker.state == HALF_OPEN
+        breaker.record(True, trials[1])
+        assert breaker.state == CLOSED
+        breaker.record(False, trials[0])
+        assert breaker.failures == 0.0
+
+    def test_callback_unlocked(self):
+        """Test callbacks run without holding the breaker's lock."""
+        breaker = CircuitBreaker(min_calls=1)
+        seen = []
+
+        def callback(state):
+            thread = threading.Thread(
+                target=lambda: seen.append(breaker.state))
+            thread.start()
+            thread.join(5)
+
+        breaker.subscribe(callback)
+        breaker.record(False, breaker.before())
+        assert seen == [OPEN]
+
+    def test_api(self, standin):
+        """Test the API fails fast while the circuit is open."""
+        standin.route("GET", "hello", lambda request: (503, {}))
+        breaker = CircuitBreaker(min_calls=2)
+        with standin.api(breaker=breaker) as api:
+            for _ in range(2):
+                with pytest.raises(requests.HTTPError):
+                    api.ping()
+            assert breaker.state == OPEN
+            with pytest.raises(CircuitOpenError):
+                api.ping()
+        assert sum(standin.requests.values()) == 2
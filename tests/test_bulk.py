@@ -0,0 +1,129 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom bulk module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import threading
+import time
+
+from pynamedotcom import bulk
+
+
+class TestBulk(object):
+    """Bulk execution test cases."""
+
+    def test_execute(self):
+        """Test bounded concurrent execution with per-item errors."""
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def func(item):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.01)
+            with lock:
+                state["running"] -= 1
+            if item == 3:
+                raise ValueError(item)
+            return item * 2
+
+        results = {item: (result, error) for item, result, error
+                   in bulk.execute(func, iter(range(20)), workers=4)}
+        assert state["peak"] <= 4
+        assert len(results) == 20
+        assert isinstance(results[3][1], ValueError)
+        assert results[4] == (8, None)
+
+
+class TestAdaptiveLimiter(object):
+    """Adaptive concurrency limit test cases."""
+
+    def test_increase(self):
+        """Test the limit grows by about one per round of requests."""
+        limiter = bulk.AdaptiveLimiter(initial=4, maximum=6,
+                                       clock=lambda: 0)
+        for _ in range(4):
+            limiter.observe(0.1, status=200)
+        assert limiter.limit == 4
+        for _ in range(100):
+            limiter.observe(0.1, status=200)
+        assert limiter.limit == 6
+        assert [limit for _, limit, _ in limiter.history] == [4, 5, 6]
+
+    def test_decrease(self):
+        """Test throttling, errors and latency spikes cut the limit."""
+        now = [0]
+        limiter = bulk.AdaptiveLimiter(initial=16, cooldown=1.0,
+                                       clock=lambda: now[0])
+        limiter.observe(0.1, status=200)
+        limiter.observe(0.1, status=429)
+        assert limiter.limit == 8
+        limiter.observe(0.1, status=503)
+        assert limiter.limit == 8
+        now[0] = 2
+        limiter.observe(1.0, status=200)
+        assert limiter.limit == 4
+        now[0] = 4
+        limiter.observe(0.1, error=True)
+        assert limiter.limit == 2
+        assert [reason for _, _, reason in limiter.history][-3:] == \
+            ["error 429", "latency 1.000s", "error connection"]
+
+    def test_latency_step(self):
+        """Test the limit recovers after a lasting rise in latency."""
+        now = [0]
+        limiter = bulk.AdaptiveLimiter(initial=12, cooldown=1.0,
+                                       clock=lambda: now[0])
+        for _ in range(20):
+            limiter.observe(0.05, status=200)
+        for _ in range(200):
+            now[0] += 0.5
+            limiter.observe(0.2, status=200)
+        lowest = min(limit for _, limit, _ in limiter.history)
+        assert lowest < 12
+        assert limiter.baseline > 0.2 / limiter.latency_factor
+        assert limiter.limit >= 12
+        assert limiter.history[-1][2] == "increase"
+
+    def test_minimum(self):
+        """Test the limit does not fall below the minimum."""
+        now = [0]
+        limiter = bulk.AdaptiveLimiter(initial=2, minimum=1, cooldown=0,
+                                       clock=lambda: now[0])
+        for _ in range(5):
+            limiter.observe(0.1, status=500)
+        assert limiter.limit == 1
+
+    def test_execute(self):
+        """Test bulk execution follows the limit."""
+        limiter = bulk.AdaptiveLimiter(initial=2, maximum=2)
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def func(item):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.01)
+            with lock:
+                state["running"] -= 1
+            limiter.observe(0.01, status=200)
+            return item
+
+        results = list(bulk.execute(func, range(10), workers=8,
+                                    limiter=limiter))
+        assert len(results) == 10
+        assert state["peak"] <= 2
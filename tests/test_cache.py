@@ -0,0 +1,110 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom cache module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import timeit
+
+from pynamedotcom.cache import AvailabilityCache
+from pynamedotcom.search import SearchResult
+
+
+class Clock(object):
+    """Manually advanced clock."""
+
+    def __init__(self):
+        """Construct Clock object instance."""
+        self.now = 1000.0
+
+    def __call__(self):
+        """Get the current time."""
+        return self.now
+
+
+def result(name, purchasable):
+    """Build a SearchResult."""
+    return SearchResult(session=None, domainName=name, sld=name.split(".")[0],
+                        tld=name.split(".")[1], purchasable=purchasable,
+                        purchasePrice=12.99 if purchasable else None)
+
+
+class TestAvailabilityCache(object):
+    """Availability cache test cases."""
+
+    def test_ttls(self):
+        """Test separate expiry of available and unavailable results."""
+        clock = Clock()
+        cache = AvailabilityCache(available_ttl=10, unavailable_ttl=100,
+                                  price_max_age=5, clock=clock)
+        cache.put(result("free.com", True))
+        cache.put(result("taken.com", False))
+        hit = cache.get("FREE.com.")
+        assert hit.name == "free.com"
+        assert hit.purchase_price == 12.99
+        assert not hit.stale
+        clock.now += 6
+        assert cache.get("free.com").stale
+        assert not cache.get("taken.com").stale
+        clock.now += 5
+        assert cache.get("free.com") is None
+        assert cache.get("taken.com") is not None
+        cache.purge()
+        assert len(cache) == 1
+        assert (cache.hits, cache.misses) == (4, 1)
+
+    def test_default_stale(self):
+        """Test stale prices are observable with the default settings."""
+        clock = Clock()
+        cache = AvailabilityCache(clock=clock)
+        cache.put(result("free.com", True))
+        clock.now += cache.price_max_age + 1
+        assert cache.get("free.com").stale
+        clock.now = 1000.0 + cache.available_ttl + 1
+        assert cache.get("free.com") is None
+
+    def test_unnormalised_name(self):
+        """Test names the API accepts but IDNA rejects are cached."""
+        name = "{}.com".format("x" * 64)
+        cache = AvailabilityCache()
+        cache.put(result(name, False))
+        assert cache.get(name.upper()).name == name
+
+    def test_max_entries(self):
+        """Test the oldest entries are evicted beyond the limit."""
+        cache = AvailabilityCache(max_entries=2)
+        for name in ["a.com", "b.com", "c.com"]:
+            cache.put(result(name, False))
+        assert len(cache) == 2
+        assert cache.get("a.com") is None
+        assert cache.get("c.com") is not None
+
+    def test_persistence(self, tmpdir):
+        """Test sharing results through the on-disk store."""
+        clock = Clock()
+        path = str(tmpdir.join("cache.db"))
+        AvailabilityCache(path=path, clock=clock).put(result("a.com", False))
+        cache = AvailabilityCache(path=path, clock=clock)
+        assert cache.get("a.com").data == result("a.com", False).data
+        clock.now += 86401
+        cache.purge()
+        assert AvailabilityCache(path=path, clock=clock).get("a.com") is None
+
+    def test_hit_latency(self):
+        """Test that cache hits are fast."""
+        cache = AvailabilityCache()
+        cache.put(result("fast.com", True))
+        elapsed = min(timeit.repeat(lambda: cache.get("fast.com"),
+                                    number=1000, repeat=3)) / 1000
+        assert elapsed < 0.0005
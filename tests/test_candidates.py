@@ -0,0 +1,65 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom candidates module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pytest
+
+from pynamedotcom import candidates
+from pynamedotcom.search import SearchResult
+
+
+class TestCandidates(object):
+    """Candidate generation test cases."""
+
+    def test_normalise(self):
+        """Test name normalisation."""
+        assert candidates.normalise(" Example.COM. ") == "example.com"
+        assert candidates.normalise("b\u00fccher.de") == "xn--bcher-kva.de"
+        for name in ["example", "a..com", "{}.com".format("a" * 64)]:
+            with pytest.raises(ValueError):
+                candidates.normalise(name)
+
+    def test_generate(self):
+        """Test lazy, de-duplicated candidate generation."""
+        names = candidates.generate(["Shop", "shop", "b\u00fccher"],
+                                    tlds=["com", ".net"], prefixes=["my"])
+        assert next(names) == "shop.com"
+        assert list(names) == ["shop.net", "myshop.com", "myshop.net",
+                               "xn--bcher-kva.com", "xn--bcher-kva.net",
+                               "xn--mybcher-p2a.com", "xn--mybcher-p2a.net"]
+
+    @pytest.mark.parametrize("capacity", [None, 1000])
+    def test_survivors(self, capacity):
+        """Test filtering of names known to be unavailable."""
+        results = [SearchResult(session=None, domainName=name, sld=None,
+                                tld=None, purchasable=purchasable)
+                   for name, purchasable in [("taken.com", False),
+                                             ("free.com", True)]]
+        index = candidates.known_names(owned=["Mine.com"], results=results,
+                                       capacity=capacity)
+        names = candidates.generate(["mine", "taken", "free", "new"],
+                                    tlds=["com"])
+        assert list(candidates.survivors(names, index)) == \
+            ["free.com", "new.com"]
+
+    def test_bloom_filter(self):
+        """Test bloom filter false positive rate."""
+        bloom = candidates.BloomFilter(capacity=10000, error_rate=0.01)
+        bloom.update("{}.com".format(i) for i in range(10000))
+        assert all("{}.com".format(i) in bloom for i in range(10000))
+        false_positives = sum("{}.net".format(i) in bloom
+                              for i in range(10000))
+        assert false_positives < 200
@@ -67,6 +67,15 @@ class TestCLI(object):
         assert result.exit_code == 0
         assert "OK" in result.output
 
+    def test_ping_profile(self, tmpdir):
+        """Test ping command with profiling enabled."""
+        path = str(tmpdir.join("stats.prof"))
+        args = ["--profile", path, "ping"]
+        result = self.invoke(args=args)
+        assert result.exit_code == 0
+        assert "OK" in result.output
+        assert os.path.exists(path)
+
     def test_get_domains(self):
         """Test domain list retrieval."""
         args = ["domains"]
@@ -74,6 +83,22 @@ class TestCLI(object):
         assert result.exit_code == 0
         assert "maddison.family" in result.output
 
+    def test_export(self):
+        """Test streaming domain export."""
+        args = ["export", "--format", "jsonl"]
+        result = self.invoke(args=args)
+        assert result.exit_code == 0
+        names = [json.loads(line)["name"]
+                 for line in result.output.splitlines()]
+        assert "maddison.family" in names
+
+    def test_expiring(self):
+        """Test expiring domains query."""
+        args = ["expiring", "--within", "36500d"]
+        result = self.invoke(args=args)
+        assert result.exit_code == 0
+        assert "maddison.family" in result.output
+
     def test_get_domain(self):
         """Test domain detail retrieval."""
         name = "maddison.family"
@@ -196,6 +221,29 @@ class TestCLI(object):
         assert result.exit_code == 0
         assert re.match(r'\$\d+.\d{2}', result.output)
 
+    def test_search_stream(self):
+        """Test streamed keyword search."""
+        args = ["search", "--stream", "--top", "3", "maddison"]
+        result = self.invoke(args=args)
+        assert result.exit_code == 0
+        assert len(result.output.splitlines()) <= 3
+        assert "maddison" in result.output
+
+    def test_search_options_require_stream(self):
+        """Test streamed search options are rejected without --stream."""
+        args = ["search", "--top", "3", "maddison.name"]
+        result = self.invoke(args=args)
+        assert result.exit_code == 2
+        assert "--stream" in result.output
+
+    def test_export_records(self):
+        """Test exporting domain records as a zone file."""
+        name = "maddison.family"
+        args = ["records", "export", name]
+        result = self.invoke(args=args)
+        assert result.exit_code == 0
+        assert result.output.startswith("$ORIGIN {}.".format(name))
+
     def test_search_available(self):
         """Test successful availablility search."""
         name = "maddison.name"
@@ -215,3 +263,14 @@ class TestCLI(object):
         assert name in result.output
         for keyword in ["premium", "type", "purchase price", "renewal price"]:
             assert keyword not in result.output
+
+    def test_accounts_domains(self, tmpdir):
+        """Test listing domains across accounts."""
+        with open(os.path.join(os.path.dirname(__file__), "auth.json")) as f:
+            auth = json.load(f)
+        path = tmpdir.join("accounts.json")
+        path.write(json.dumps({"dev": auth}))
+        args = ["accounts", "--accounts-file", str(path), "domains"]
+        result = self.invoke(args=args)
+        assert result.exit_code == 0
+        assert "dev maddison.family" in result.output
@@ -0,0 +1,146 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom coalesce module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import threading
+import time
+
+import pytest
+
+from pynamedotcom.coalesce import SingleFlight
+
+
+def _run(threads, target):
+    workers = [threading.Thread(target=target) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def _wait_for(predicate, timeout=5):
+    event = threading.Event()
+    stop = time.time() + timeout
+    while not predicate():
+        assert time.time() < stop
+        event.wait(0.001)
+
+
+class _Interrupt(BaseException):
+    pass
+
+
+class TestSingleFlight(object):
+    """Single-flight coalescing test cases."""
+
+    def test_coalesce(self):
+        """Test concurrent calls share one invocation and its result."""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def func():
+            calls.append(1)
+            release.wait(5)
+            return {"domainName": "example.com"}
+
+        workers = _run(10, lambda: results.append(flight.do("key", func,
+                                                            label="ep")))
+        _wait_for(lambda: sum(flight.coalesced.values()) == 9)
+        release.set()
+        for worker in workers:
+            worker.join()
+        assert len(calls) == 1
+        assert len(results) == 10
+        assert all(result == results[0] for result in results)
+        assert len(set(id(result) for result in results)) == 10
+        assert flight.coalesced == {"ep": 9}
+
+    def test_sequential(self):
+        """Test calls that do not overlap are not coalesced."""
+        flight = SingleFlight()
+        assert flight.do("key", lambda: 1) == 1
+        assert flight.do("key", lambda: 2) == 2
+        assert not flight.coalesced
+
+    def test_error(self):
+        """Test waiting callers receive the leader's exception."""
+        flight = SingleFlight()
+        release = threading.Event()
+        errors = []
+
+        def func():
+            release.wait(5)
+            raise ValueError("boom")
+
+        def call():
+            try:
+                flight.do("key", func)
+            except ValueError as e:
+                errors.append(e)
+
+        workers = _run(3, call)
+        _wait_for(lambda: sum(flight.coalesced.values()) == 2)
+        release.set()
+        for worker in workers:
+            worker.join()
+        assert len(errors) == 3
+        with pytest.raises(ValueError):
+            flight.do("key", func)
+
+    def test_base_exception(self):
+        """Test waiting callers receive a BaseException from the leader."""
+        flight = SingleFlight()
+        release = threading.Event()
+        errors = []
+
+        def func():
+            release.wait(5)
+            raise _Interrupt()
+
+        def call():
+            try:
+                flight.do("key", func)
+            except _Interrupt as e:
+                errors.append(e)
+
+        workers = _run(3, call)
+        _wait_for(lambda: sum(flight.coalesced.values()) == 2)
+        release.set()
+        for worker in workers:
+            worker.join(5)
+        assert len(errors) == 3
+        assert flight.do("key", lambda: 1) == 1
+
+    def test_fence(self):
+        """Test calls after a fence are not joined to earlier calls."""
+        flight = SingleFlight()
+        release = threading.Event()
+        results = []
+
+        def stale():
+            release.wait(5)
+            return "stale"
+
+        workers = _run(1, lambda: results.append(flight.do("key", stale)))
+        _wait_for(lambda: flight._calls)
+        flight.fence()
+        assert flight.do("key", lambda: "fresh") == "fresh"
+        release.set()
+        for worker in workers:
+            worker.join(5)
+        assert results == ["stale"]
+        assert not flight.coalesced
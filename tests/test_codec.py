@@ -0,0 +1,102 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom codec module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import json
+
+import pytest
+
+from pynamedotcom.codec import CODECS, JSONArrayStream, JSONCodec, \
+    get_codec
+
+
+def chunked(data, size):
+    """Split bytes into chunks of the given size."""
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestCodec(object):
+    """Codec test cases."""
+
+    @pytest.mark.parametrize("name", sorted(CODECS))
+    def test_round_trip(self, name):
+        """Test encoding and decoding with each available codec."""
+        codec = get_codec(name)
+        obj = {"domainName": "example.com", "nameservers": ["ns1.example.com"]}
+        data = codec.dumps(obj)
+        assert isinstance(data, bytes)
+        assert codec.loads(data) == obj
+
+    def test_unknown_codec(self):
+        """Test requesting an unknown codec."""
+        with pytest.raises(ValueError):
+            get_codec("not-a-codec")
+
+    @pytest.mark.parametrize("size", [1, 7, 4096])
+    def test_array_stream(self, size):
+        """Test incremental decoding of a listing."""
+        domains = [{"domainName": "{}.example.\u00e9".format(i),
+                    "locked": bool(i % 2)} for i in range(50)]
+        body = json.dumps({"totalCount": 50, "domains": domains,
+                           "nextPage": 2, "lastPage": 3}).encode("utf-8")
+        listing = JSONArrayStream(chunked(body, size), "domains")
+        assert list(listing) == domains
+        assert listing.meta == {"totalCount": 50, "nextPage": 2,
+                                "lastPage": 3}
+
+    def test_array_stream_strings(self):
+        """Test brackets and escapes inside strings split across chunks."""
+        domains = [{"domainName": "a]}\\\"{[.example.com", "tags": [[], {}]},
+                   "plain", 42, None, [1, [2]]]
+        body = json.dumps({"domains": domains}).encode("utf-8")
+        for size in range(1, 8):
+            listing = JSONArrayStream(chunked(body, size), "domains")
+            assert list(listing) == domains
+
+    def test_array_stream_codec(self):
+        """Test array members are decoded with the given codec."""
+        class Counting(JSONCodec):
+            calls = 0
+
+            def loads(self, data):
+                Counting.calls += 1
+                return super(Counting, self).loads(data)
+
+        body = json.dumps({"domains": [{"a": i} for i in range(10)],
+                           "lastPage": 1}).encode("utf-8")
+        listing = JSONArrayStream(chunked(body, 5), "domains",
+                                  codec=Counting())
+        assert len(list(listing)) == 10
+        assert listing.meta == {"lastPage": 1}
+        assert Counting.calls == 11
+
+    def test_array_stream_missing(self):
+        """Test incremental decoding of a listing without the array."""
+        listing = JSONArrayStream([b'{"lastPage": 1}'], "domains")
+        assert list(listing) == []
+        assert listing.meta == {"lastPage": 1}
+
+    def test_array_stream_empty(self):
+        """Test incremental decoding of an empty array."""
+        listing = JSONArrayStream([b'{"domains": [ ]}'], "domains")
+        assert list(listing) == []
+        assert listing.meta == {}
+
+    def test_array_stream_truncated(self):
+        """Test incremental decoding of a truncated body."""
+        listing = JSONArrayStream([b'{"domains": [{"a": 1}, {"a"'], "domains")
+        with pytest.raises(ValueError):
+            list(listing)
@@ -0,0 +1,133 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom contact module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import threading
+
+import pytest
+
+from pynamedotcom.contact import Contact, ContactUpdate, request_body, \
+    update_contacts
+
+
+OLD = {"firstName": "Old", "lastName": "Owner", "email": "old@example.com"}
+NEW = {"firstName": "New", "lastName": "Owner", "email": "new@example.com"}
+
+
+def contact(data):
+    """Build a detached Contact."""
+    return Contact(session=None, **data)
+
+
+class TestContact(object):
+    """Contact test cases."""
+
+    def test_equality(self):
+        """Test contacts compare by their fields."""
+        assert contact(NEW) == contact(dict(NEW))
+        assert contact(NEW) != contact(OLD)
+        assert len(set([contact(NEW), contact(NEW)])) == 1
+
+    def test_request_body(self):
+        """Test building the setContacts request body."""
+        body = request_body({"admin": contact(NEW), "tech": NEW})
+        assert body["contacts"]["admin"] == contact(NEW).data
+        assert body["contacts"]["tech"] == NEW
+        with pytest.raises(ValueError):
+            request_body({"owner": NEW})
+
+    def test_update_contacts(self, standin):
+        """Test a bulk update skips matching domains and shares a payload."""
+        lock = threading.Lock()
+        domains = {
+            "one.com": {"registrant": OLD, "admin": OLD},
+            "two.com": {"registrant": NEW, "admin": NEW},
+            "three.com": {"registrant": NEW, "admin": OLD}
+        }
+        bodies = []
+
+        def get(request):
+            name = request["match"].group(1)
+            if name == "four.com":
+                return 500, {"message": "Internal Error"}
+            return {"domainName": name, "contacts": domains[name]}
+
+        def set_contacts(request):
+            name = request["match"].group(1)
+            with lock:
+                bodies.append(request["raw"])
+                domains[name] = dict(domains[name],
+                                     **request["body"]["contacts"])
+            return {"domainName": name, "contacts": domains[name]}
+
+        standin.route("GET", r"domains/([^/:]+)", get)
+        standin.route("POST", r"domains/([^/:]+):setContacts", set_contacts)
+        names = sorted(domains) + ["four.com"]
+        with standin.api() as api:
+            reports = dict((report.name, report) for report in
+                           update_contacts(api, {"registrant": NEW,
+                                                 "admin": contact(NEW)},
+                                           names=names, workers=4))
+        assert reports["one.com"].status == ContactUpdate.UPDATED
+        assert reports["one.com"].roles == ["admin", "registrant"]
+        assert reports["two.com"].status == ContactUpdate.UNCHANGED
+        assert reports["three.com"].roles == ["admin"]
+        assert reports["four.com"].status == ContactUpdate.FAILED
+        assert not reports["four.com"].ok
+        assert len(bodies) == 2 and bodies[0] == bodies[1]
+        assert all(contact(domains[name]["admin"]) == contact(NEW)
+                   for name in ("one.com", "two.com", "three.com"))
+
+    def test_update_partial(self, standin):
+        """Test a partial contact keeps the fields it leaves out."""
+        full = dict(OLD, companyName="Example Ltd", city="Cape Town",
+                    country="ZA")
+        domains = {
+            "one.com": {"registrant": full, "admin": full},
+            "two.com": {"registrant": dict(full, email="new@example.com"),
+                        "admin": OLD}
+        }
+        bodies = {}
+
+        def get(request):
+            name = request["match"].group(1)
+            return {"domainName": name, "contacts": domains[name]}
+
+        def set_contacts(request):
+            name = request["match"].group(1)
+            bodies[name] = request["body"]["contacts"]
+            return {"domainName": name,
+                    "contacts": dict(domains[name], **bodies[name])}
+
+        standin.route("GET", r"domains/([^/:]+)", get)
+        standin.route("POST", r"domains/([^/:]+):setContacts", set_contacts)
+        with standin.api() as api:
+            reports = dict((report.name, report) for report in
+                           update_contacts(api, {"registrant": {
+                               "email": "new@example.com"}},
+                               names=sorted(domains)))
+            with pytest.raises(ValueError):
+                list(update_contacts(api, {"registrant": {"mail": "x"}},
+                                     names=[]))
+        assert reports["one.com"].roles == ["registrant"]
+        assert reports["two.com"].status == ContactUpdate.UNCHANGED
+        assert list(bodies) == ["one.com"]
+        registrant = bodies["one.com"]["registrant"]
+        assert registrant["email"] == "new@example.com"
+        assert registrant["companyName"] == "Example Ltd"
+        assert registrant["city"] == "Cape Town"
+        assert registrant["firstName"] == "Old"
+        assert "admin" not in bodies["one.com"]
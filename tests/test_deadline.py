@@ -0,0 +1,150 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom deadline module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import threading
+import time
+
+import pytest
+import requests
+
+from pynamedotcom import bulk, deadline
+from pynamedotcom.deadline import Deadline
+from pynamedotcom.domain import Domain
+from pynamedotcom.exceptions import DeadlineExceeded, OutcomeUnknown
+
+
+def _slow(standin, delay):
+    def get(request):
+        time.sleep(delay)
+        return {"domainName": "example.com"}
+    standin.route("GET", r"domains/example\.com", get)
+
+
+def _paged(standin, delay):
+    """Serve a domains listing whose second page is slow."""
+    def get(request):
+        page = int(request["query"]["page"][0])
+        if page == 1:
+            return {"domains": [{"domainName": "a.com"},
+                                {"domainName": "b.com"}],
+                    "nextPage": 2}
+        time.sleep(delay)
+        return {"domains": [{"domainName": "c.com"}]}
+    standin.route("GET", r"domains", get)
+
+
+class TestDeadline(object):
+    """Deadline test cases."""
+
+    def test_nesting(self):
+        """Test nested deadlines can only shorten the time allowed."""
+        now = [0]
+
+        def clock():
+            return now[0]
+
+        assert deadline.current() is None
+        assert deadline.timeout(5) == 5
+        with Deadline(10, clock=clock) as outer:
+            with Deadline(20, clock=clock):
+                assert deadline.current() is outer
+            with Deadline(2, clock=clock) as inner:
+                assert deadline.current() is inner
+                assert deadline.timeout(5) == 2
+                now[0] = 3
+                with pytest.raises(DeadlineExceeded):
+                    deadline.check()
+            assert deadline.current() is outer
+        assert deadline.current() is None
+
+    def test_bind(self):
+        """Test deadlines carry over to other threads when bound."""
+        seen = []
+        with Deadline(10) as limit:
+            func = deadline.bind(lambda: seen.append(deadline.current()))
+        thread = threading.Thread(target=func)
+        thread.start()
+        thread.join()
+        assert seen == [limit]
+
+    def test_request(self, standin):
+        """Test requests are cut short by the deadline."""
+        _slow(standin, 0.5)
+        with standin.api() as api:
+            start = time.time()
+            with pytest.raises(DeadlineExceeded):
+                with Deadline(0.1):
+                    api.domain("example.com")
+            assert time.time() - start < 0.4
+            with pytest.raises(DeadlineExceeded):
+                with Deadline(0):
+                    api.ping()
+        assert sum(standin.requests.values()) == 1
+
+    def test_read_timeout(self, standin):
+        """Test the read timeout applies without a deadline."""
+        _slow(standin, 0.5)
+        with standin.api(read_timeout=0.1) as api:
+            with pytest.raises(requests.Timeout):
+                api.domain("example.com")
+
+    def test_bulk(self):
+        """Test bulk execution returns partial results at the deadline."""
+        def func(item):
+            time.sleep(0.01 if item < 4 else 1)
+            return item
+
+        start = time.time()
+        with Deadline(0.3):
+            results = list(bulk.execute(func, range(100), workers=4))
+        assert time.time() - start < 0.8
+        done = [item for item, _, error in results if error is None]
+        expired = [item for item, _, error in results
+                   if isinstance(error, DeadlineExceeded)]
+        assert sorted(done) == [0, 1, 2, 3]
+        assert sorted(expired) == [4, 5, 6, 7]
+        assert all(isinstance(error, OutcomeUnknown)
+                   for item, _, error in results if item in expired)
+
+    def test_listing(self, standin):
+        """Test listings stop with partial results at the deadline."""
+        _paged(standin, 0.5)
+        with standin.api() as api:
+            with Deadline(0.2):
+                assert list(api.domains) == ["a.com", "b.com"]
+            with Deadline(0.2):
+                names = [domain.name for domain in api.iter_domains()]
+            assert names == ["a.com", "b.com"]
+            assert list(api.domains) == ["a.com", "b.com", "c.com"]
+
+    def test_sync(self, standin):
+        """Test changes in flight at the deadline have unknown outcomes."""
+        def create(request):
+            time.sleep(0.5)
+            return dict(request["body"], id=1)
+
+        standin.route("GET", r"domains/example\.com/records",
+                      lambda request: {"records": []})
+        standin.route("POST", r"domains/example\.com/records", create)
+        with standin.api() as api:
+            domain = Domain(session=api, domainName="example.com")
+            with Deadline(0.2):
+                changes = domain.records.sync([
+                    {"host": "www", "type": "A", "answer": "192.0.2.1"}])
+        assert len(changes) == 1
+        assert changes[0].unknown
+        assert not changes[0].ok
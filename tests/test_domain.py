@@ -15,12 +15,13 @@
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import datetime
 import pytest
-import re
 
 from pynamedotcom.contact import Contact
 from pynamedotcom.exceptions import (DomainUnlockTimeError,
                                      NameserverUpdateError)
+from pynamedotcom.record import Record, RecordChange
 
 
 class TestDomain(object):
@@ -59,7 +60,27 @@ class TestDomain(object):
         domain.nameservers = old_value
         assert domain.nameservers == old_value
 
-    @pytest.mark.xfail(raises=NotImplementedError)
+    def test_records_property(self, domain):
+        """Test records property."""
+        old_value = list(domain.records)
+        for record in old_value:
+            assert isinstance(record, Record)
+        new_record = Record(host="pynamedotcom-test", type="TXT",
+                            answer="test")
+        # add a record
+        changes = domain.records.sync(old_value + [new_record])
+        assert [(c.action, c.ok) for c in changes] == \
+            [(RecordChange.CREATE, True)]
+        assert new_record in list(domain.records)
+        # re-set to old value
+        changes = domain.records.sync(old_value)
+        assert [(c.action, c.ok) for c in changes] == \
+            [(RecordChange.DELETE, True)]
+        assert sorted(domain.records, key=lambda r: r.key) == \
+            sorted(old_value, key=lambda r: r.key)
+        with pytest.raises(AttributeError, match=r'read-only'):
+            domain.records = []
+
     def test_contacts_property(self, domain):
         """Test contacts property."""
         old_value = domain.contacts
@@ -136,16 +157,14 @@ class TestDomain(object):
 
     def test_expiry_property(self, domain):
         """Test expiry property."""
-        assert re.match(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z',
-                        domain.expiry)
+        assert isinstance(domain.expiry, datetime.datetime)
         new_value = "2025-06-15T10:25:05Z"
         with pytest.raises(AttributeError, match=r'read-only'):
             domain.expiry = new_value
 
     def test_created_property(self, domain):
         """Test created property."""
-        assert re.match(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z',
-                        domain.created)
+        assert isinstance(domain.created, datetime.datetime)
         new_value = "2025-06-15T10:25:05Z"
         with pytest.raises(AttributeError, match=r'read-only'):
             domain.created = new_value
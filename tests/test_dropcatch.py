@@ -0,0 +1,103 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom dropcatch module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import threading
+import time
+
+import requests
+
+from pynamedotcom.dropcatch import DropCatcher, SPIN, wait_until
+
+
+class TestDropCatcher(object):
+    """Timed registration test cases."""
+
+    def test_wait_until(self):
+        """Test waiting sleeps most of the way, then spins to the target."""
+        now = [0.0]
+        sleeps = []
+
+        def clock():
+            now[0] += 0.0001
+            return now[0]
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        wait_until(0.05, clock=clock, sleep=sleep)
+        assert len(sleeps) == 1
+        assert 0.05 - SPIN - 0.001 < sleeps[0] < 0.05 - SPIN
+        assert 0.05 <= now[0] < 0.0502
+
+    def test_drop(self, standin):
+        """Test catching names released 100ms after the target time."""
+        at = time.time() + 0.5
+        drop = at + 0.1
+        lock = threading.Lock()
+        registered = {}
+
+        def create(request):
+            name = request["body"]["domain"]["domainName"]
+            with lock:
+                if time.time() < drop or name in registered:
+                    return 400, {"message": "Domain is not available"}
+                registered[name] = request["body"]
+            return {"domain": {"domainName": name}, "totalPaid": 12.99}
+
+        standin.route("GET", "hello", lambda request: {"motd": "hi"})
+        standin.route("POST", "domains", create)
+        names = ["one.com", "two.com"]
+        with standin.api() as api:
+            catcher = DropCatcher(api, names, at=at, attempts=3,
+                                  spacing=0.2, prices={"one.com": 12.99},
+                                  warmup=0.3)
+            attempts = catcher.run()
+        assert sorted(registered) == names
+        assert registered["one.com"]["purchasePrice"] == 12.99
+        assert catcher.payloads["two.com"] == api.codec.dumps(
+            {"domain": {"domainName": "two.com"}, "years": 1})
+        sent = [attempt for attempt in attempts if attempt.sent is not None]
+        assert all(abs(attempt.offset) < 0.05 for attempt in sent)
+        assert [attempt.ok for attempt in attempts] == \
+            [False, False, True, True, False, False]
+        assert [attempt.skipped for attempt in attempts[4:]] == [True, True]
+        assert standin.connections == catcher.connections == 6
+
+    def test_warmup_failure(self, standin):
+        """Test a failed warmup connection does not abort the drop."""
+        standin.route("GET", "hello", lambda request: {"motd": "hi"})
+        standin.route("POST", "domains", lambda request: {
+            "domain": {"domainName": "one.com"}, "totalPaid": 12.99})
+        with standin.api() as api:
+            send = api._send
+            failed = []
+
+            def flaky(method, *args, **kwargs):
+                if method == "GET" and not failed:
+                    failed.append(method)
+                    raise requests.ConnectionError("refused")
+                return send(method, *args, **kwargs)
+
+            api._send = flaky
+            at = time.time() + 0.3
+            catcher = DropCatcher(api, ["one.com"], at=at, attempts=1,
+                                  connections=3, warmup=5)
+            attempts = catcher.run()
+        assert failed
+        assert attempts[0].ok
+        assert abs(attempts[0].offset) < 0.05
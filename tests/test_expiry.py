@@ -0,0 +1,90 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom expiry module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import datetime
+import os
+
+import pytest
+
+from pynamedotcom.domain import Domain
+from pynamedotcom.expiry import ExpiryIndex, parse_duration
+
+NOW = datetime.datetime(2018, 6, 1)
+
+
+def domains():
+    """Build Domain objects expiring on successive days."""
+    return [Domain(session=None, domainName="{}.com".format(i),
+                   expireDate=(NOW + datetime.timedelta(days=i))
+                   .strftime("%Y-%m-%dT%H:%M:%SZ"))
+            for i in range(100)]
+
+
+class TestExpiryIndex(object):
+    """Expiry index test cases."""
+
+    def test_parse_duration(self):
+        """Test duration parsing."""
+        assert parse_duration("30d") == datetime.timedelta(days=30)
+        assert parse_duration("12H") == datetime.timedelta(hours=12)
+        assert parse_duration("2w") == datetime.timedelta(weeks=2)
+        with pytest.raises(ValueError):
+            parse_duration("soon")
+
+    def test_within(self):
+        """Test range queries."""
+        index = ExpiryIndex(domains())
+        assert len(index) == 100
+        result = index.within(datetime.timedelta(days=3), now=NOW)
+        assert result == [("{}.com".format(i),
+                           NOW + datetime.timedelta(days=i))
+                          for i in range(3)]
+
+    def test_update(self):
+        """Test incremental updates."""
+        index = ExpiryIndex(domains())
+        index.update("0.com", NOW + datetime.timedelta(days=500))
+        index.update("new.com", NOW)
+        index.remove("1.com")
+        window = datetime.timedelta(days=3)
+        assert [name for name, _ in index.within(window, now=NOW)] == \
+            ["new.com", "2.com"]
+        assert index.expiry("0.com") == NOW + datetime.timedelta(days=500)
+        assert "1.com" not in index
+
+    def test_cached(self, tmpdir):
+        """Test the index is saved and reused until it is too old."""
+        class API(object):
+            calls = 0
+
+            def iter_domains(self, per_page=None):
+                API.calls += 1
+                return domains()
+
+        path = str(tmpdir.join("cache", "api.expiry"))
+        now = [os.path.getmtime(str(tmpdir))]
+        window = datetime.timedelta(days=3)
+        index = ExpiryIndex().cached(API(), path, clock=lambda: now[0])
+        assert API.calls == 1
+        reread = ExpiryIndex().cached(API(), path, clock=lambda: now[0])
+        assert API.calls == 1
+        assert reread.within(window, now=NOW) == \
+            index.within(window, now=NOW)
+        assert len(reread) == 100
+        now[0] += 3601
+        ExpiryIndex().cached(API(), path, clock=lambda: now[0])
+        assert API.calls == 2
@@ -0,0 +1,97 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom export module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import csv
+import io
+import json
+import subprocess
+import sys
+
+import pytest
+
+from pynamedotcom import export
+from pynamedotcom.domain import Domain
+
+
+class Account(object):
+    """Stand-in for API serving a fixed domains listing."""
+
+    def __init__(self, count):
+        """Construct Account object instance."""
+        self.count = count
+        self.limiter = None
+
+    def iter_domains(self, per_page=None):
+        """Get Domain objects as a generator."""
+        for i in range(self.count):
+            contacts = {"registrant": {"firstName": "Ben",
+                                       "email": "{}@example.com".format(i)}}
+            yield Domain(session=self, domainName="{}.com".format(i),
+                         nameservers=["ns1.example.net", "ns2.example.net"],
+                         contacts=contacts, locked=True, renewalPrice=12.5,
+                         expireDate="2019-01-01T00:00:00Z")
+
+
+class TestExport(object):
+    """Export test cases."""
+
+    def test_jsonl(self):
+        """Test JSON lines export."""
+        buf = io.StringIO()
+        count = export.export(Account(3), buf, format="jsonl", contacts=False)
+        lines = [json.loads(line) for line in buf.getvalue().splitlines()]
+        assert count == len(lines) == 3
+        assert lines[1]["name"] == "1.com"
+        assert lines[1]["expiry"] == "2019-01-01T00:00:00Z"
+        assert lines[1]["contacts"]["registrant"]["email"] == \
+            "1@example.com"
+
+    def test_csv(self):
+        """Test CSV export."""
+        buf = io.StringIO()
+        export.export(Account(3), buf, format="csv", contacts=False)
+        buf.seek(0)
+        rows = list(csv.DictReader(buf))
+        assert [row["name"] for row in rows] == ["0.com", "1.com", "2.com"]
+        assert rows[2]["nameservers"] == "ns1.example.net ns2.example.net"
+        assert rows[2]["registrant_email"] == "2@example.com"
+        assert rows[2]["admin_email"] == ""
+
+    def test_parquet(self, tmpdir):
+        """Test Parquet export in several row groups."""
+        pq = pytest.importorskip("pyarrow.parquet")
+        path = str(tmpdir.join("domains.parquet"))
+        with open(path, "wb") as f:
+            export.write_parquet(export.domains(Account(25), contacts=False),
+                                 f, batch_size=10)
+        parquet = pq.ParquetFile(path)
+        assert parquet.metadata.num_row_groups == 3
+        table = parquet.read()
+        assert table.num_rows == 25
+        assert table.column("registrant_email").to_pylist()[24] == \
+            "24@example.com"
+
+    def test_unknown_format(self):
+        """Test requesting an unknown format."""
+        with pytest.raises(ValueError):
+            export.export(Account(1), io.StringIO(), format="xml")
+
+    def test_lazy_pyarrow(self):
+        """Test importing the CLI does not load pyarrow."""
+        code = ("import sys, pynamedotcom.cli; "
+                "sys.exit('pyarrow' in sys.modules)")
+        assert subprocess.call([sys.executable, "-c", code]) == 0
@@ -0,0 +1,94 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom hedge module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import itertools
+import time
+
+from pynamedotcom.hedge import HedgePolicy, percentile
+
+
+def _skewed(standin, slow_every=10, slow=0.25, fast=0.002):
+    """Serve a domain with one slow response in every slow_every."""
+    counter = itertools.count(1)
+
+    def get(request):
+        time.sleep(slow if next(counter) % slow_every == 0 else fast)
+        return {"domainName": "example.com"}
+
+    standin.route("GET", r"domains/example\.com", get)
+
+
+def _latencies(api, count):
+    latencies = []
+    for _ in range(count):
+        start = time.time()
+        api.domain("example.com")
+        latencies.append(time.time() - start)
+    return latencies
+
+
+class TestHedgePolicy(object):
+    """Hedge policy test cases."""
+
+    def test_percentile(self):
+        """Test nearest rank percentiles."""
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 51
+        assert percentile(values, 99) == 99
+        assert percentile(values, 100) == 100
+        assert percentile([], 50) is None
+
+    def test_delay(self):
+        """Test the delay follows recent latencies once warmed up."""
+        policy = HedgePolicy(percentile=90, min_samples=10, min_delay=0.01)
+        for latency in range(10):
+            assert policy.delay() is None
+            policy.record(latency / 100.0)
+        assert policy.delay() == 0.08
+        policy = HedgePolicy(min_samples=1, min_delay=0.01)
+        policy.record(0.001)
+        assert policy.delay() == 0.01
+
+    def test_budget(self):
+        """Test hedges are capped at a fraction of requests."""
+        policy = HedgePolicy(budget=0.1)
+        policy.requests = 20
+        assert policy.allow()
+        assert policy.allow()
+        assert not policy.allow()
+        assert policy.hedged == 2
+
+    def test_inline(self):
+        """Test calls that cannot be hedged do not use the executor."""
+        policy = HedgePolicy(budget=0, min_samples=1)
+        assert policy.run(None, lambda: 1) == 1
+        assert policy.run(None, lambda: 2) == 2
+        assert policy.requests == 2
+        assert policy.hedged == 0
+
+    def test_tail_latency(self, standin):
+        """Test hedging cuts tail latency against a skewed stand-in."""
+        _skewed(standin)
+        with standin.api() as api:
+            plain = _latencies(api, 100)
+        policy = HedgePolicy(percentile=80, budget=0.2, min_samples=10)
+        with standin.api(hedge=policy) as api:
+            hedged = _latencies(api, 100)
+        assert percentile(plain, 99) >= 0.25
+        assert percentile(hedged, 99) < 0.25
+        assert 0 < policy.hedged <= 0.2 * policy.requests
+        assert policy.wins > 0
@@ -0,0 +1,103 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom inventory module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import datetime
+import time
+
+import pytest
+
+from pynamedotcom import inventory
+from pynamedotcom.domain import Domain
+from pynamedotcom.inventory import Inventory
+
+backends = [False]
+if inventory.numpy is not None:
+    backends.append(True)
+
+
+def domains(count):
+    """Build Domain objects with varied properties."""
+    start = datetime.datetime(2018, 1, 1)
+    return [Domain(session=None, domainName="{}.com".format(i),
+                   nameservers=["ns{}.example.net".format(i % 3),
+                                "ns.example.org"],
+                   locked=i % 2 == 0, autorenewEnabled=i % 5 == 0,
+                   privacyEnabled=False, renewalPrice=10.0 + i % 4,
+                   expireDate=(start + datetime.timedelta(days=i))
+                   .strftime("%Y-%m-%dT%H:%M:%SZ"))
+            for i in range(count)]
+
+
+@pytest.fixture(scope="module")
+def large():
+    """Build a large list of Domain objects."""
+    return domains(100000)
+
+
+@pytest.mark.parametrize("use_numpy", backends)
+class TestInventory(object):
+    """Inventory test cases."""
+
+    def test_filters(self, use_numpy):
+        """Test filter and aggregate expressions."""
+        inv = Inventory.from_domains(domains(20), use_numpy=use_numpy)
+        assert len(inv) == 20
+        assert len(inv.nameserver_sets) == 3
+        unlocked = inv["locked"] == False  # noqa: E712
+        assert inv.count(unlocked) == 10
+        assert inv.sum("renewal_price", unlocked) == \
+            sum(10.0 + i % 4 for i in range(1, 20, 2))
+        manual = inv["autorenew"] == False  # noqa: E712
+        mask = manual & inv.uses_nameserver("NS1.example.net.")
+        assert inv.names(mask) == ["1.com", "4.com", "7.com", "13.com",
+                                   "16.com", "19.com"]
+        early = inv["expiry"] < datetime.datetime(2018, 1, 3)
+        assert inv.names(early | ~unlocked) == \
+            ["0.com", "1.com"] + ["{}.com".format(i) for i in range(2, 20, 2)]
+
+    def test_where(self, use_numpy):
+        """Test selecting rows into a new inventory."""
+        inv = Inventory.from_domains(domains(20), use_numpy=use_numpy)
+        subset = inv.where(inv["renewal_price"].isin([10.0, 11.0]))
+        assert len(subset) == 10
+        assert subset.count(subset["locked"] == True) == 5  # noqa: E712
+
+    def test_performance(self, use_numpy, large):
+        """Test queries are fast relative to building the inventory."""
+        start = time.time()
+        inv = Inventory.from_domains(large, use_numpy=use_numpy)
+        build = time.time() - start
+        start = time.time()
+        unlocked = inv["locked"] == False  # noqa: E712
+        mask = unlocked & inv.uses_nameserver("ns1.example.net")
+        total = inv.sum("renewal_price", mask)
+        query = time.time() - start
+        assert inv.count(mask) == sum(1 for i in range(100000)
+                                      if i % 2 and i % 3 == 1)
+        assert total > 0
+        assert query < build / 5
+
+
+class TestBackend(object):
+    """Inventory backend selection test cases."""
+
+    def test_numpy_missing(self, monkeypatch):
+        """Test requesting NumPy when it is not installed."""
+        monkeypatch.setattr(inventory, "numpy", None)
+        with pytest.raises(ImportError):
+            Inventory.from_domains(domains(2), use_numpy=True)
+        assert Inventory.from_domains(domains(2)).use_numpy is False
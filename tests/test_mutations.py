@@ -0,0 +1,145 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom mutations module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import threading
+import time
+
+import pytest
+
+from pynamedotcom.domain import Domain
+from pynamedotcom.exceptions import NameserverUpdateError
+from pynamedotcom.mutations import MutationQueue
+
+
+class _Interrupt(BaseException):
+    pass
+
+
+def _serve(standin, delay=0.05, overlap=None):
+    """
+    Serve lock, unlock and nameserver changes, logging their order.
+
+    If overlap is an Event, it is set once two changes are in progress at
+    the same time, and each change waits for it before completing.
+    """
+    lock = threading.Lock()
+    log = []
+    state = {}
+    active = set()
+
+    def mutate(request):
+        name, action = request["match"].groups()
+        if overlap is not None:
+            with lock:
+                active.add(name)
+                if len(active) > 1:
+                    overlap.set()
+            overlap.wait(5)
+        time.sleep(delay)
+        with lock:
+            log.append((name, action))
+            data = state.setdefault(name, {"domainName": name})
+            if action == "setNameservers":
+                if "bad.example.net" in request["body"]["nameservers"]:
+                    return 500, {"message": "Internal Server Error",
+                                 "details": "Data Management Policy "
+                                            "Violation"}
+                data["nameservers"] = request["body"]["nameservers"]
+            else:
+                data["locked"] = action == "lock"
+            return dict(data)
+
+    standin.route("POST", r"domains/([\w.]+):(\w+)", mutate)
+    return log
+
+
+class TestMutationQueue(object):
+    """Mutation queue test cases."""
+
+    def test_order(self, standin):
+        """Test per-domain ordering and cross-domain parallelism."""
+        overlap = threading.Event()
+        log = _serve(standin, overlap=overlap)
+        with standin.api() as api:
+            domains = [Domain(session=api, domainName="{}.com".format(i))
+                       for i in range(4)]
+            with MutationQueue(workers=4) as queue:
+                futures = []
+                for domain in domains:
+                    queued = queue.domain(domain)
+                    futures.append(queued.set_locked(True))
+                    futures.append(queued.set_locked(False))
+                    futures.append(queued.set_nameservers(["ns1.example"]))
+                assert not queue.flush()
+        assert all(future.done() for future in futures)
+        assert overlap.is_set()
+        for domain in domains:
+            assert [action for name, action in log if name == domain.name] \
+                == ["lock", "unlock", "setNameservers"]
+            assert domain.locked is False
+            assert domain.nameservers == ["ns1.example"]
+        snapshot = futures[2].result()
+        assert snapshot.nameservers == ("ns1.example",)
+
+    def test_errors(self, standin):
+        """Test errors are reported through futures."""
+        _serve(standin, delay=0)
+        with standin.api() as api:
+            queue = MutationQueue()
+            queued = queue.domain(Domain(session=api,
+                                         domainName="example.com"))
+            failed = queued.set_nameservers(["bad.example.net"])
+            mistyped = queued.set_locked("yes")
+            locked = queued.set_locked(True)
+            queue.join()
+        assert isinstance(failed.exception(), NameserverUpdateError)
+        assert isinstance(mistyped.exception(), TypeError)
+        assert locked.result().locked is True
+        assert queued.locked is True
+        with pytest.raises(RuntimeError):
+            queued.set_locked(False)
+
+    def test_interrupt(self):
+        """Test an interrupted mutation does not stall the queue."""
+        queue = MutationQueue(workers=1)
+
+        def interrupt():
+            raise _Interrupt()
+
+        interrupted = queue.submit("example.com", interrupt)
+        later = queue.submit("example.com", lambda: "done")
+        assert not queue.flush(timeout=5)
+        assert isinstance(interrupted.exception(), _Interrupt)
+        assert later.result() == "done"
+        queue.join()
+        assert not queue._queues
+
+    def test_assignment(self, standin):
+        """Test assigning a queued property queues the mutation."""
+        log = _serve(standin, delay=0)
+        with standin.api() as api:
+            with MutationQueue() as queue:
+                queued = queue.domain(Domain(session=api,
+                                             domainName="example.com"))
+                queued.locked = True
+                queued.locked = False
+                with pytest.raises(AttributeError):
+                    queued.privacy = True
+                assert not queue.flush()
+        assert log == [("example.com", "lock"), ("example.com", "unlock")]
+        assert queued.locked is False
+        assert "locked" not in vars(queued)
@@ -0,0 +1,111 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom nameindex module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import time
+
+import click
+import pytest
+
+from pynamedotcom import cli
+from pynamedotcom.nameindex import NameIndex, default_path
+
+
+class TestNameIndex(object):
+    """Domain name index test cases."""
+
+    def test_complete(self, tmpdir):
+        """Test prefix lookups at the edges of the index."""
+        index = NameIndex(str(tmpdir.join("sub", "test.names")))
+        assert index.stale
+        assert index.complete("a") == []
+        count = index.write(["b.com", "A.com", "ab.com", "b.com", "c.net"])
+        assert count == 4
+        assert not index.stale
+        assert index.complete("") == ["a.com", "ab.com", "b.com", "c.net"]
+        assert index.complete("A") == ["a.com", "ab.com"]
+        assert index.complete("ab") == ["ab.com"]
+        assert index.complete("c") == ["c.net"]
+        assert index.complete("d") == []
+        assert index.complete("", limit=2) == ["a.com", "ab.com"]
+
+    def test_stale(self, tmpdir):
+        """Test staleness and touching."""
+        now = [time.time() + 7200]
+        index = NameIndex(str(tmpdir.join("test.names")),
+                          clock=lambda: now[0])
+        index.write(["example.com"])
+        assert index.stale
+        now[0] = time.time()
+        index.touch()
+        assert not index.stale
+        assert index.complete("ex") == ["example.com"]
+
+    def test_speed(self, tmpdir):
+        """Test lookups in 100k names take well under 50ms."""
+        index = NameIndex(str(tmpdir.join("test.names")))
+        index.write("name{:06d}.com".format(i) for i in range(100000))
+        start = time.time()
+        for prefix in ("name0", "name05", "name099999", "zzz"):
+            index.complete(prefix)
+        elapsed = (time.time() - start) / 4
+        assert elapsed < 0.01
+        assert index.complete("name09999") == \
+            ["name{:06d}.com".format(i) for i in range(99990, 100000)]
+
+    def test_default_path(self, monkeypatch):
+        """Test the index location for a host."""
+        monkeypatch.setenv("XDG_CACHE_HOME", "/cache")
+        assert default_path("api.dev.name.com:443") == \
+            "/cache/pynamedotcom/api.dev.name.com_443.names"
+
+    def test_shell_complete(self, tmpdir, monkeypatch):
+        """Test CLI completion reads the index without the network."""
+        shell_completion = pytest.importorskip("click.shell_completion")
+        from pynamedotcom.cli import main
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmpdir))
+        NameIndex(default_path("api.example")).write(["maddison.family",
+                                                      "example.com"])
+        complete = shell_completion.ShellComplete(main, {}, "namedotcom",
+                                                  "_NAMEDOTCOM_COMPLETE")
+        completions = complete.get_completions(
+            ["--host", "api.example", "domain"], "ma")
+        assert [item.value for item in completions] == ["maddison.family"]
+
+    def test_click7_complete(self, tmpdir, monkeypatch):
+        """Test completion with the click 7 callback signature."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmpdir))
+        NameIndex(default_path("api.example")).write(["maddison.family",
+                                                      "example.com"])
+        ctx = click.Context(cli.main, info_name="namedotcom")
+        ctx.params = {"host": "api.example"}
+        assert cli._complete_domains_click7(ctx=ctx, args=["get"],
+                                            incomplete="ma") == \
+            ["maddison.family"]
+
+    def test_refresh_credentials(self, monkeypatch):
+        """Test the background refresh keeps credentials off its argv."""
+        calls = []
+        monkeypatch.setattr(cli.subprocess, "Popen",
+                            lambda args, **kwargs: calls.append((args,
+                                                                 kwargs)))
+        cli._refresh_index({"host": "api.example", "username": "user",
+                            "token": "secret", "auth_file": None})
+        args, kwargs = calls[0]
+        assert "secret" not in args
+        assert "user" not in args
+        assert kwargs["env"][cli.TOKEN_ENV_VAR] == "secret"
+        assert kwargs["env"][cli.USER_ENV_VAR] == "user"
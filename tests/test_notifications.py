@@ -0,0 +1,87 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom notifications module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import datetime
+import socket
+
+import requests
+
+from pynamedotcom.cache import AvailabilityCache
+from pynamedotcom.domain import Domain
+from pynamedotcom.expiry import ExpiryIndex
+from pynamedotcom.inventory import Inventory
+from pynamedotcom.notifications import Notification, Receiver
+from pynamedotcom.search import SearchResult
+
+
+class TestReceiver(object):
+    """Notification receiver test cases."""
+
+    def test_receive(self):
+        """Test validation, store updates and the event stream."""
+        index = ExpiryIndex()
+        with Receiver(path="/hook", token="s3cret",
+                      stores=[index]) as receiver:
+            url = "{}?token=s3cret".format(receiver.url)
+            event = {"eventName": "domain_renewed",
+                     "domainName": "example.com",
+                     "expireDate": "2020-01-01T00:00:00Z"}
+            assert requests.post(url, json=event).status_code == 202
+            assert requests.post(url, data=b"{not json").status_code == 400
+            assert requests.post(url, json={"eventName": "x"}) \
+                .status_code == 400
+            assert requests.post(receiver.url, json=event).status_code == 403
+            assert requests.post(url.replace("/hook", "/other"), json=event) \
+                .status_code == 404
+            notifications = list(receiver.events(timeout=1))
+        assert [n.event_name for n in notifications] == ["domain_renewed"]
+        assert notifications[0].as_dict() == event
+        assert index.expiry("example.com") == datetime.datetime(2020, 1, 1)
+
+    def test_negative_length(self):
+        """Test a negative Content-Length is rejected without blocking."""
+        with Receiver() as receiver:
+            host, port = receiver._server.server_address[:2]
+            conn = socket.create_connection((host, port), timeout=5)
+            conn.sendall(b"POST / HTTP/1.0\r\nContent-Length: -1\r\n\r\n")
+            assert conn.recv(64).split()[1] == b"400"
+            conn.close()
+
+    def test_bounded_queue(self):
+        """Test the oldest notifications are dropped when not consumed."""
+        with Receiver(max_queue=2) as receiver:
+            for name in ["a.com", "b.com", "c.com"]:
+                receiver.dispatch(Notification("x", name))
+            assert receiver.dropped == 1
+            assert [n.domain_name for n in receiver.events(timeout=0.01)] \
+                == ["b.com", "c.com"]
+
+    def test_stores(self):
+        """Test the cache and inventory apply notifications."""
+        cache = AvailabilityCache()
+        cache.put(SearchResult(session=None, domainName="example.com",
+                               sld="example", tld="com", purchasable=True))
+        inventory = Inventory.from_domains([
+            Domain(session=None, domainName="example.com",
+                   expireDate="2019-01-01T00:00:00Z")])
+        notification = Notification("domain_renewed", "example.com",
+                                    expireDate="2020-01-01T00:00:00Z")
+        with Receiver(stores=[cache, inventory]) as receiver:
+            receiver.dispatch(notification)
+        assert cache.get("example.com") is None
+        renewed = inventory["expiry"] >= datetime.datetime(2020, 1, 1)
+        assert inventory.names(renewed) == ["example.com"]
@@ -0,0 +1,160 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom priority module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import threading
+import time
+
+import pytest
+
+from pynamedotcom import bulk, priority
+from pynamedotcom.deadline import Deadline
+from pynamedotcom.exceptions import DeadlineExceeded
+from pynamedotcom.priority import (BULK, Dispatcher, INTERACTIVE, NORMAL,
+                                   Priority)
+
+
+def _acquire(dispatcher, name, order):
+    def func():
+        dispatcher.acquire(name)
+        order.append(name)
+    thread = threading.Thread(target=func)
+    thread.start()
+    while not dispatcher.waiting[name]:
+        time.sleep(0.001)
+    return thread
+
+
+class _Interrupt(BaseException):
+    pass
+
+
+def _interrupting(calls):
+    """Get a clock that raises _Interrupt after calls calls."""
+    count = [0]
+
+    def clock():
+        count[0] += 1
+        if count[0] > calls:
+            raise _Interrupt()
+        return time.time()
+    return clock
+
+
+class TestPriority(object):
+    """Priority context test cases."""
+
+    def test_current(self):
+        """Test the active priority and its default."""
+        assert priority.current() == NORMAL
+        with Priority(INTERACTIVE):
+            assert priority.current() == INTERACTIVE
+            assert priority.bind(priority.current)() == INTERACTIVE
+        assert priority.bind(priority.current)() == BULK
+        with pytest.raises(ValueError):
+            Priority("urgent")
+
+    def test_bulk(self):
+        """Test bulk execution runs at BULK priority by default."""
+        seen = [result for _, result, _
+                in bulk.execute(lambda _: priority.current(), range(3))]
+        assert seen == [BULK] * 3
+
+
+class TestDispatcher(object):
+    """Dispatcher test cases."""
+
+    def test_reserved(self):
+        """Test lower priorities cannot use reserved slots."""
+        dispatcher = Dispatcher(capacity=3,
+                                reserved={INTERACTIVE: 1, NORMAL: 1})
+        assert [dispatcher.limit(p) for p in (INTERACTIVE, NORMAL, BULK)] \
+            == [3, 2, 1]
+        dispatcher.acquire(BULK)
+        with pytest.raises(DeadlineExceeded):
+            with Deadline(0.05):
+                dispatcher.acquire(BULK)
+        dispatcher.acquire(NORMAL)
+        dispatcher.acquire(INTERACTIVE)
+        assert sum(dispatcher.in_flight.values()) == 3
+        assert not dispatcher.waiting[BULK]
+
+    def test_order(self):
+        """Test waiting requests are admitted highest priority first."""
+        dispatcher = Dispatcher(capacity=1, reserved={})
+        dispatcher.acquire(BULK)
+        order = []
+        threads = [_acquire(dispatcher, name, order)
+                   for name in (BULK, NORMAL, INTERACTIVE)]
+        held = BULK
+        for count in range(1, len(threads) + 1):
+            dispatcher.release(held)
+            while len(order) < count:
+                time.sleep(0.001)
+            held = order[-1]
+        for thread in threads:
+            thread.join()
+        assert order == [INTERACTIVE, NORMAL, BULK]
+
+    def test_interrupt(self):
+        """Test an interrupted waiter does not block later requests."""
+        dispatcher = Dispatcher(capacity=1, reserved={})
+        dispatcher.acquire(NORMAL)
+        errors = []
+
+        def wait():
+            try:
+                with Deadline(10, clock=_interrupting(2)):
+                    dispatcher.acquire(INTERACTIVE)
+            except _Interrupt as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=wait)
+        thread.start()
+        thread.join(5)
+        assert len(errors) == 1
+        assert not dispatcher.waiting[INTERACTIVE]
+        dispatcher.release(NORMAL)
+        with Deadline(1):
+            dispatcher.acquire(BULK)
+        assert dispatcher.in_flight[BULK] == 1
+
+    def test_interactive_latency(self, standin):
+        """Test interactive calls stay fast while bulk calls saturate."""
+        def get(request):
+            if request["match"].group(1) != "interactive":
+                time.sleep(0.2)
+            return {"domainName": "{}.com".format(request["match"].group(1))}
+
+        standin.route("GET", r"domains/(\w+)\.com", get)
+        dispatcher = Dispatcher(capacity=4, reserved={INTERACTIVE: 1})
+        with standin.api(dispatcher=dispatcher, pool_size=4) as api:
+            names = ["bulk{}.com".format(i) for i in range(24)]
+            background = threading.Thread(target=lambda: list(
+                bulk.execute(api.domain, names, workers=12)))
+            background.start()
+            while dispatcher.waiting[BULK] < 5:
+                time.sleep(0.001)
+            latencies = []
+            for _ in range(5):
+                start = time.time()
+                with Priority(INTERACTIVE):
+                    api.domain("interactive.com")
+                latencies.append(time.time() - start)
+            peak = dispatcher.in_flight[BULK]
+            background.join()
+        assert max(latencies) < 0.15
+        assert peak <= 3
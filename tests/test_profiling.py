@@ -0,0 +1,69 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom profiling module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import pstats
+import time
+
+from pynamedotcom import profiling
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+
+class TestProfiling(object):
+    """Profiling test cases."""
+
+    def test_section_inactive(self):
+        """Test that sections are no-ops without an active profiler."""
+        assert profiling._active is None
+        with profiling.section("http"):
+            pass
+
+    def test_profiler(self, tmpdir):
+        """Test stats dump and per-section accounting."""
+        path = str(tmpdir.join("stats.prof"))
+        stream = StringIO()
+        with profiling.Profiler(path=path, top=5, stream=stream) as profiler:
+            with profiling.section("http"):
+                time.sleep(0.05)
+            for _ in range(3):
+                with profiling.section("build"):
+                    sum(range(1000))
+        assert profiling._active is None
+        assert os.path.exists(path)
+        pstats.Stats(path)
+        calls, wall, cpu = profiler.sections["http"]
+        assert calls == 1
+        assert wall >= 0.05
+        assert wall - cpu >= 0.04
+        assert profiler.sections["build"][0] == 3
+        output = stream.getvalue()
+        assert path in output
+        for name in ["http", "build", "wait"]:
+            assert name in output
+
+    def test_from_env(self, monkeypatch, tmpdir):
+        """Test profiler construction from the environment."""
+        monkeypatch.delenv(profiling.ENV_VAR, raising=False)
+        assert profiling.from_env() is None
+        path = str(tmpdir.join("stats.prof"))
+        monkeypatch.setenv(profiling.ENV_VAR, path)
+        profiler = profiling.from_env()
+        assert profiler.path == path
@@ -0,0 +1,67 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom record module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from argparse import Namespace
+
+from pynamedotcom.record import Record, RecordChange, Records
+
+
+def zone(count):
+    """Build a list of A records."""
+    return [Record(id=i, host="host{}".format(i), type="A",
+                   answer="192.0.2.{}".format(i % 256), ttl=300)
+            for i in range(count)]
+
+
+class TestRecord(object):
+    """Record test cases."""
+
+    records = Records(domain=Namespace(name="example.com", session=None))
+
+    def test_record_key(self):
+        """Test record identity normalisation."""
+        a = Record(host="WWW", type="cname", answer="Example.com.")
+        b = Record(host="www", type="CNAME", answer="example.com")
+        assert a == b
+        assert a.data == {"host": "WWW", "type": "CNAME",
+                          "answer": "Example.com.", "ttl": 300}
+
+    def test_diff_unchanged(self):
+        """Test diff of identical record sets."""
+        current = zone(2000)
+        desired = [r.data for r in zone(2000)]
+        assert self.records.diff(desired, current=current) == []
+
+    def test_diff_minimal(self):
+        """Test that a diff only touches changed records."""
+        current = zone(2000)
+        desired = zone(2000)
+        desired[10] = Record(host="host10", type="A", answer="198.51.100.1")
+        desired[20] = Record(host="host20", type="A",
+                             answer=desired[20].answer, ttl=3600)
+        del desired[30]
+        desired.append(Record(host="new", type="TXT", answer="hello"))
+        changes = self.records.diff(desired, current=current)
+        actions = sorted((c.action, (c.current or c.desired).host)
+                         for c in changes)
+        assert actions == [(RecordChange.CREATE, "new"),
+                           (RecordChange.DELETE, "host30"),
+                           (RecordChange.UPDATE, "host10"),
+                           (RecordChange.UPDATE, "host20")]
+        for change in changes:
+            if change.action == RecordChange.UPDATE:
+                assert change.current.id == int(change.desired.host[4:])
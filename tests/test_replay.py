@@ -0,0 +1,105 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom replay module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import json
+import time
+
+import pytest
+import requests
+
+from pynamedotcom import API
+from pynamedotcom.codec import Serialised
+from pynamedotcom.replay import Recorder, Replayer, bench, load
+
+
+class TestReplay(object):
+    """Record and replay test cases."""
+
+    @pytest.fixture
+    def recording(self, standin, tmpdir):
+        """Record some exchanges with the stand-in."""
+        path = str(tmpdir.join("recording.jsonl.gz"))
+
+        def hello(request):
+            time.sleep(0.02)
+            return {"motd": "hi"}
+
+        standin.route("GET", "hello", hello)
+        standin.route("GET", r"domains/([^/]+)",
+                      lambda request: {"domainName":
+                                       request["match"].group(1)})
+        standin.route("POST", "domains:checkAvailability",
+                      lambda request: (400, {"message": "Bad Request"}))
+        with standin.api(transport=Recorder(path)) as api:
+            assert api.ping()["motd"] == "hi"
+            assert api.domain("example.com").name == "example.com"
+            with pytest.raises(requests.HTTPError):
+                api._post("domains:checkAvailability",
+                          data={"domainNames": ["example.com"]})
+        return path
+
+    def test_record(self, recording):
+        """Test exchanges are recorded without credentials."""
+        entries = load(recording)
+        assert [entry["status"] for entry in entries] == [200, 200, 400]
+        assert entries[0]["path"] == "/v4/hello"
+        assert entries[0]["latency"] >= 0.02
+        assert json.loads(entries[2]["body"]) == \
+            {"domainNames": ["example.com"]}
+        assert "token" not in open(recording, "rb").read().decode("latin-1")
+
+    def test_replay(self, standin, recording):
+        """Test replaying serves recorded responses without the server."""
+        served = sum(standin.requests.values())
+        delays = []
+        transport = Replayer(recording, speed=10, sleep=delays.append)
+        with API("user", "token", transport=transport) as api:
+            assert api.ping()["motd"] == "hi"
+            assert api.domain("example.com").name == "example.com"
+            with pytest.raises(requests.HTTPError) as e:
+                api._post("domains:checkAvailability",
+                          data={"domainNames": ["example.com"]})
+            assert e.value.response.status_code == 400
+            with pytest.raises(requests.HTTPError):
+                api.domain("other.com")
+        assert transport.unmatched == 1
+        assert delays[0] == pytest.approx(load(recording)[0]["latency"] / 10)
+        assert sum(standin.requests.values()) == served
+
+    def test_replay_json(self, recording):
+        """Test JSON bodies match regardless of formatting and key order."""
+        entries = load(recording)
+        entries[2]["body"] = '{"domainNames":["example.com"],"a":1}'
+        transport = Replayer(entries, speed=0)
+        with API("user", "token", transport=transport) as api:
+            with pytest.raises(requests.HTTPError) as e:
+                api._post("domains:checkAvailability",
+                          data=Serialised(b'{"a": 1, "domainNames": '
+                                          b'[ "example.com" ]}'))
+            assert e.value.response.status_code == 400
+        assert transport.unmatched == 0
+
+    def test_bench(self, recording):
+        """Test benchmarking a recording at full speed."""
+        entries = load(recording)
+        with API("user", "token",
+                 transport=Replayer(entries, speed=0)) as api:
+            result = bench(api, entries, total=30, workers=4)
+        assert result.count == 20
+        assert result.errors == {"HTTPError": 10}
+        assert result.throughput > 0
+        assert result.percentile(50) <= result.percentile(100)
@@ -0,0 +1,109 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom watch module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from pynamedotcom.deadline import Deadline
+from pynamedotcom.domain import Domain
+from pynamedotcom.watch import (DomainAdded, DomainRemoved, FieldChanged,
+                                Watcher)
+
+
+class Account(object):
+    """Stand-in for API with a mutable inventory."""
+
+    def __init__(self):
+        """Construct Account object instance."""
+        self.domains = dict(("{}.com".format(i),
+                             {"domainName": "{}.com".format(i),
+                              "locked": True,
+                              "nameservers": ["ns1.example.net"]})
+                            for i in range(10))
+        self.fetched = []
+        self.limiter = None
+
+    def iter_domains(self, per_page=None):
+        """Get the listing."""
+        for data in self.domains.values():
+            yield Domain(session=self, **data)
+
+    def domain(self, name):
+        """Get a single domain in full."""
+        self.fetched.append(name)
+        return Domain(session=self, contacts={"admin": {"email": "a@b.c"}},
+                      **self.domains[name])
+
+
+class TestWatcher(object):
+    """Watcher test cases."""
+
+    def test_poll(self):
+        """Test change detection and targeted re-fetching."""
+        account = Account()
+        watcher = Watcher(account, interval=1, max_interval=8)
+        events = []
+        watcher.subscribe(events.append)
+        assert watcher.poll() == []
+        assert account.fetched == []
+        account.domains["3.com"]["locked"] = False
+        account.domains["new.com"] = {"domainName": "new.com"}
+        del account.domains["9.com"]
+        watcher.poll()
+        assert sorted(account.fetched) == ["3.com", "new.com"]
+        assert sorted(repr(e) for e in events) == sorted([
+            repr(FieldChanged("3.com", "locked", True, False)),
+            repr(DomainAdded("new.com", None)),
+            repr(DomainRemoved("9.com"))])
+        changed = [e for e in events if isinstance(e, FieldChanged)][0]
+        assert changed.as_dict() == {"event": "changed", "name": "3.com",
+                                     "field": "locked", "old": True,
+                                     "new": False}
+
+    def test_truncated(self):
+        """Test a listing cut short by the deadline removes nothing."""
+        account = Account()
+        watcher = Watcher(account, interval=1)
+        watcher.poll()
+        hashes = dict(watcher._hashes)
+        now = [0]
+        listing = account.iter_domains
+
+        def truncated(per_page=None):
+            for count, domain in enumerate(listing()):
+                if count == 3:
+                    now[0] = 20
+                    return
+                yield domain
+
+        account.iter_domains = truncated
+        sleeps = []
+        watcher._sleep = sleeps.append
+        with Deadline(10, clock=lambda: now[0]):
+            assert watcher.poll() == []
+            assert watcher._hashes == hashes
+            watcher.run()
+        assert sleeps == []
+
+    def test_backoff(self):
+        """Test adaptive poll interval."""
+        account = Account()
+        sleeps = []
+        watcher = Watcher(account, interval=1, max_interval=5,
+                          sleep=sleeps.append)
+        watcher.run(polls=5)
+        assert sleeps == [2, 4, 5, 5]
+        account.domains["0.com"]["locked"] = False
+        watcher.poll()
+        assert watcher.interval == 1
@@ -0,0 +1,100 @@
+# Copyright (c) 2018 Ben Maddison. All rights reserved.
+#
+# The contents of this file are licensed under the MIT License
+# (the "License"); you may not use this file except in compliance with the
+# License.
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations under
+# the License.
+"""Test classes for pynamedotcom zonefile module."""
+
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+
+import pytest
+
+from pynamedotcom import zonefile
+from pynamedotcom.exceptions import ZoneFileError
+from pynamedotcom.record import Record
+
+ZONE = """$ORIGIN example.com.
+$TTL 1h
+@   IN  SOA ns1.example.net. hostmaster.example.com. (
+            2018010101 ; serial
+            3600 900 604800 300 )
+    IN  NS  ns1.example.net.
+    IN  MX  10 mail
+@       A   192.0.2.1
+www 300 IN  CNAME @
+        IN  TXT "v=spf1 -all" "; not a comment"
+_sip._tcp  SRV 5 10 5060 sip.example.org.
+sub IN NS ns.sub
+other.example.org. A 192.0.2.2
+"""
+
+
+class TestZoneFile(object):
+    """Zone file test cases."""
+
+    def test_parse(self):
+        """Test parsing a master file."""
+        records = list(zonefile.parse(io.StringIO(ZONE), domain="example.com"))
+        assert records == [
+            Record(host="", type="MX", answer="mail.example.com",
+                   priority=10, ttl=3600),
+            Record(host="", type="A", answer="192.0.2.1", ttl=3600),
+            Record(host="www", type="CNAME", answer="example.com", ttl=300),
+            Record(host="www", type="TXT", answer="v=spf1 -all; not a comment",
+                   ttl=3600),
+            Record(host="_sip._tcp", type="SRV",
+                   answer="10 5060 sip.example.org", priority=5, ttl=3600),
+            Record(host="sub", type="NS", answer="ns.sub.example.com",
+                   ttl=3600),
+        ]
+
+    def test_round_trip(self):
+        """Test writing and re-parsing records."""
+        records = list(zonefile.parse(io.StringIO(ZONE), domain="example.com"))
+        records.append(Record(host="quote", type="TXT", answer='a"b\\c' * 100))
+        buf = io.StringIO()
+        assert zonefile.write(records, buf, domain="example.com") == \
+            len(records)
+        buf.seek(0)
+        assert list(zonefile.parse(buf, domain="example.com")) == records
+
+    @pytest.mark.parametrize("text", ["$INCLUDE other.zone\n",
+                                      "www A (\n192.0.2.1\n",
+                                      "  A 192.0.2.1\n",
+                                      "www 300 IN\n"])
+    def test_parse_errors(self, text):
+        """Test parsing malformed master files."""
+        with pytest.raises(ZoneFileError):
+            list(zonefile.parse(io.StringIO(text), domain="example.com"))
+
+    def test_parse_files(self, tmpdir):
+        """Test parsing several zone files in worker processes."""
+        zones = []
+        for name in ["example.com", "example.net"]:
+            path = tmpdir.join("{}.zone".format(name))
+            path.write("www A 192.0.2.1\nmail MX 10 mx\n")
+            zones.append((str(path), name))
+        results = dict(zonefile.parse_files(zones, processes=2))
+        assert sorted(results) == sorted(path for path, _ in zones)
+        for (path, name) in zones:
+            assert results[path] == [
+                Record(host="www", type="A", answer="192.0.2.1"),
+                Record(host="mail", type="MX", priority=10,
+                       answer="mx.{}".format(name))]
+
+    def test_parse_txt(self):
+        """Test unquoted TXT words are kept apart."""
+        text = 'a TXT v=spf1 -all\nb TXT "v=spf1 " "-all" x\n'
+        records = list(zonefile.parse(io.StringIO(text), domain="example.com"))
+        assert [record.answer for record in records] == \
+            ["v=spf1 -all", "v=spf1 -all x"]